@@ -0,0 +1,100 @@
+"""
+Generation based cache invalidation.
+
+Every tag (a model, a model inside one organization, a single object) owns a
+version counter in the cache. Cache keys embed the current versions of the
+tags they depend on, so invalidating a tag is a single INCR: readers start
+building new keys and the old entries simply age out through their TTL.
+"""
+import time
+from django.core.cache import cache
+
+VERSION_KEY_PREFIX = "cache_version"
+
+
+def model_tag(label):
+    return f"model:{label.lower()}"
+
+
+def organization_tag(label, organization_id):
+    return f"model:{label.lower()}:org:{organization_id}"
+
+
+def all_organizations_tag(label):
+    """Tag for entries spanning every organization; bumped with any organization's tag."""
+    return f"model:{label.lower()}:org:all"
+
+
+def epoch_tag(label):
+    """Embedded in every key of the model; bumped when the written row is unknown."""
+    return f"model:{label.lower()}:epoch"
+
+
+def shared_tag(label):
+    """Tag for rows that do not belong to any organization."""
+    return f"model:{label.lower()}:org:none"
+
+
+def object_tag(label, pk):
+    return f"model:{label.lower()}:pk:{pk}"
+
+
+def get_instance_organization_id(instance):
+    if instance._meta.label == "organization.Organization":
+        return instance.pk
+    return getattr(instance, "organization_id", None)
+
+
+def tags_for_instance(instance):
+    """All tags a write to ``instance`` has to bump."""
+    label = instance._meta.label
+    organization_id = get_instance_organization_id(instance)
+    tags = [model_tag(label), object_tag(label, instance.pk)]
+    if organization_id is None:
+        tags.append(shared_tag(label))
+    else:
+        tags.append(organization_tag(label, organization_id))
+    return tags
+
+
+def _version_key(tag):
+    return f"{VERSION_KEY_PREFIX}:{tag}"
+
+
+def _new_version():
+    # Seed from the clock so an evicted counter never restarts at a value
+    # that older, still cached, entries were built with.
+    return int(time.time() * 1000)
+
+
+def get_versions(tags):
+    """Current version of each tag, fetched with a single get_many (MGET)."""
+    keys = [_version_key(tag) for tag in tags]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            cache.add(key, _new_version(), timeout=None)
+            version = cache.get(key)
+        versions.append(version)
+    return versions
+
+
+def get_version(tag):
+    return get_versions([tag])[0]
+
+
+def bump(*tags):
+    """Invalidate everything built with ``tags``: one INCR per tag, no key scans."""
+    for tag in tags:
+        key = _version_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _new_version(), timeout=None)
+
+
+def versioned_key(base_key, tags):
+    versions = get_versions(tags)
+    return f"{base_key}:v" + ".".join(str(version) for version in versions)
@@ -0,0 +1,151 @@
+"""
+Single place where Elasticsearch clients are built.
+
+Every client created through get_client() shares the pool, timeout, retry and
+sniffing options from settings.ELASTICSEARCH_DSL and sits behind a circuit
+breaker: after ES_CIRCUIT_BREAKER["FAILURE_THRESHOLD"] consecutive transport
+failures, calls fail immediately with CircuitOpenError for COOLDOWN seconds,
+so callers reach their database fallback without waiting for a timeout.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from elastic_transport import ConnectionError as TransportConnectionError
+from elastic_transport import Transport, TransportError
+from elasticsearch import Elasticsearch
+
+logger = logging.getLogger(__name__)
+
+CLIENT_DEFAULTS = {
+    "request_timeout": 5.0,
+    "max_retries": 1,
+    "retry_on_timeout": False,
+    "connections_per_node": 10,
+    "sniff_on_start": False,
+    "sniff_on_node_failure": False,
+}
+
+BREAKER_DEFAULTS = {
+    "FAILURE_THRESHOLD": 5,
+    "COOLDOWN": 30.0,  # seconds
+}
+
+
+class CircuitOpenError(TransportConnectionError):
+    """Raised instead of calling Elasticsearch while the breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    closed -> open after ``failure_threshold`` consecutive failures,
+    open -> half-open once ``cooldown`` seconds passed (one trial call),
+    half-open -> closed on success, back to open on failure.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30.0, name="elasticsearch"):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.name = name
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow(self):
+        if self.opened_at is None:
+            return True
+        with self._lock:
+            if time.monotonic() - self.opened_at < self.cooldown or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        if self.failures or self.opened_at is not None:
+            with self._lock:
+                if self.opened_at is not None:
+                    logger.info(f"{self.name}: circuit closed")
+                self.failures = 0
+                self.opened_at = None
+                self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.error(f"{self.name}: circuit opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+
+    def reset(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+
+class CircuitBreakerTransport(Transport):
+    """Transport that consults and feeds ``breaker`` around every request."""
+
+    breaker = None
+
+    def perform_request(self, method, target, **kwargs):
+        breaker = self.breaker
+        if breaker is None:
+            return super().perform_request(method, target, **kwargs)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{breaker.name}: circuit open, skipping {method} {target}")
+        try:
+            response = super().perform_request(method, target, **kwargs)
+        except TransportError:
+            breaker.record_failure()
+            raise
+        if response.meta.status >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+
+def get_client_options(alias="default"):
+    options = {**CLIENT_DEFAULTS, **settings.ELASTICSEARCH_DSL[alias]}
+    hosts = options.pop("hosts")
+    return hosts, options
+
+
+def get_breaker_settings():
+    return {**BREAKER_DEFAULTS, **getattr(settings, "ES_CIRCUIT_BREAKER", {})}
+
+
+def create_client(alias="default", breaker=None):
+    """New client for ``alias``; pass ``breaker`` to share one between clients."""
+    hosts, options = get_client_options(alias)
+    if breaker is None:
+        config = get_breaker_settings()
+        breaker = CircuitBreaker(config["FAILURE_THRESHOLD"], config["COOLDOWN"], name=f"elasticsearch:{alias}")
+    transport_class = type("BoundCircuitBreakerTransport", (CircuitBreakerTransport,), {"breaker": breaker})
+    return Elasticsearch(hosts, transport_class=transport_class, **options)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(alias="default"):
+    """Process wide client for ``alias``; its connection pool is shared by every caller."""
+    if alias not in _clients:
+        with _clients_lock:
+            if alias not in _clients:
+                _clients[alias] = create_client(alias)
+    return _clients[alias]
+
+
+def get_breaker(alias="default"):
+    return get_client(alias).transport.breaker
@@ -0,0 +1,228 @@
+"""
+Explicit Elasticsearch mappings and index settings.
+
+The mapping of every index is derived from the model behind its viewset (see
+get_indexed_viewsets) and can be adjusted per index through INDEX_REGISTRY or
+register_index(). Bodies are applied when an index is created, either by the
+reindex command or by ensure_index() before the first write.
+"""
+import copy
+import logging
+import threading
+from importlib import import_module
+from types import MappingProxyType
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+from elasticsearch import BadRequestError
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_IGNORE_ABOVE = 256
+NGRAM_MIN_GRAM = 3
+
+ANALYSIS = {
+    "analyzer": {
+        "ngram_analyzer": {
+            "type": "custom",
+            "tokenizer": "ngram_tokenizer",
+            "filter": ["lowercase"],
+        },
+    },
+    "tokenizer": {
+        "ngram_tokenizer": {
+            "type": "ngram",
+            "min_gram": NGRAM_MIN_GRAM,
+            "max_gram": NGRAM_MIN_GRAM + 1,
+            "token_chars": ["letter", "digit"],
+        },
+    },
+}
+
+# Schemaless blobs that are returned with the document but never searched.
+# Every JSONField is disabled; these cover values built outside the model fields.
+DISABLED_FIELDS = {
+    "pricing_calendar", "availability_calendar", "booking_calendar",
+    "payload", "extra", "meta_tags",
+}
+
+# Fields serialize_instance() copies from the related Location
+LOCATION_FIELDS = [
+    "street_address", "apt_suite", "city", "state_province", "postal_code", "country",
+]
+
+# index_name -> {"properties": {...}, "settings": {...}, "search_fields": [...]}
+INDEX_REGISTRY = {
+    "property": {
+        "properties": {"organization_id": {"type": "long"}},
+    },
+}
+
+DISABLED = {"type": "object", "enabled": False}
+
+
+def register_index(index_name, properties=None, settings=None, search_fields=None):
+    entry = INDEX_REGISTRY.setdefault(index_name, {})
+    if properties:
+        entry.setdefault("properties", {}).update(properties)
+    if settings:
+        entry.setdefault("settings", {}).update(settings)
+    if search_fields:
+        entry["search_fields"] = list(search_fields)
+    _index_bodies.pop(index_name, None)
+
+
+def get_index_settings(index_name=None):
+    index_settings = {
+        **getattr(settings, "ES_INDEX_SETTINGS", {}),
+        **INDEX_REGISTRY.get(index_name, {}).get("settings", {}),
+    }
+    return {"index": index_settings, "analysis": ANALYSIS}
+
+
+def text_field(searchable=False):
+    mapping = {
+        "type": "text",
+        "fields": {"keyword": {"type": "keyword", "ignore_above": KEYWORD_IGNORE_ABOVE}},
+    }
+    if searchable:
+        # Prefix terms make as-you-type queries cheap, n-grams serve icontains
+        mapping["index_prefixes"] = {"min_chars": 1, "max_chars": 10}
+        mapping["fields"]["ngram"] = {"type": "text", "analyzer": "ngram_analyzer"}
+    return mapping
+
+
+def field_mapping(field, searchable=False):
+    if field.name in DISABLED_FIELDS or isinstance(field, models.JSONField):
+        return DISABLED
+    if isinstance(field, (models.ForeignKey, models.OneToOneField)):
+        return field_mapping(field.target_field)
+    if isinstance(field, models.BooleanField):
+        return {"type": "boolean"}
+    if isinstance(field, (models.AutoField, models.IntegerField)):
+        return {"type": "long"}
+    if isinstance(field, (models.FloatField, models.DecimalField)):
+        return {"type": "double"}
+    if isinstance(field, (models.DateTimeField, models.DateField)):
+        return {"type": "date"}
+    if isinstance(field, (models.UUIDField, models.TimeField, models.FileField)):
+        return {"type": "keyword"}
+    if isinstance(field, (models.CharField, models.TextField)):
+        return text_field(searchable)
+    return None  # Leave anything else to dynamic mapping
+
+
+def _search_field_names(search_fields):
+    # DRF style prefixes ("^name", "=code") are not part of the field name
+    return {name.lstrip("^=@$") for name in search_fields or []}
+
+
+def build_properties(model, search_fields=()):
+    searchable = _search_field_names(search_fields)
+    properties = {}
+    for field in model._meta.fields:
+        mapping = field_mapping(field, field.name in searchable)
+        if mapping is not None:
+            properties[field.name] = mapping
+
+    location = next((f for f in model._meta.fields if f.name == "location" and f.is_relation), None)
+    if location is not None and location.related_model._meta.label == "master.Location":
+        for name in LOCATION_FIELDS:
+            properties[name] = text_field(name in searchable)
+        properties["latitude"] = {"type": "double"}
+        properties["longitude"] = {"type": "double"}
+    return properties
+
+
+def build_index_body(index_name, model=None, search_fields=()):
+    entry = INDEX_REGISTRY.get(index_name, {})
+    properties = build_properties(model, entry.get("search_fields", search_fields)) if model else {}
+    properties.update(entry.get("properties", {}))
+    return {
+        "settings": get_index_settings(index_name),
+        "mappings": {
+            "dynamic_templates": [
+                {"json_blobs": {"match": "features_*", "mapping": DISABLED}},
+            ],
+            "properties": properties,
+        },
+    }
+
+
+def _subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _subclasses(subclass)
+
+
+def get_indexed_viewsets():
+    """
+    {index_name: viewset class} for every ElasticSearchMixin viewset that
+    declares both an ``index_name`` and a ``queryset``.
+    """
+    from core.mixin_es import ElasticSearchMixin  # Avoid circular import
+
+    for app_config in apps.get_app_configs():
+        try:
+            import_module(f"{app_config.name}.viewsets")
+        except ModuleNotFoundError as e:
+            if e.name != f"{app_config.name}.viewsets":
+                raise
+
+    viewsets = {}
+    for viewset in _subclasses(ElasticSearchMixin):
+        index_name = getattr(viewset, "index_name", None)
+        if index_name and getattr(viewset, "queryset", None) is not None:
+            viewsets.setdefault(index_name, viewset)
+    return viewsets
+
+
+_index_bodies = {}
+_ensured_indices = set()
+_lock = threading.Lock()
+
+
+def _registry_body(index_name):
+    if index_name not in _index_bodies:
+        viewset = get_indexed_viewsets().get(index_name)
+        if viewset is None:
+            body = build_index_body(index_name)
+        else:
+            search_fields = getattr(viewset, "es_search_fields", None) or getattr(viewset, "search_fields", ())
+            body = build_index_body(index_name, viewset.queryset.model, search_fields)
+        _index_bodies[index_name] = body
+    return _index_bodies[index_name]
+
+
+def get_index_body(index_name):
+    """Registry body for ``index_name``, built from its viewset on first use."""
+    return copy.deepcopy(_registry_body(index_name))
+
+
+def get_index_properties(index_name):
+    """
+    Read-only view of the mapped properties of ``index_name``, shared between
+    requests instead of copied: the list path reads it on every request.
+    """
+    if not index_name:
+        return MappingProxyType({})
+    return MappingProxyType(_registry_body(index_name)["mappings"]["properties"])
+
+
+def ensure_index(client, index_name):
+    """Create ``index_name`` with its registry body unless it (or an alias of that name) exists."""
+    if index_name in _ensured_indices:
+        return
+    with _lock:
+        if index_name in _ensured_indices:
+            return
+        if not client.indices.exists(index=index_name):
+            body = get_index_body(index_name)
+            try:
+                client.indices.create(index=index_name, settings=body["settings"], mappings=body["mappings"])
+                logger.info(f"Created Elasticsearch index {index_name} from the mapping registry")
+            except BadRequestError as e:
+                if e.error != "resource_already_exists_exception":  # Another process won the race
+                    raise
+        _ensured_indices.add(index_name)
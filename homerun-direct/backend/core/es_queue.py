@@ -0,0 +1,386 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from django.conf import settings
+from elasticsearch.helpers import bulk
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ASYNC": True,
+    "BACKEND": "memory",  # "memory" or "redis"
+    "BATCH_SIZE": 500,
+    "FLUSH_INTERVAL": 1.0,  # seconds
+    "MAX_QUEUE_SIZE": 10000,
+    "PUT_TIMEOUT": 0.05,  # seconds a request waits on a full queue before OVERFLOW applies
+    "OVERFLOW": "sync",  # full queue: "sync" sends the action inline, "drop" discards it
+    "MAX_RETRIES": 3,
+    "RETRY_BACKOFF": 0.5,  # seconds, doubled on every attempt
+    "REDIS_KEY": "es_index_queue",
+    "REDIS_HEARTBEAT": 60,  # seconds without a heartbeat before a worker's claimed actions are requeued
+    "BULK_CHUNK_SIZE": 500,  # bulk_index_queryset rows per DB fetch and bulk request
+    "BULK_THREAD_COUNT": 4,  # > 1 sends chunks concurrently through parallel_bulk
+}
+
+# Item level statuses worth retrying, anything else is a bad document
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def get_indexing_settings():
+    return {**DEFAULTS, **getattr(settings, "ES_INDEXING", {})}
+
+
+class InMemoryQueueBackend:
+    """
+    Process local queue, enough for tests and single process deployments.
+    Whatever is still queued when the process dies is lost.
+    """
+
+    def __init__(self, max_size):
+        self._queue = queue.Queue(maxsize=max_size)
+
+    def put(self, action, block=True, timeout=None):
+        try:
+            self._queue.put(action, block=block, timeout=timeout)
+            return True
+        except queue.Full:
+            return False
+
+    def get_batch(self, batch_size, timeout):
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def ack(self, batch):
+        pass
+
+    def requeue(self, actions):
+        """Puts ``actions`` back; returns how many did not fit."""
+        return sum(not self.put(action, block=False) for action in actions)
+
+    def recover(self):
+        pass
+
+    def size(self):
+        return self._queue.qsize()
+
+
+class RedisBatch(list):
+    """Decoded actions plus the raw list items they were claimed as."""
+
+    def __init__(self, items):
+        super().__init__(json.loads(item) for item in items)
+        self.items = items
+
+
+class RedisQueueBackend:
+    """
+    Redis list shared by every worker process, so queued actions survive a
+    process restart and any process can drain them.
+
+    get_batch() moves actions with LMOVE into a processing list of the
+    worker, and ack() removes them once they are sent. A worker whose
+    heartbeat expired (it crashed mid batch) has its processing list moved
+    back to the queue by the next worker that starts.
+    """
+
+    def __init__(self, key, max_size, heartbeat=60):
+        from django_redis import get_redis_connection
+        self.key = key
+        self.max_size = max_size
+        self.heartbeat = heartbeat
+        self.client = get_redis_connection("default")
+
+    @property
+    def processing_key(self):
+        # Per process: a forked worker must not share its parent's claims
+        return f"{self.key}:processing:{socket.gethostname()}:{os.getpid()}"
+
+    @staticmethod
+    def heartbeat_key(processing_key):
+        return f"{processing_key}:alive"
+
+    def put(self, action, block=True, timeout=None):
+        if self.max_size and self.client.llen(self.key) >= self.max_size:
+            return False
+        self.client.rpush(self.key, json.dumps(action))
+        return True
+
+    def get_batch(self, batch_size, timeout):
+        processing_key = self.processing_key
+        pipe = self.client.pipeline()
+        pipe.set(self.heartbeat_key(processing_key), "1", ex=self.heartbeat)
+        for _ in range(batch_size):
+            pipe.lmove(self.key, processing_key, "LEFT", "RIGHT")
+        items = [item for item in pipe.execute()[1:] if item is not None]
+        if not items:
+            time.sleep(timeout)
+            return []
+        return RedisBatch(items)
+
+    def ack(self, batch):
+        pipe = self.client.pipeline()
+        for item in getattr(batch, "items", ()):
+            pipe.lrem(self.processing_key, 1, item)
+        pipe.execute()
+
+    def requeue(self, actions):
+        if actions:
+            self.client.rpush(self.key, *[json.dumps(action) for action in actions])
+        return 0
+
+    def recover(self):
+        """Moves the claims of workers without a heartbeat back to the head of the queue."""
+        for processing_key in self.client.scan_iter(match=f"{self.key}:processing:*"):
+            processing_key = processing_key.decode() if isinstance(processing_key, bytes) else processing_key
+            if processing_key.endswith(":alive") or processing_key == self.processing_key:
+                continue
+            if self.client.exists(self.heartbeat_key(processing_key)):
+                continue
+            moved = 0
+            while self.client.lmove(processing_key, self.key, "RIGHT", "LEFT") is not None:
+                moved += 1
+            if moved:
+                logger.warning(f"es-indexing-queue: requeued {moved} actions claimed by {processing_key}")
+
+    def size(self):
+        return self.client.llen(self.key)
+
+
+class BulkQueue:
+    """
+    Queue of Elasticsearch bulk actions drained by a background thread.
+
+    Producers call put() and return immediately, or after ``put_timeout``
+    seconds at most when the queue is full. An action that does not fit is
+    then sent inline (``overflow="sync"``) or dropped (``"drop"``, for best
+    effort data such as audit logs); both are counted and logged. The worker
+    sends batches of ``batch_size`` actions (or whatever arrived within
+    ``flush_interval``) through elasticsearch.helpers.bulk, retries failed
+    batches and retryable items with exponential backoff, and puts back on
+    the queue what still failed after ``max_retries``.
+    """
+
+    def __init__(self, backend, client_getter, batch_size=500, flush_interval=1.0,
+                 max_retries=3, retry_backoff=0.5, block=True, put_timeout=None, name="es-bulk-queue",
+                 prepare=None, overflow="drop"):
+        self.backend = backend
+        self.client_getter = client_getter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.block = block
+        self.put_timeout = put_timeout
+        self.name = name
+        self.prepare = prepare
+        self.overflow = overflow
+        self.dropped = 0
+        self.overflowed = 0
+        self.failed = 0
+        self.requeued = 0
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def put(self, action):
+        self.start()
+        if self.backend.put(action, block=self.block, timeout=self.put_timeout):
+            return True
+        if self.overflow == "sync":
+            self.overflowed += 1
+            if self.overflowed == 1 or self.overflowed % 1000 == 0:
+                logger.warning(f"{self.name}: queue full, {self.overflowed} actions sent inline so far")
+            if not self.send([action]):
+                return True
+        self.dropped += 1
+        if self.dropped == 1 or self.dropped % 1000 == 0:
+            logger.warning(f"{self.name}: {self.dropped} actions dropped so far")
+        return False
+
+    def start(self):
+        # Threads do not survive fork(), so every worker process starts its own
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            try:
+                self.backend.recover()
+            except Exception as e:
+                logger.warning(f"{self.name}: recovering claimed actions failed: {e}")
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def flush(self):
+        """Synchronously drain everything that is queued right now."""
+        while True:
+            batch = self.backend.get_batch(self.batch_size, timeout=0)
+            if not batch:
+                return
+            if self._send_batch(batch):
+                return  # Sending fails, what is left stays queued
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                batch = self.backend.get_batch(self.batch_size, timeout=self.flush_interval)
+                if batch:
+                    self._send_batch(batch)
+            except Exception as e:  # Keep the worker alive whatever happens
+                logger.error(f"{self.name}: worker error: {e}")
+                time.sleep(self.flush_interval)
+
+    def _send_batch(self, batch):
+        """Sends a claimed batch, requeues what failed, then acknowledges it. Returns the failed actions."""
+        failed = self.send(list(batch))
+        if failed:
+            self.requeued += len(failed)
+            lost = self.backend.requeue(failed)
+            logger.warning(f"{self.name}: requeued {len(failed) - lost} actions")
+            if lost:
+                self.dropped += lost
+                logger.error(f"{self.name}: {lost} failed actions did not fit back in the queue")
+        self.backend.ack(batch)
+        return failed
+
+    def send(self, actions):
+        """Returns the actions still failing after ``max_retries``; rejected documents are not returned."""
+        attempt = 0
+        while actions:
+            try:
+                if self.prepare:
+                    self.prepare(self.client_getter(), actions)
+                _, errors = bulk(self.client_getter(), actions, raise_on_error=False, raise_on_exception=True)
+            except Exception as e:
+                logger.warning(f"{self.name}: bulk request failed (attempt {attempt + 1}): {e}")
+                retry = actions
+            else:
+                retry = self._retryable(actions, errors)
+
+            if not retry:
+                return []
+            attempt += 1
+            if attempt > self.max_retries:
+                self.failed += len(retry)
+                logger.error(f"{self.name}: giving up on {len(retry)} actions after {self.max_retries} retries")
+                return retry
+            time.sleep(self.retry_backoff * (2 ** (attempt - 1)))
+            actions = retry
+        return []
+
+    def _retryable(self, actions, errors):
+        retry_ids = set()
+        for error in errors:
+            op_type, info = next(iter(error.items()))
+            status = info.get("status")
+            if op_type == "delete" and status == 404:
+                continue
+            if status in RETRYABLE_STATUSES:
+                retry_ids.add((info.get("_index"), str(info.get("_id"))))
+            else:
+                self.failed += 1
+                logger.error(f"{self.name}: {op_type} {info.get('_index')}/{info.get('_id')} rejected: {info.get('error')}")
+        return [a for a in actions if (a["_index"], str(a["_id"])) in retry_ids]
+
+
+_indexing_queue = None
+_indexing_queue_lock = threading.Lock()
+
+
+def _get_es_client():
+    from core.mixin_es import es  # Avoid circular import
+    return es
+
+
+def _ensure_indices(client, actions):
+    from core.es_mappings import ensure_index  # Avoid circular import
+    for index_name in {action["_index"] for action in actions}:
+        ensure_index(client, index_name)
+
+
+def get_indexing_queue():
+    """Process wide queue used by ElasticSearchMixin for index/delete actions."""
+    global _indexing_queue
+    if _indexing_queue is None:
+        with _indexing_queue_lock:
+            if _indexing_queue is None:
+                config = get_indexing_settings()
+                if config["BACKEND"] == "redis":
+                    backend = RedisQueueBackend(
+                        config["REDIS_KEY"], config["MAX_QUEUE_SIZE"], heartbeat=config["REDIS_HEARTBEAT"]
+                    )
+                else:
+                    backend = InMemoryQueueBackend(config["MAX_QUEUE_SIZE"])
+                    if config["ASYNC"] and not settings.DEBUG:
+                        logger.warning(
+                            "es-indexing-queue: the memory backend loses queued actions when the process dies, "
+                            "use ES_INDEXING BACKEND=redis or the outbox (settings.OUTBOX)"
+                        )
+                _indexing_queue = BulkQueue(
+                    backend,
+                    _get_es_client,
+                    batch_size=config["BATCH_SIZE"],
+                    flush_interval=config["FLUSH_INTERVAL"],
+                    max_retries=config["MAX_RETRIES"],
+                    retry_backoff=config["RETRY_BACKOFF"],
+                    put_timeout=config["PUT_TIMEOUT"],
+                    name="es-indexing-queue",
+                    prepare=_ensure_indices,
+                    overflow=config["OVERFLOW"],
+                )
+                atexit.register(_flush_at_exit)
+    return _indexing_queue
+
+
+def reset_indexing_queue():
+    """Drop the process wide queue; the next get_indexing_queue() rebuilds it from settings."""
+    global _indexing_queue
+    with _indexing_queue_lock:
+        if _indexing_queue is not None:
+            _indexing_queue.stop()
+        _indexing_queue = None
+
+
+def _flush_at_exit():
+    if _indexing_queue is not None:
+        _indexing_queue.stop()
+        try:
+            _indexing_queue.flush()
+        except Exception as e:
+            logger.error(f"es-indexing-queue: flush at exit failed: {e}")
+
+
+def enqueue_index(index_name, doc_id, document):
+    return get_indexing_queue().put({
+        "_op_type": "index",
+        "_index": index_name,
+        "_id": doc_id,
+        "_source": document,
+    })
+
+
+def enqueue_delete(index_name, doc_id):
+    return get_indexing_queue().put({
+        "_op_type": "delete",
+        "_index": index_name,
+        "_id": doc_id,
+    })
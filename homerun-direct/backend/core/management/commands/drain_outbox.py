@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import OutboxEvent
+from core.outbox import drain, get_outbox_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Applies pending outbox events (core.outbox) to Elasticsearch and Redis in batches. "
+        "Runs until the outbox is empty, or forever with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new events.")
+
+    def handle(self, *args, **options):
+        config = get_outbox_settings()
+        while True:
+            stats = drain(options["batch_size"])
+            if stats["events"]:
+                self.stdout.write(
+                    f"🔄 {stats['events']} events, {stats['objects']} objects, {stats['failed']} failed, "
+                    f"{stats['skipped']} left to other workers"
+                )
+            # A batch made only of failures, or of rows other workers hold, would be picked again at once
+            if stats["objects"] and stats["failed"] < stats["events"]:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(config["POLL_INTERVAL"])
+
+        stuck = OutboxEvent.objects.filter(attempts__gte=config["MAX_ATTEMPTS"]).count()
+        if stuck:
+            self.stdout.write(self.style.WARNING(f"⚠️ {stuck} events exceeded {config['MAX_ATTEMPTS']} attempts"))
+        self.stdout.write(self.style.SUCCESS("✅ Outbox drained"))
@@ -0,0 +1,162 @@
+from datetime import datetime
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from core.es_mappings import get_index_body, get_indexed_viewsets
+from core.mixin_es import es
+
+
+def _has_field(model, name):
+    try:
+        model._meta.get_field(name)
+        return True
+    except FieldDoesNotExist:
+        return False
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds Elasticsearch indices from the database into a new timestamped index and "
+        "atomically points the index alias at it. With --organization or --since the matching "
+        "rows are re-indexed in place instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--models", nargs="+", default=None,
+            help="Index names or model labels (app_label.Model) to rebuild. Defaults to all.",
+        )
+        parser.add_argument("--organization", type=int, default=None, help="Only rows of this organization id.")
+        parser.add_argument(
+            "--since", default=None,
+            help="Only rows with updated_at at or after this ISO date/datetime (incremental catch-up).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=None)
+        parser.add_argument("--threads", type=int, default=None)
+        parser.add_argument("--keep-old", action="store_true", help="Do not delete the previous index after the swap.")
+
+    def handle(self, *args, **options):
+        viewsets = self.select_viewsets(get_indexed_viewsets(), options["models"])
+        since = self.parse_since(options["since"])
+        incremental = since is not None or options["organization"] is not None
+
+        for index_name, viewset in viewsets.items():
+            queryset = self.get_queryset(viewset, options["organization"], since)
+            if queryset is None:
+                continue
+            if incremental:
+                self.catch_up(viewset, index_name, queryset, options)
+            else:
+                self.rebuild(viewset, index_name, queryset, options)
+
+    def select_viewsets(self, viewsets, selected):
+        if not selected:
+            return viewsets
+        chosen = {}
+        for name in selected:
+            matches = {
+                index_name: viewset for index_name, viewset in viewsets.items()
+                if name == index_name or name.lower() == viewset.queryset.model._meta.label_lower
+            }
+            if not matches:
+                raise CommandError(f"No Elasticsearch viewset for '{name}'. Known indices: {', '.join(sorted(viewsets))}")
+            chosen.update(matches)
+        return chosen
+
+    def parse_since(self, value):
+        if not value:
+            return None
+        since = parse_datetime(value)
+        if since is None:
+            day = parse_date(value)
+            if day is None:
+                raise CommandError(f"--since must be an ISO date or datetime, got '{value}'")
+            since = datetime(day.year, day.month, day.day)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+    def get_queryset(self, viewset, organization_id, since):
+        queryset = viewset.queryset.all()
+        model = queryset.model
+        if organization_id is not None:
+            if model._meta.label == "organization.Organization":
+                queryset = queryset.filter(pk=organization_id)
+            elif _has_field(model, "organization"):
+                queryset = queryset.filter(organization_id=organization_id)
+            else:
+                self.stdout.write(self.style.WARNING(f"Skipping {model._meta.label}: no organization field"))
+                return None
+        if since is not None:
+            if not _has_field(model, "updated_at"):
+                self.stdout.write(self.style.WARNING(f"Skipping {model._meta.label}: no updated_at field"))
+                return None
+            queryset = queryset.filter(updated_at__gte=since)
+        return queryset.order_by("pk")
+
+    def bulk_load(self, viewset, index_name, queryset, options):
+        def progress(stats):
+            self.stdout.write(f"  {index_name}: {stats['indexed']} indexed, {stats['failed']} failed")
+
+        return viewset().bulk_index_queryset(
+            queryset, index_name,
+            chunk_size=options["chunk_size"], thread_count=options["threads"], progress_callback=progress,
+        )
+
+    def catch_up(self, viewset, index_name, queryset, options):
+        self.stdout.write(f"🔄 Re-indexing {queryset.count()} rows into {index_name}")
+        stats = self.bulk_load(viewset, index_name, queryset, options)
+        if stats["failed"]:
+            raise CommandError(f"{index_name}: {stats['failed']} documents failed: {stats['errors']}")
+        self.stdout.write(self.style.SUCCESS(f"✅ {index_name}: {stats['indexed']} documents re-indexed"))
+
+    def rebuild(self, viewset, index_name, queryset, options):
+        new_index = f"{index_name}_{timezone.now().strftime('%Y%m%d%H%M%S')}"
+        expected = queryset.count()
+        self.stdout.write(f"🚀 Building {new_index} with {expected} documents")
+
+        # No refreshes while loading; the index is not searchable until the swap anyway
+        body = get_index_body(index_name)
+        refresh_interval = body["settings"]["index"].get("refresh_interval")
+        body["settings"]["index"]["refresh_interval"] = "-1"
+        es.indices.create(index=new_index, settings=body["settings"], mappings=body["mappings"])
+        try:
+            stats = self.bulk_load(viewset, new_index, queryset, options)
+            es.indices.put_settings(index=new_index, settings={"index": {"refresh_interval": refresh_interval}})
+            es.indices.refresh(index=new_index)
+            count = es.count(index=new_index)["count"]
+            if stats["failed"] or count != expected:
+                raise CommandError(
+                    f"{new_index}: expected {expected} documents, found {count} "
+                    f"({stats['failed']} failed: {stats['errors']}); alias left unchanged"
+                )
+        except Exception:
+            es.indices.delete(index=new_index, ignore_unavailable=True)
+            raise
+
+        old_indices = self.swap_alias(index_name, new_index)
+        self.stdout.write(self.style.SUCCESS(f"✅ {index_name} -> {new_index} ({count} documents)"))
+
+        if not options["keep_old"]:
+            for old_index in old_indices:
+                es.indices.delete(index=old_index, ignore_unavailable=True)
+                self.stdout.write(f"🗑️ Deleted {old_index}")
+
+    def swap_alias(self, alias, new_index):
+        """
+        Point ``alias`` at ``new_index`` in one update_aliases call. A concrete
+        index still named like the alias (the pre-alias layout) is removed in
+        the same atomic request. Returns the indices the alias used to point to.
+        """
+        actions = [{"add": {"index": new_index, "alias": alias}}]
+        old_indices = []
+        if es.indices.exists_alias(name=alias):
+            old_indices = list(es.indices.get_alias(name=alias))
+            actions = [{"remove": {"index": index, "alias": alias}} for index in old_indices] + actions
+        elif es.indices.exists(index=alias):
+            actions.insert(0, {"remove_index": {"index": alias}})
+        es.indices.update_aliases(actions=actions)
+        return old_indices
@@ -1,6 +1,104 @@
+import hashlib
+import logging
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from rest_framework import exceptions
 from rest_framework.metadata import SimpleMetadata
+from rest_framework.request import clone_request
+
+from core import cache_tags
+from core.on_commit import AfterCommitBatch
+from core.tenancy import get_tenancy
+from core.ui_options import is_remote, remote_options
 from rbac.models import Entity
 
+logger = logging.getLogger(__name__)
+
+METADATA_CACHE_DEFAULTS = {
+    "TIMEOUT": 3600,  # seconds, 0 disables the cache
+}
+
+ENTITY_TAG = cache_tags.model_tag("core.Entity")
+
+
+def get_metadata_cache_settings():
+    return {**METADATA_CACHE_DEFAULTS, **getattr(settings, "METADATA_CACHE", {})}
+
+
+def _entity_version_key(url_path):
+    return f"ui_metadata:entity:{url_path}"
+
+
+def get_entity_version(url_path):
+    """updated_at of the Entity behind ``url_path``, cached until the Entity is saved."""
+    key = _entity_version_key(url_path)
+    version = cache.get(key)
+    if version is None:
+        updated_at = Entity.objects.filter(url_path=url_path).values_list("updated_at", flat=True).first()
+        version = updated_at.isoformat() if updated_at else "none"
+        cache.set(key, version, timeout=None)
+    return version
+
+
+def invalidate_entity_metadata(entity):
+    """
+    Called on Entity save/delete. The path's version follows updated_at and
+    the Entity tag is bumped so renamed or deleted paths are dropped as well.
+    """
+    try:
+        version = entity.updated_at.isoformat() if entity.updated_at else "none"
+        cache.set(_entity_version_key(entity.url_path), version, timeout=None)
+        cache_tags.bump(ENTITY_TAG)
+    except Exception:
+        logger.warning(f"Could not invalidate OPTIONS metadata for {entity.url_path}", exc_info=True)
+
+
+@lru_cache(maxsize=None)
+def option_source_labels():
+    """Labels of every model a relation points to, i.e. that can feed inline select options."""
+    return frozenset(
+        field.related_model._meta.label_lower
+        for model in apps.get_models()
+        for field in model._meta.get_fields()
+        if field.is_relation and field.related_model is not None and not field.auto_created
+    )
+
+
+def inline_option_labels(serializer):
+    """Labels of the related models whose rows build_ui_post() inlines as options."""
+    labels = set()
+    for field in serializer.fields.values():
+        queryset = getattr(getattr(field, "child_relation", field), "queryset", None)
+        if queryset is not None and not is_remote(queryset.model):
+            labels.add(queryset.model._meta.label_lower)
+    return sorted(labels)
+
+
+def _bump_option_models(labels):
+    try:
+        cache_tags.bump(*[cache_tags.model_tag(label) for label in labels])
+    except Exception:
+        logger.warning(f"Could not invalidate OPTIONS metadata for {sorted(labels)}", exc_info=True)
+
+
+option_model_bumps = AfterCommitBatch(_bump_option_models)
+
+
+def invalidate_option_model(model, using=None):
+    """
+    Called on every save/delete. Metadata inlining the rows of ``model`` embeds
+    its model tag, bumped once the write is committed so a concurrent rebuild
+    cannot cache the old rows under the new version.
+    """
+    label = model._meta.label_lower
+    if label in option_source_labels():
+        option_model_bumps.add(lambda batch: batch.add(label), using)
+
 
 class CustomUIMetadata(SimpleMetadata):
     def inject_tab_in_post_fields(self, entity, post_response):
@@ -10,7 +108,95 @@ class CustomUIMetadata(SimpleMetadata):
                     post_response[field]["tab"] = tab
         return post_response
 
+    def get_permitted_actions(self, request, view):
+        """Methods determine_actions() describes for this user, the same checks DRF runs."""
+        permitted = []
+        for method in sorted({"PUT", "POST"} & set(view.allowed_methods)):
+            view.request = clone_request(request, method)
+            try:
+                if hasattr(view, "check_permissions"):
+                    view.check_permissions(view.request)
+                if method == "PUT" and hasattr(view, "get_object"):
+                    view.get_object()
+            except (exceptions.APIException, PermissionDenied, Http404):
+                continue
+            else:
+                permitted.append(method)
+            finally:
+                view.request = request
+        return permitted
+
+    def get_cached_permitted_actions(self, request, view):
+        """
+        get_permitted_actions() per (user, entity path), so a cached OPTIONS
+        response does not run the permission checks and get_object() again.
+        Versioned by the Entity, the user's group permissions, users and the
+        view's model; the tenancy is part of the key.
+        """
+        user = request.user
+        queryset = getattr(view, "queryset", None)
+        tags = [ENTITY_TAG, cache_tags.model_tag(settings.AUTH_USER_MODEL)]
+        if getattr(user, "group_id", None):
+            from rbac.permissions import group_permissions_tag  # Avoid circular import
+            tags.append(group_permissions_tag(user.group_id))
+        if queryset is not None:
+            tags.append(cache_tags.model_tag(queryset.model._meta.label))
+        raw = f"{user.pk}|{request.path}|{get_tenancy(request)!r}"
+        key = cache_tags.versioned_key(f"ui_metadata:actions:{hashlib.md5(raw.encode('utf-8')).hexdigest()}", tags)
+
+        permitted = cache.get(key)
+        if permitted is None:
+            permitted = self.get_permitted_actions(request, view)
+            cache.set(key, permitted, timeout=get_metadata_cache_settings()["TIMEOUT"])
+        return permitted
+
+    def get_metadata_cache_key(self, request, view):
+        """
+        Keyed by absolute URI, serializer class, Entity updated_at and the
+        actions the user may perform. Every key embeds the Entity tag version
+        and the model tags of the related models whose options are inlined.
+        """
+        serializer = view.get_serializer()
+        serializer_class = (
+            view.get_serializer_class() if hasattr(view, "get_serializer_class") else type(serializer)
+        )
+        raw = "|".join([
+            request.build_absolute_uri(),
+            f"{serializer_class.__module__}.{getattr(serializer_class, '__qualname__', serializer_class)}",
+            get_entity_version(request.path),
+            ",".join(self.get_cached_permitted_actions(request, view)),
+        ])
+        digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+        tags = [ENTITY_TAG] + [cache_tags.model_tag(label) for label in inline_option_labels(serializer)]
+        return cache_tags.versioned_key(f"ui_metadata:{digest}", tags)
+
     def determine_metadata(self, request, view):
+        """
+        OPTIONS responses are cached (settings.METADATA_CACHE): building them
+        introspects every serializer field and loads the options of related
+        fields. A cache outage only means the metadata is built uncached.
+        """
+        timeout = get_metadata_cache_settings()["TIMEOUT"]
+        if not timeout or not hasattr(view, "get_serializer"):
+            return self.build_metadata(request, view)
+
+        try:
+            cache_key = self.get_metadata_cache_key(request, view)
+            metadata = cache.get(cache_key)
+        except Exception:
+            logger.warning("OPTIONS metadata cache unavailable", exc_info=True)
+            return self.build_metadata(request, view)
+        if metadata is not None:
+            return metadata
+
+        metadata = self.build_metadata(request, view)
+        try:
+            cache.set(cache_key, metadata, timeout=timeout)
+        except Exception:
+            logger.warning("Could not cache OPTIONS metadata", exc_info=True)
+        return metadata
+
+    def build_metadata(self, request, view):
         default = super().determine_metadata(request, view)
 
         if not hasattr(view, "get_serializer"):
@@ -135,8 +321,17 @@ class CustomUIMetadata(SimpleMetadata):
             }
 
             field = serializer.fields.get(field_name)
+            queryset = getattr(field, "queryset", None)
+
+            # Large registered models are searched through the options endpoint;
+            # checked first since related fields also expose every row as choices
+            if queryset is not None and is_remote(queryset.model):
+                new_field["type"] = "select"
+                new_field.update(remote_options(queryset.model))
+                new_field["bindLabel"] = "label"
+                new_field["bindValue"] = "value"
 
-            if hasattr(field, "choices") and isinstance(field.choices, dict):
+            elif hasattr(field, "choices") and isinstance(field.choices, dict):
                 new_field["type"] = "select"
                 new_field["options"] = [
                     {"label": str(label), "value": value}
@@ -1,50 +1,212 @@
-import uuid
+"""
+API audit logging.
+
+APILoggingMiddleware turns every sampled request into one document and hands it
+to a bounded in-process BulkQueue (core.es_queue); a background thread ships
+the documents to daily ``<INDEX_PREFIX>-YYYY.MM.DD`` indices through bulk. The
+request thread never talks to Elasticsearch: when the queue is full the
+document is dropped and counted instead of waiting.
+
+Token endpoints (SENSITIVE_PATHS) are never logged, and the values of token,
+password and secret like keys in captured bodies are replaced by REDACTED.
+"""
+import atexit
+import functools
 import logging
-import json
-from django.utils.deprecation import MiddlewareMixin
-from elasticsearch import Elasticsearch
+import random
+import re
+import threading
+import time
+import uuid
+
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+from django.utils.deprecation import MiddlewareMixin
+
+from core.es_client import get_client
+from core.es_queue import BulkQueue, InMemoryQueueBackend
 
 logger = logging.getLogger(__name__)
 
+AUDIT_DEFAULTS = {
+    "ENABLED": False,
+    "INDEX_PREFIX": "api_logs",
+    "INDEX_DATE_FORMAT": "%Y.%m.%d",
+    "EXCLUDE_PATHS": ["/auth"],
+    # Endpoints returning credentials, excluded on top of EXCLUDE_PATHS
+    "SENSITIVE_PATHS": ["/auth", "/google-auth", "/admin/login"],
+    # Body keys containing any of these (case insensitive) have their value redacted
+    "REDACT_KEYS": ["token", "access", "refresh", "password", "secret", "key", "authorization"],
+    "SAMPLE_RATE": 1.0,
+    # Path prefix -> sample rate, the longest matching prefix wins
+    "PATH_SAMPLE_RATES": {},
+    # Responses with at least this status are always logged (None disables)
+    "ALWAYS_LOG_STATUS": 400,
+    "MAX_BODY_BYTES": 1024,
+    "BODY_CONTENT_TYPES": ["application/json", "text/"],
+    "MAX_QUEUE_SIZE": 5000,
+    "BATCH_SIZE": 200,
+    "FLUSH_INTERVAL": 2.0,  # seconds
+    "MAX_RETRIES": 1,
+    "RETRY_BACKOFF": 0.5,
+}
+
+
+def get_audit_settings():
+    return {**AUDIT_DEFAULTS, **getattr(settings, "AUDIT_LOGGING", {})}
+
+
+def audit_index_name(timestamp, config=None):
+    config = config or get_audit_settings()
+    return f"{config['INDEX_PREFIX']}-{timestamp.strftime(config['INDEX_DATE_FORMAT'])}"
+
+
+REDACTED = "[REDACTED]"
+
+
+def should_log(path, status_code, config=None):
+    config = config or get_audit_settings()
+    if any(path.startswith(prefix) for prefix in [*config["SENSITIVE_PATHS"], *config["EXCLUDE_PATHS"]]):
+        return False
+    always_status = config["ALWAYS_LOG_STATUS"]
+    if always_status is not None and status_code >= always_status:
+        return True
+
+    rate = config["SAMPLE_RATE"]
+    matched = ""
+    for prefix, prefix_rate in config["PATH_SAMPLE_RATES"].items():
+        if path.startswith(prefix) and len(prefix) > len(matched):
+            matched, rate = prefix, prefix_rate
+    if rate >= 1:
+        return True
+    return rate > 0 and random.random() < rate
+
+
+@functools.lru_cache(maxsize=8)
+def _redact_pattern(keys):
+    # "<key containing a redact word>": "<value>" or a bare value, also when the
+    # capped body cuts the value short
+    words = "|".join(re.escape(key) for key in keys)
+    return re.compile(
+        rf'("[^"]*(?:{words})[^"]*"\s*:\s*)("(?:[^"\\]|\\.)*(?:"|$)|[^,{{}}\[\]\s]+)',
+        re.IGNORECASE,
+    )
+
+
+def redact_body(body, config=None):
+    """Replaces the values of REDACT_KEYS keys in a JSON (or JSON like) body."""
+    config = config or get_audit_settings()
+    if not body or not config["REDACT_KEYS"]:
+        return body
+    return _redact_pattern(tuple(config["REDACT_KEYS"])).sub(rf'\1"{REDACTED}"', body)
+
+
+def capture_body(response, config=None):
+    """
+    (body, size) with at most MAX_BYTES of the rendered content, decoded as
+    text and redacted. Streaming responses and non text content types are
+    not captured.
+    """
+    config = config or get_audit_settings()
+    max_bytes = config["MAX_BODY_BYTES"]
+    if not max_bytes or getattr(response, "streaming", False):
+        return None, None
+    content_type = response.get("Content-Type", "")
+    if not any(content_type.startswith(prefix) for prefix in config["BODY_CONTENT_TYPES"]):
+        return None, None
+    content = response.content
+    return redact_body(content[:max_bytes].decode("utf-8", errors="replace"), config), len(content)
+
+
+_audit_queue = None
+_audit_queue_lock = threading.Lock()
+
+
+def get_audit_queue():
+    """Process wide, non blocking queue of audit documents."""
+    global _audit_queue
+    if _audit_queue is None:
+        with _audit_queue_lock:
+            if _audit_queue is None:
+                config = get_audit_settings()
+                _audit_queue = BulkQueue(
+                    InMemoryQueueBackend(config["MAX_QUEUE_SIZE"]),
+                    get_client,
+                    batch_size=config["BATCH_SIZE"],
+                    flush_interval=config["FLUSH_INTERVAL"],
+                    max_retries=config["MAX_RETRIES"],
+                    retry_backoff=config["RETRY_BACKOFF"],
+                    block=False,
+                    name="api-audit-queue",
+                )
+                atexit.register(_flush_at_exit)
+    return _audit_queue
+
+
+def reset_audit_queue():
+    global _audit_queue
+    with _audit_queue_lock:
+        if _audit_queue is not None:
+            _audit_queue.stop()
+        _audit_queue = None
+
+
+def _flush_at_exit():
+    if _audit_queue is not None:
+        _audit_queue.stop()
+        try:
+            _audit_queue.flush()
+        except Exception as e:
+            logger.error(f"api-audit-queue: flush at exit failed: {e}")
+
 
 class APILoggingMiddleware(MiddlewareMixin):
     async_mode = False  # ✅ Required for Django 5.1+
 
     def __init__(self, get_response):
-        self.get_response = get_response
-        self.es = Elasticsearch(settings.ELASTICSEARCH_DSL["default"]["hosts"])
+        if not get_audit_settings()["ENABLED"]:
+            raise MiddlewareNotUsed("AUDIT_LOGGING is disabled")
+        super().__init__(get_response)
 
     def process_request(self, request):
         request.request_id = str(uuid.uuid4())
+        request._audit_started = time.monotonic()
 
     def process_response(self, request, response):
-        if request.path.startswith("/auth"):
-            return response
-
-        def sanitize_body(data, max_keys=10):
-            if isinstance(data, dict):
-                return {k: str(data[k])[:100] for k in list(data)[:max_keys]}
-            return str(data)[:300]
-
         try:
-            raw_body = json.loads(response.content.decode("utf-8")) if response.get("Content-Type", "").startswith("application/json") else None
-            body = sanitize_body(raw_body)
-        except Exception as e:
-            logger.warning(f"Could not decode response body: {e}")
+            self.log_response(request, response)
+        except Exception as e:  # Audit logging must never break a response
+            logger.error(f"Failed to queue API log: {e}")
+        return response
 
-        log_data = {
-            "request_id": getattr(request, "request_id", str(uuid.uuid4())),
-            "method": request.method,
-            "path": request.path,
-            "status_code": response.status_code,
-            "user": request.user.id if hasattr(request, "user") and request.user.is_authenticated else None,
-            "body": body
-        }
+    def log_response(self, request, response):
+        config = get_audit_settings()
+        if not should_log(request.path, response.status_code, config):
+            return
 
-        try:
-            self.es.index(index="api_logs", body=log_data)
-        except Exception as e:
-            logger.error(f"Failed to index log to Elasticsearch: {e}")
+        timestamp = timezone.now()
+        request_id = getattr(request, "request_id", None) or str(uuid.uuid4())
+        started = getattr(request, "_audit_started", None)
+        user = getattr(request, "user", None)
+        body, body_size = capture_body(response, config)
 
-        return response
+        queued = get_audit_queue().put({
+            "_op_type": "index",
+            "_index": audit_index_name(timestamp, config),
+            "_id": request_id,
+            "_source": {
+                "@timestamp": timestamp.isoformat(),
+                "request_id": request_id,
+                "method": request.method,
+                "path": request.path,
+                "status_code": response.status_code,
+                "duration_ms": round((time.monotonic() - started) * 1000, 2) if started is not None else None,
+                "user": user.id if user is not None and user.is_authenticated else None,
+                "body": body,
+                "body_size": body_size,
+                "body_truncated": body_size is not None and body_size > config["MAX_BODY_BYTES"],
+            },
+        })
+        if not queued:
+            logger.debug(f"api-audit-queue full, dropped log of {request.method} {request.path}")
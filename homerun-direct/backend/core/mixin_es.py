@@ -1,8 +1,14 @@
 import json
-from elasticsearch import Elasticsearch
+import logging
+from itertools import islice
+from elasticsearch import NotFoundError
 from django.conf import settings
+from django.core import signing
 from django.db.models.query import QuerySet
-from elasticsearch.helpers import bulk
+from elasticsearch.helpers import parallel_bulk, streaming_bulk
+from core.es_client import get_client
+from core.es_mappings import NGRAM_MIN_GRAM, ensure_index, get_index_properties
+from core.es_queue import enqueue_delete, enqueue_index, get_indexing_settings
 from core.models import *
 from organization.models import *
 from property.models import *
@@ -12,10 +18,73 @@ from rest_framework.exceptions import ValidationError
 from datetime import date, datetime, time
 from decimal import Decimal
 
-es = Elasticsearch(settings.ELASTICSEARCH_DSL["default"]["hosts"])
+es = get_client()
+logger = logging.getLogger(__name__)
+
+FILTER_OPERATORS = ("exact", "in", "gte", "lte", "gt", "lt", "icontains", "istartswith")
+
+# Operator sets for filterable_fields declarations
+EXACT_OPERATORS = ("exact", "in")
+RANGE_OPERATORS = ("exact", "in", "gte", "lte", "gt", "lt")
+TEXT_OPERATORS = ("exact", "in", "icontains", "istartswith")
+BOOLEAN_OPERATORS = ("exact",)
+
+# Mapping type -> operators that make sense on it; other types only get EXACT_OPERATORS
+TYPE_OPERATORS = {
+    "text": TEXT_OPERATORS,
+    "keyword": TEXT_OPERATORS,
+    "boolean": BOOLEAN_OPERATORS,
+    **{
+        es_type: RANGE_OPERATORS
+        for es_type in (
+            "long", "integer", "short", "byte", "unsigned_long", "double", "float", "half_float", "scaled_float",
+            "date", "date_nanos",
+        )
+    },
+}
+
+# Query params that steer the list endpoints rather than filter it
+CONTROL_PARAMS = {"page", "per_page", "search", "ordering", "cursor", "facets", "format", "fields", "exclude"}
+
+# How long a point in time stays open between two cursor pages
+PIT_KEEP_ALIVE = "2m"
+
+def type_operators(properties, field, default=EXACT_OPERATORS):
+    """
+    Operators the mapping type of ``field`` (dotted for nested fields, or an FK
+    attname such as unit_id) can serve; ``default`` when it is not mapped.
+    """
+    mapping = None
+    names = field.split(".")
+    for i, name in enumerate(names):
+        mapping = properties.get(name)
+        if mapping is None and i == len(names) - 1 and name.endswith("_id"):
+            mapping = properties.get(name[:-3])
+        if mapping is None:
+            return default
+        properties = mapping.get("properties", {})
+    if mapping.get("enabled") is False:
+        return ()
+    if "type" not in mapping:
+        return default
+    return TYPE_OPERATORS.get(mapping["type"], EXACT_OPERATORS)
+
 
 # Generic Elasticsearch utility
 class ElasticsearchIndexMixin:
+    # Fields clients may ask bucket counts for with ?facets=a,b
+    facet_fields = ()
+    facet_size = 20
+    # None falls back to settings.ES_TRACK_TOTAL_HITS
+    track_total_hits = None
+    # Query params accepted as filters: {field: ["exact", "in", "gte", ...]} or a
+    # list of fields (every operator their mapping type allows). None derives
+    # them from the index mapping.
+    filterable_fields = None
+    # Default _source projection of list responses; ?fields= / ?exclude= override it
+    source_includes = None
+    source_excludes = ()
+
     def serialize_for_elasticsearch(self,data):
         def convert(value):
             if isinstance(value, (datetime, date, time)):
@@ -36,24 +105,24 @@ class ElasticsearchIndexMixin:
     def index_to_elasticsearch(self, instance, index_name):
         data = self.serialize_instance(instance)
         serialized_doc = self.serialize_for_elasticsearch(data)
+        ensure_index(es, index_name)
         es.index(index=index_name, id=instance.pk, body=serialized_doc)
 
     def delete_from_elasticsearch(self, pk, index_name):
         es.delete(index=index_name, id=pk, ignore=[404])
 
-    def serialize_instance(self, instance):
-        # Default to model's to_dict() or full model data
-        from django.db.models import Model
+    def serialize_instance(self, instance, organization_ids=None):
+        """
+        Flat document for ``instance``. Relations are stored as their raw
+        ``*_id`` value so no related row is fetched. ``organization_ids``
+        ({property_id: organization_id}, see get_organization_ids) saves the
+        OrganizationProperty lookup when serializing a batch of properties.
+        """
         data = {}
 
-        # Get flat model fields first
+        # Get flat model fields first; attname is "<fk>_id" for relations
         for field in instance._meta.fields:
-            field_name = field.name
-            value = getattr(instance, field_name)
-            if isinstance(value, Model):
-                data[field_name] = value.pk  # Store FK as ID
-            else:
-                data[field_name] = value
+            data[field.name] = getattr(instance, field.attname)
 
         # Flatten Location extra fields
         location = getattr(instance, "location", None)
@@ -68,101 +137,436 @@ class ElasticsearchIndexMixin:
             data["longitude"] = location.longitude
 
         if isinstance(instance, Property):
-            org_prop = OrganizationProperty.objects.filter(property=instance).first()
-            data["organization_id"] = org_prop.organization.id if org_prop and org_prop.organization else None
+            if organization_ids is None:
+                organization_ids = self.get_organization_ids([instance.pk])
+            data["organization_id"] = organization_ids.get(instance.pk)
 
         return data
 
+    def get_serialization_plan(self, model):
+        """
+        select_related / prefetch_related lookups serialize_instance() reads
+        through for ``model``: only the Location it flattens. Other relations
+        are serialized from their ``*_id`` column and many-to-many fields are
+        not serialized, so nothing needs prefetching.
+        """
+        select_related = [
+            field.name for field in model._meta.fields
+            if field.name == "location" and field.is_relation and field.related_model is Location
+        ]
+        return {"select_related": select_related, "prefetch_related": []}
+
+    def get_organization_ids(self, property_ids):
+        """{property_id: organization_id} in one query, first mapping per property like .first()."""
+        organization_ids = {}
+        rows = (
+            OrganizationProperty.objects.filter(property_id__in=property_ids)
+            .order_by("pk").values_list("property_id", "organization_id")
+        )
+        for property_id, organization_id in rows:
+            organization_ids.setdefault(property_id, organization_id)
+        return organization_ids
+
+    def serialize_batch(self, instances):
+        """serialize_instance() for a chunk of rows with one OrganizationProperty query at most."""
+        property_ids = [instance.pk for instance in instances if isinstance(instance, Property)]
+        organization_ids = self.get_organization_ids(property_ids) if property_ids else {}
+        return [self.serialize_instance(instance, organization_ids) for instance in instances]
+
     def search_elasticsearch(self, index_name, query, page=1, per_page=20):
-        print(index_name)
-        print(query)
-        from math import ceil
+        return self.search_elasticsearch_page(index_name, query, page, per_page)["results"]
+
+    def get_track_total_hits(self):
+        """True counts exactly, an int counts exactly up to that many hits (cheaper on big indices)."""
+        if self.track_total_hits is not None:
+            return self.track_total_hits
+        return getattr(settings, "ES_TRACK_TOTAL_HITS", 10000)
+
+    def search_elasticsearch_page(self, index_name, query, page=1, per_page=20, aggs=None, source=None):
+        """
+        One from/size page plus the hit total (and facet buckets when ``aggs``
+        is given) from the same search request.
+        """
         start = (page - 1) * per_page
-        print("⚙️ Querying Elasticsearch:", json.dumps(query, indent=2))  # Debug line
+        body = {**query, "track_total_hits": self.get_track_total_hits()}
+        if aggs:
+            body["aggs"] = aggs
+        if source:
+            body["_source"] = source
         response = es.search(
             index=index_name,
-            body=query,
+            body=body,
             from_=start,
             size=per_page
         )
-        return [hit["_source"] for hit in response["hits"]["hits"]]
+        hits = response["hits"]
+        total = hits.get("total", {"value": len(hits["hits"]), "relation": "eq"})
+        if isinstance(total, int):
+            total = {"value": total, "relation": "eq"}
+        return {
+            "results": [hit["_source"] for hit in hits["hits"]],
+            "total": total["value"],
+            "relation": total["relation"],
+            "facets": self.parse_facets(response.get("aggregations", {})),
+        }
+
+    def build_facet_aggs(self, facets_param):
+        """terms aggregations for the comma separated ``?facets=`` fields, restricted to facet_fields."""
+        if not facets_param:
+            return None
+        requested = [name.strip() for name in facets_param.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in self.facet_fields]
+        if unknown:
+            raise ValidationError({"facets": f"Unsupported facets: {', '.join(unknown)}. Allowed: {', '.join(self.facet_fields)}"})
+
+        properties = get_index_properties(getattr(self, "index_name", None))
+        aggs = {}
+        for name in requested:
+            field = f"{name}.keyword" if "keyword" in properties.get(name, {}).get("fields", {}) else name
+            aggs[f"facet_{name}"] = {"terms": {"field": field, "size": self.facet_size}}
+        return aggs
+
+    def parse_facets(self, aggregations):
+        return {
+            key[len("facet_"):]: [{"value": b["key"], "count": b["doc_count"]} for b in agg.get("buckets", [])]
+            for key, agg in aggregations.items()
+            if key.startswith("facet_")
+        }
+
+    def get_source_filter(self, request, use_defaults=True):
+        """
+        _source includes/excludes from ?fields=a,b and ?exclude=c,d (wildcards
+        allowed), falling back to the viewset's source_includes/source_excludes.
+        Returns None when the full document is wanted.
+        """
+        def split(param):
+            value = request.query_params.get(param)
+            return [name.strip() for name in value.split(",") if name.strip()] if value else None
+
+        includes = split("fields")
+        excludes = split("exclude")
+        if use_defaults:
+            includes = includes if includes is not None else self.source_includes
+            excludes = excludes if excludes is not None else self.source_excludes
+
+        source = {}
+        if includes:
+            source["includes"] = list(dict.fromkeys(["id", *includes]))  # Rows stay identifiable
+        if excludes:
+            source["excludes"] = list(excludes)
+        return source or None
+
+    def get_elasticsearch_document(self, index_name, pk, request=None):
+        """_source of one document, projected by ?fields= / ?exclude= when a request is given."""
+        source = self.get_source_filter(request, use_defaults=False) if request is not None else None
+        params = {}
+        if source:
+            params = {"source_includes": source.get("includes"), "source_excludes": source.get("excludes")}
+        return es.get(index=index_name, id=pk, **{k: v for k, v in params.items() if v})["_source"]
+
+    def build_elasticsearch_sort(self, ordering=None):
+        """
+        ES sort for a DRF style ``ordering`` ("-check_in,name"), always ending
+        with ``id`` so documents with equal sort values keep a stable order.
+        """
+        properties = get_index_properties(getattr(self, "index_name", None))
+        sort = []
+        id_order = "asc"
+        for name in (ordering or "").split(","):
+            name = name.strip()
+            if not name:
+                continue
+            order = "desc" if name.startswith("-") else "asc"
+            field = name.lstrip("-")
+            if field.startswith("_"):
+                raise ValidationError({"ordering": f"Cannot order by {field}."})
+            if field == "id":
+                id_order = order
+                continue
+            if "keyword" in properties.get(field, {}).get("fields", {}):
+                field = f"{field}.keyword"  # Analyzed text cannot be sorted on
+            sort.append({field: {"order": order, "unmapped_type": "keyword"}})
+        sort.append({"id": {"order": id_order}})
+        return sort
+
+    @staticmethod
+    def cursor_salt(index_name):
+        return f"core.mixin_es.cursor:{index_name}"
+
+    def encode_cursor(self, index_name, pit_id, search_after, ordering):
+        """
+        Signed with the index name as salt: the client can neither change the
+        sort (a _script sort would run on the cluster) nor reuse the point in
+        time of another index.
+        """
+        payload = {"pit": pit_id, "after": search_after, "ordering": ordering or ""}
+        return signing.dumps(payload, salt=self.cursor_salt(index_name), compress=True)
+
+    def decode_cursor(self, index_name, cursor):
+        try:
+            payload = signing.loads(cursor, salt=self.cursor_salt(index_name))
+            return payload["pit"], payload["after"], payload["ordering"]
+        except (signing.BadSignature, KeyError, TypeError):
+            raise ValidationError({"cursor": "Invalid cursor."})
+
+    def search_elasticsearch_cursor(self, index_name, query, per_page=20, cursor=None, ordering=None, source=None):
+        """
+        One page of ``query`` using search_after on a point in time, so every
+        page costs the same however deep it is.
+
+        Returns (documents, next_cursor, total); next_cursor is None on the last page.
+        """
+        if cursor:
+            # The sort is rebuilt from the ordering of the first page, never taken from the client
+            pit_id, search_after, ordering = self.decode_cursor(index_name, cursor)
+        else:
+            pit_id = es.open_point_in_time(index=index_name, keep_alive=PIT_KEEP_ALIVE)["id"]
+            search_after = None
+        sort = self.build_elasticsearch_sort(ordering)
+
+        body = {
+            **query,
+            "size": per_page,
+            "sort": sort,
+            "track_total_hits": self.get_track_total_hits(),
+            "pit": {"id": pit_id, "keep_alive": PIT_KEEP_ALIVE},
+        }
+        if search_after is not None:
+            body["search_after"] = search_after
+        if source:
+            body["_source"] = source
+        try:
+            response = es.search(body=body)
+        except NotFoundError:
+            raise ValidationError({"cursor": "Cursor expired, start again without a cursor."})
+
+        hits = response["hits"]["hits"]
+        total = response["hits"].get("total", {}).get("value")
+        pit_id = response.get("pit_id", pit_id)
+        if len(hits) < per_page:
+            try:
+                es.close_point_in_time(id=pit_id)
+            except Exception as e:
+                logger.warning(f"Closing point in time failed: {e}")
+            return [hit["_source"] for hit in hits], None, total
+        return [hit["_source"] for hit in hits], self.encode_cursor(index_name, pit_id, hits[-1]["sort"], ordering), total
+
+    def get_filterable_fields(self):
+        """
+        {field: set of operators} accepted as query params, or None when the
+        viewset has nothing to validate against (no filterable_fields and no
+        known index mapping) and every param is passed through.
+        """
+        properties = get_index_properties(getattr(self, "index_name", None))
+        if self.filterable_fields is not None:
+            declared = self.filterable_fields
+            if not isinstance(declared, dict):
+                declared = {name: type_operators(properties, name) or FILTER_OPERATORS for name in declared}
+            fields = {name: set(ops) for name, ops in declared.items()}
+            fields.setdefault("organization_id", set(EXACT_OPERATORS))
+            return fields
+
+        if not properties:
+            return None
+        fields = {name: set(type_operators(properties, name)) for name in properties}
+        # Every ES list has always accepted ?organization_id=
+        fields.setdefault("organization_id", set(EXACT_OPERATORS))
+        queryset = getattr(self, "queryset", None)
+        if queryset is not None:
+            for field in queryset.model._meta.fields:
+                if field.is_relation:  # organization_id as well as organization
+                    fields[field.attname] = set(EXACT_OPERATORS)
+        return fields
 
     def build_elasticsearch_filters(self, query_params):
         """
-        Build a list of ES 'must' clauses from DRF request.query_params, supporting:
+        Build a list of ES filter-context clauses from DRF request.query_params,
+        meant for bool.filter (cached, not scored). Supports:
         - __in, __gte, __lte, __gt, __lt
         - __icontains, __istartswith
         - boolean true/false
         - comma-separated multi-value
         - nested fields (dot notation) wrapped in 'nested' query
+
+        Params that are not in get_filterable_fields(), or use an operator the
+        field does not allow or its mapping type cannot serve (icontains on a
+        date, gte on a boolean), raise ValidationError.
         """
-        must_clauses = []
+        filter_clauses = []
+        properties = get_index_properties(getattr(self, "index_name", None))
+        filterable = self.get_filterable_fields()
+        errors = {}
         # regex to split a key into field path and optional op suffix
         pattern = re.compile(r'^(?P<field>[\w\.]+?)(?:__(?P<op>in|gte|lte|gt|lt|icontains|istartswith))?$')
 
         for raw_key, raw_val in query_params.items():
             # control params
-            if raw_key in {"page", "per_page", "search", "ordering"}:
+            if raw_key in CONTROL_PARAMS:
                 continue
 
             m = pattern.match(raw_key)
+            if filterable is not None:
+                if not m or m.group("field").split(".")[0] not in filterable:
+                    errors[raw_key] = "Unknown filter."
+                    continue
+                if (m.group("op") or "exact") not in filterable[m.group("field").split(".")[0]]:
+                    errors[raw_key] = f"Operator not allowed for {m.group('field')}."
+                    continue
+            if m and (m.group("op") or "exact") not in type_operators(properties, m.group("field"), FILTER_OPERATORS):
+                errors[raw_key] = f"Operator not allowed for {m.group('field')}."
+                continue
             if not m:
                 # fallback: treat as a simple match
-                must_clauses.append({"match": {raw_key: raw_val}})
+                filter_clauses.append({"match": {raw_key: raw_val}})
                 continue
 
             field, op = m.group("field"), m.group("op")
             val = raw_val
+            subfields = properties.get(field, {}).get("fields", {})
+            # Exact and terms filters on text run against the keyword subfield
+            exact_field = f"{field}.keyword" if "keyword" in subfields else field
 
             # build the inner clause dict
             if op == "in":
-                clause = {"terms": {field: val.split(",")}}
+                clause = {"terms": {exact_field: val.split(",")}}
             elif op in {"gte", "lte", "gt", "lt"}:
                 range_key = op
                 clause = {"range": {field: {range_key: val}}}
             elif op == "icontains":
-                clause = {"wildcard": {field: f"*{val.lower()}*"}}
+                clause = self._contains_clause(field, val, subfields)
             elif op == "istartswith":
-                clause = {"prefix": {field: val.lower()}}
+                if "keyword" in subfields:
+                    clause = {"prefix": {exact_field: {"value": val, "case_insensitive": True}}}
+                else:
+                    clause = {"prefix": {field: val.lower()}}
             else:
                 # no suffix: detect boolean / multi / match
                 low = isinstance(val, str) and val.lower()
                 if low in {"true", "false"}:
                     clause = {"term": {field: low == "true"}}
                 elif isinstance(val, str) and "," in val:
-                    clause = {"terms": {field: val.split(",")}}
+                    clause = {"terms": {exact_field: val.split(",")}}
+                elif "keyword" in subfields:
+                    clause = {"term": {exact_field: {"value": val, "case_insensitive": True}}}
+                elif field in properties:
+                    clause = {"term": {field: val}}
                 else:
                     clause = {"match": {field: val}}
 
             # if this is a nested path, wrap it
             if "." in field:
                 path = field.split(".")[0]
-                must_clauses.append({
+                filter_clauses.append({
                     "nested": {
                         "path": path,
                         "query": clause
                     }
                 })
             else:
-                must_clauses.append(clause)
+                filter_clauses.append(clause)
 
-        return must_clauses
+        if errors:
+            raise ValidationError(errors)
+        return filter_clauses
+
+    def _contains_clause(self, field, val, subfields):
+        # n-grams avoid a leading wildcard scan; shorter values than a gram fall through
+        if "ngram" in subfields and len(val) >= NGRAM_MIN_GRAM:
+            return {"match": {f"{field}.ngram": {"query": val, "operator": "and"}}}
+        if "keyword" in subfields:
+            return {"wildcard": {f"{field}.keyword": {"value": f"*{val}*", "case_insensitive": True}}}
+        return {"wildcard": {field: f"*{val.lower()}*"}}
 
 
 class ElasticSearchMixin(ElasticsearchIndexMixin):
     def index_instance(self, instance, index_name):
-        self.index_to_elasticsearch(instance, index_name)
+        """
+        Queue the document for the background bulk indexer (settings.ES_INDEXING),
+        or index it inline when ASYNC is off.
+        """
+        if not get_indexing_settings()["ASYNC"]:
+            return self.index_to_elasticsearch(instance, index_name)
+        data = self.serialize_instance(instance)
+        enqueue_index(index_name, instance.pk, self.serialize_for_elasticsearch(data))
 
     def clear_index(self, instance, index_name):
-        self.delete_from_elasticsearch(instance.pk, index_name)
-
-    def bulk_index_queryset(self, queryset: QuerySet, index_name):
-        actions = [
-            {
-                "_index": index_name,
-                "_id": obj.pk,
-                "_source": self.serialize_instance(obj)
-            }
-            for obj in queryset
-        ]
-        bulk(es, actions)
\ No newline at end of file
+        if not get_indexing_settings()["ASYNC"]:
+            return self.delete_from_elasticsearch(instance.pk, index_name)
+        enqueue_delete(index_name, instance.pk)
+
+    def iter_index_actions(self, queryset, index_name, chunk_size):
+        """
+        Lazily build bulk actions, streaming rows from the database in chunks.
+        Every chunk is serialized with serialize_batch(), so the query count
+        does not grow with the number of rows.
+        """
+        if isinstance(queryset, QuerySet):
+            plan = self.get_serialization_plan(queryset.model)
+            if plan["select_related"]:  # select_related() without arguments follows every FK
+                queryset = queryset.select_related(*plan["select_related"])
+            queryset = queryset.prefetch_related(*plan["prefetch_related"])
+            objects = queryset.iterator(chunk_size=chunk_size)
+        else:
+            objects = iter(queryset)
+        while True:
+            chunk = list(islice(objects, chunk_size))
+            if not chunk:
+                return
+            for obj, data in zip(chunk, self.serialize_batch(chunk)):
+                yield {
+                    "_index": index_name,
+                    "_id": obj.pk,
+                    "_source": self.serialize_for_elasticsearch(data),
+                }
+
+    def bulk_index_queryset(self, queryset: QuerySet, index_name, chunk_size=None, thread_count=None,
+                            progress_callback=None, max_errors=10):
+        """
+        Stream ``queryset`` into ``index_name`` without materialising it.
+
+        Rows are read with .iterator(chunk_size) and sent in chunk_size bulk
+        requests, through parallel_bulk when thread_count > 1 and streaming_bulk
+        otherwise. Item failures are counted instead of aborting the run.
+        ``progress_callback(stats)`` is called after every chunk.
+
+        Returns {"indexed": int, "failed": int, "errors": [first max_errors item errors]}.
+        """
+        config = get_indexing_settings()
+        chunk_size = chunk_size or config["BULK_CHUNK_SIZE"]
+        thread_count = thread_count or config["BULK_THREAD_COUNT"]
+        actions = self.iter_index_actions(queryset, index_name, chunk_size)
+        ensure_index(es, index_name)
+
+        if thread_count > 1:
+            results = parallel_bulk(
+                es, actions, thread_count=thread_count, chunk_size=chunk_size,
+                raise_on_error=False, raise_on_exception=False,
+            )
+        else:
+            results = streaming_bulk(
+                es, actions, chunk_size=chunk_size, max_retries=config["MAX_RETRIES"],
+                initial_backoff=config["RETRY_BACKOFF"], raise_on_error=False, raise_on_exception=False,
+            )
+
+        stats = {"indexed": 0, "failed": 0, "errors": []}
+        for ok, item in results:
+            if ok:
+                stats["indexed"] += 1
+            else:
+                stats["failed"] += 1
+                if len(stats["errors"]) < max_errors:
+                    stats["errors"].append(item)
+            done = stats["indexed"] + stats["failed"]
+            if done % chunk_size == 0:
+                self._report_bulk_progress(index_name, stats, progress_callback)
+
+        if (stats["indexed"] + stats["failed"]) % chunk_size:
+            self._report_bulk_progress(index_name, stats, progress_callback)
+        if stats["failed"]:
+            logger.error(f"{index_name}: {stats['failed']} documents failed to index, first errors: {stats['errors']}")
+        return stats
+
+    def _report_bulk_progress(self, index_name, stats, progress_callback):
+        logger.info(f"{index_name}: indexed {stats['indexed']}, failed {stats['failed']}")
+        if progress_callback:
+            progress_callback(dict(stats))
@@ -1,4 +1,15 @@
 from django.core.cache import cache
+from core import cache_tags
+
+
+def get_raw_redis():
+    """Redis client behind the default cache, or None when it is not django-redis."""
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection("default")
+    except (ImportError, NotImplementedError):
+        return None
+
 
 class RedisCacheMixin:
     cache_timeout = 60 * 60  # 1 hour
@@ -21,35 +32,36 @@ class RedisCacheMixin:
         key = self.get_cache_key(model_name, pk)
         cache.delete(key)
 
-    def set_user_org_session(self, user):
+    def get_tagged_cache_key(self, model_name, pk=None, organization_id=None):
         """
-        Stores all organization data related to the user in Redis.
+        Cache key that embeds the generation of the model and of the model
+        inside one organization (or across all of them), see core.cache_tags.
+        A model wide invalidation therefore drops every entry.
         """
-        from organization.models import Organization  # Avoid circular import
-        from organization.serializers import OrganizationSerializer  # Ensure serializer exists
-
-        if user.is_superuser:
-            orgs = Organization.objects.all()
-            cache.set(f"user:{user.id}:all_organizations", True, timeout=self.cache_timeout)
+        tags = [cache_tags.model_tag(model_name)]
+        if organization_id is None:
+            tags.append(cache_tags.all_organizations_tag(model_name))
         else:
-            orgs = Organization.objects.filter(user=user)
-            cache.set(f"user:{user.id}:all_organizations", False, timeout=self.cache_timeout)
-
-        org_ids = []
-        org_data = []
-        for org in orgs:
-            org_ids.append(org.id)
-            serialized = OrganizationSerializer(org).data
-            org_data.append(serialized)
+            tags.append(cache_tags.organization_tag(model_name, organization_id))
+        return cache_tags.versioned_key(self.get_cache_key(model_name, pk), tags)
 
-        cache.set(f"user:{user.id}:organization_ids", org_ids, timeout=self.cache_timeout)
-        cache.set(f"user:{user.id}:organizations", org_data, timeout=self.cache_timeout)
+    def get_from_tagged_cache(self, model_name, pk=None, organization_id=None):
+        return cache.get(self.get_tagged_cache_key(model_name, pk, organization_id))
 
-    def get_user_org_ids(self, user):
-        return cache.get(f"user:{user.id}:organization_ids", [])
-
-    def get_user_orgs(self, user):
-        return cache.get(f"user:{user.id}:organizations", [])
+    def set_to_tagged_cache(self, model_name, data, pk=None, organization_id=None):
+        key = self.get_tagged_cache_key(model_name, pk, organization_id)
+        cache.set(key, data, timeout=self.cache_timeout)
 
-    def has_all_org_access(self, user):
-        return cache.get(f"user:{user.id}:all_organizations", False)
\ No newline at end of file
+    def invalidate_model_cache(self, model_name, organization_id=None):
+        """
+        O(1) invalidation of the tagged entries of a model: all of them, or
+        with ``organization_id`` those of that organization and the model wide
+        entries that include it.
+        """
+        if organization_id is None:
+            cache_tags.bump(cache_tags.model_tag(model_name))
+        else:
+            cache_tags.bump(
+                cache_tags.organization_tag(model_name, organization_id),
+                cache_tags.all_organizations_tag(model_name),
+            )
@@ -1,6 +1,7 @@
 from django.db import models
 from django.core.exceptions import ImproperlyConfigured
 from django.apps import apps
+from core.ui_options import is_remote, remote_options
 
 
 # Base model with automatic timestamps and extra fields
@@ -35,6 +36,8 @@ class Entity(models.Model):
     post_tabs = models.JSONField(default=dict, blank=True)
 
     post_order = models.JSONField(null=True, blank=True)  # <== New field
+    # Part of the OPTIONS metadata cache key (core.metadata)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.name} - {self.url_path}"
@@ -69,7 +72,17 @@ class Entity(models.Model):
             if field.auto_created or not hasattr(field, "verbose_name"):
                 continue
 
-            if isinstance(field, models.ForeignKey):
+            if isinstance(field, models.ForeignKey) and is_remote(field.related_model):
+                fields[field.name] = {
+                    "type": "select",
+                    "label": field.verbose_name.title(),
+                    "bindLabel": "label",
+                    "bindValue": "id",
+                    "required": not field.blank,
+                    **remote_options(field.related_model),
+                }
+
+            elif isinstance(field, models.ForeignKey):
                 rel_model = field.related_model
                 options = []
 
@@ -159,3 +172,28 @@ class Entity(models.Model):
             "permissions": self.permissions,
             "POST": self.POST,
         }
+
+
+class OutboxEvent(models.Model):
+    """
+    A row change waiting to be applied to Elasticsearch and Redis (core.outbox).
+    Written in the transaction of the change itself, so it exists exactly when
+    the change was committed.
+    """
+
+    INDEX = "index"
+    DELETE = "delete"
+    OPERATIONS = [(INDEX, "Index"), (DELETE, "Delete")]
+
+    model_label = models.CharField(max_length=100)  # app_label.modelname
+    object_pk = models.CharField(max_length=64)
+    operation = models.CharField(max_length=10, choices=OPERATIONS)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["attempts", "id"], name="core_outbox_pending_idx")]
+
+    def __str__(self):
+        return f"{self.operation} {self.model_label}:{self.object_pk}"
@@ -0,0 +1,48 @@
+"""
+Work collected during a transaction and applied once after it commits.
+
+Every add() merges into the open batch of the thread and database and
+registers an on_commit callback holding that batch. The first callback to run
+closes the batch and flushes it; the others find it closed and do nothing. A
+rolled back transaction drops its callbacks, so its batch stays open and is
+flushed with the next committed one; flushing must therefore be idempotent
+(rebuild or reindex from the database, not apply deltas).
+"""
+import threading
+from functools import partial
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+
+class AfterCommitBatch:
+    """
+    ``factory()`` makes an empty batch, ``flush(batch)`` applies one. Outside
+    a transaction the batch is flushed at once.
+    """
+
+    def __init__(self, flush, factory=set):
+        self.flush = flush
+        self.factory = factory
+        self._local = threading.local()
+
+    def _pending(self):
+        if not hasattr(self._local, "pending"):
+            self._local.pending = {}
+        return self._local.pending
+
+    def add(self, update, using=None):
+        """Merges into the open batch with ``update(batch)``."""
+        using = using or DEFAULT_DB_ALIAS
+        pending = self._pending()
+        batch = pending.get(using)
+        if batch is None:
+            batch = pending[using] = self.factory()
+        update(batch)
+        transaction.on_commit(partial(self._run, using, batch), using=using)
+
+    def _run(self, using, batch):
+        pending = self._pending()
+        if pending.get(using) is not batch:
+            return  # Flushed by an earlier callback of the same commit
+        del pending[using]
+        self.flush(batch)
@@ -0,0 +1,215 @@
+"""
+Transactional outbox between the database and Elasticsearch/Redis.
+
+With settings.OUTBOX["ENABLED"], every save or delete of a model with an
+indexed viewset (core.es_mappings.get_indexed_viewsets) or a registered
+handler writes an OutboxEvent in the same transaction (see core.signals). A
+rolled back change leaves no event behind. Writes from the admin, shell or
+management commands are captured the same way as API writes. Note that
+QuerySet.update() and bulk_create() send no signals.
+
+drain() applies the pending events in batches. Events are deduplicated per
+(model, pk) and the row is re-read as it is now: present rows are indexed and
+missing ones deleted, so the order and number of events for a row do not
+matter. Applying a change is idempotent. A failed change keeps its events for
+the next drain, until OUTBOX["MAX_ATTEMPTS"].
+
+Several drain workers can run side by side: events are claimed with SKIP
+LOCKED and a row is only applied by the worker holding its oldest pending
+event. Any other worker skips the row and leaves its events for later, so an
+older read of a row can never be indexed after a newer one.
+"""
+import logging
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Min
+from elasticsearch.helpers import bulk
+
+from core.es_client import get_client
+from core.es_mappings import ensure_index, get_indexed_viewsets
+from core.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DEFAULTS = {
+    "ENABLED": False,
+    "BATCH_SIZE": 500,
+    "MAX_ATTEMPTS": 5,
+    "POLL_INTERVAL": 1.0,  # seconds between drains of drain_outbox --loop
+}
+
+# model label -> [handler(instances, deleted_pks)], for the non Elasticsearch side effects
+_handlers = defaultdict(list)
+_indices = None
+
+
+def get_outbox_settings():
+    return {**OUTBOX_DEFAULTS, **getattr(settings, "OUTBOX", {})}
+
+
+def outbox_enabled():
+    return get_outbox_settings()["ENABLED"]
+
+
+def register_outbox_handler(model_label, handler):
+    """Run ``handler(instances, deleted_pks)`` for every drained batch of ``model_label``."""
+    _handlers[model_label.lower()].append(handler)
+
+
+def get_outbox_indices():
+    """{model label: [(index_name, viewset class), ...]}"""
+    global _indices
+    if _indices is None:
+        indices = defaultdict(list)
+        for index_name, viewset in get_indexed_viewsets().items():
+            indices[viewset.queryset.model._meta.label_lower].append((index_name, viewset))
+        _indices = dict(indices)
+    return _indices
+
+
+def is_tracked(model):
+    label = model._meta.label_lower
+    return label in _handlers or label in get_outbox_indices()
+
+
+def record_changes(model, pks, operation, using=None):
+    """Queue ``operation`` for rows ``pks`` of ``model`` in the current transaction."""
+    if not pks or not outbox_enabled() or model is OutboxEvent or not is_tracked(model):
+        return
+    label = model._meta.label_lower
+    OutboxEvent.objects.using(using or "default").bulk_create([
+        OutboxEvent(model_label=label, object_pk=str(pk), operation=operation) for pk in pks
+    ])
+
+
+def record_change(instance, operation, using=None):
+    record_changes(type(instance), [instance.pk], operation, using or instance._state.db)
+
+
+def apply_changes(model_label, pks):
+    """
+    Bring Elasticsearch and the registered handlers in line with rows ``pks``
+    of ``model_label``. Returns {pk: error} for the rows that failed.
+    """
+    model = apps.get_model(model_label)
+    pk_field = model._meta.pk
+    wanted = {pk_field.to_python(pk): pk for pk in pks}
+    queryset = model._default_manager.filter(pk__in=list(wanted))
+
+    instances = None
+    errors = {}
+    for index_name, viewset_class in get_outbox_indices().get(model_label, []):
+        viewset = viewset_class()
+        if instances is None:
+            plan = viewset.get_serialization_plan(model)
+            if plan["select_related"]:
+                queryset = queryset.select_related(*plan["select_related"])
+            instances = list(queryset.prefetch_related(*plan["prefetch_related"]))
+        errors.update(_sync_index(viewset, index_name, instances, wanted))
+
+    if _handlers.get(model_label):
+        if instances is None:
+            instances = list(queryset)
+        present = {instance.pk for instance in instances}
+        deleted_pks = [pk for pk in wanted if pk not in present]
+        for handler in _handlers[model_label]:
+            handler(instances, deleted_pks)
+    return errors
+
+
+def _sync_index(viewset, index_name, instances, wanted):
+    present = {instance.pk for instance in instances}
+    actions = list(viewset.iter_index_actions(instances, index_name, len(instances) or 1))
+    actions += [
+        {"_op_type": "delete", "_index": index_name, "_id": pk}
+        for pk in wanted if pk not in present
+    ]
+    client = get_client()
+    ensure_index(client, index_name)
+    _, failures = bulk(client, actions, raise_on_error=False, raise_on_exception=True)
+
+    by_id = {str(pk): original for pk, original in wanted.items()}
+    errors = {}
+    for failure in failures:
+        op_type, info = next(iter(failure.items()))
+        if op_type == "delete" and info.get("status") == 404:
+            continue
+        pk = by_id.get(str(info.get("_id")))
+        if pk is not None:
+            errors[pk] = f"{index_name}: {info.get('error') or info.get('status')}"
+    return errors
+
+
+def claim_events(batch_size, max_attempts):
+    """Up to ``batch_size`` pending events, locked for this transaction, skipping those locked elsewhere."""
+    return list(
+        OutboxEvent.objects.select_for_update(skip_locked=True)
+        .filter(attempts__lt=max_attempts).order_by("id")[:batch_size]
+    )
+
+
+def first_pending_events(changes, max_attempts):
+    """{(model label, pk): id of the oldest pending event} for the rows in ``changes``."""
+    rows = (
+        OutboxEvent.objects.filter(
+            attempts__lt=max_attempts,
+            model_label__in=list(changes),
+            object_pk__in={pk for pks in changes.values() for pk in pks},
+        ).values("model_label", "object_pk").annotate(first=Min("id")).values_list("model_label", "object_pk", "first")
+    )
+    return {(model_label, pk): first for model_label, pk, first in rows}
+
+
+def drain(batch_size=None):
+    """
+    Apply up to ``batch_size`` pending events, see the module docstring for
+    running several workers.
+
+    Returns {"events": int, "objects": int, "failed": int, "skipped": int}.
+    """
+    config = get_outbox_settings()
+    batch_size = batch_size or config["BATCH_SIZE"]
+    with transaction.atomic():
+        events = claim_events(batch_size, config["MAX_ATTEMPTS"])
+        changes = defaultdict(lambda: defaultdict(list))  # model label -> pk -> [event ids]
+        for event in events:
+            changes[event.model_label][event.object_pk].append(event.id)
+
+        # Rows whose oldest event is held by another worker are left to it
+        skipped = 0
+        if changes:
+            first = first_pending_events(changes, config["MAX_ATTEMPTS"])
+            for model_label, pks in list(changes.items()):
+                for pk, event_ids in list(pks.items()):
+                    if first.get((model_label, pk)) not in event_ids:
+                        del pks[pk]
+                        skipped += 1
+                if not pks:
+                    del changes[model_label]
+
+        done, failed = [], defaultdict(list)  # failed: error -> [event ids]
+        for model_label, pks in changes.items():
+            try:
+                errors = apply_changes(model_label, list(pks))
+            except Exception as e:
+                logger.warning(f"outbox: applying {model_label} changes failed: {e}")
+                errors = {pk: str(e) for pk in pks}
+            for pk, event_ids in pks.items():
+                if pk in errors:
+                    failed[errors[pk]].extend(event_ids)
+                else:
+                    done.extend(event_ids)
+
+        OutboxEvent.objects.filter(id__in=done).delete()
+        for error, event_ids in failed.items():
+            OutboxEvent.objects.filter(id__in=event_ids).update(attempts=F("attempts") + 1, last_error=error[:2000])
+
+    return {
+        "events": len(events),
+        "objects": sum(len(pks) for pks in changes.values()),
+        "failed": sum(len(event_ids) for event_ids in failed.values()),
+        "skipped": skipped,
+    }
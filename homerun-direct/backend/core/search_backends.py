@@ -0,0 +1,268 @@
+"""
+Search backends behind core.viewsets.ESModelViewSet.
+
+A backend answers the list/retrieve reads of one viewset and mirrors its
+writes. ElasticsearchBackend is the production one, DatabaseBackend makes the
+viewset serve everything from the ORM, and InMemoryBackend keeps documents in
+a process local dict so tests can exercise the search path without a cluster.
+The backend is picked per viewset (search_backend_class) or project wide
+through settings.SEARCH_BACKEND.
+"""
+import base64
+import fnmatch
+import json
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+
+class SearchBackendUnavailable(Exception):
+    """The backend cannot answer; the viewset serves the request from the database."""
+
+
+class BaseSearchBackend:
+    name = "base"
+
+    def __init__(self, viewset):
+        self.viewset = viewset
+
+    def search(self, index_name, query, page=1, per_page=20, aggs=None, source=None):
+        """{"results": [...], "total": int, "relation": "eq"|"gte", "facets": {...}}"""
+        raise NotImplementedError
+
+    def search_cursor(self, index_name, query, per_page=20, cursor=None, ordering=None, source=None):
+        """(documents, next_cursor, total)"""
+        raise NotImplementedError
+
+    def get(self, index_name, pk, request=None):
+        raise NotImplementedError
+
+    def index(self, instance, index_name):
+        raise NotImplementedError
+
+    def delete(self, instance, index_name):
+        raise NotImplementedError
+
+
+class ElasticsearchBackend(BaseSearchBackend):
+    """Delegates to the viewset's ElasticSearchMixin methods."""
+
+    name = "elasticsearch"
+
+    def search(self, index_name, query, page=1, per_page=20, aggs=None, source=None):
+        return self.viewset.search_elasticsearch_page(
+            index_name=index_name, query=query, page=page, per_page=per_page, aggs=aggs, source=source
+        )
+
+    def search_cursor(self, index_name, query, per_page=20, cursor=None, ordering=None, source=None):
+        return self.viewset.search_elasticsearch_cursor(
+            index_name=index_name, query=query, per_page=per_page, cursor=cursor, ordering=ordering, source=source
+        )
+
+    def get(self, index_name, pk, request=None):
+        return self.viewset.get_elasticsearch_document(index_name, pk, request)
+
+    def index(self, instance, index_name):
+        self.viewset.index_instance(instance, index_name)
+
+    def delete(self, instance, index_name):
+        self.viewset.clear_index(instance, index_name)
+
+
+class DatabaseBackend(BaseSearchBackend):
+    """Serve reads from the ORM and skip indexing entirely."""
+
+    name = "database"
+
+    def search(self, *args, **kwargs):
+        raise SearchBackendUnavailable(self.name)
+
+    def search_cursor(self, *args, **kwargs):
+        raise SearchBackendUnavailable(self.name)
+
+    def get(self, *args, **kwargs):
+        raise SearchBackendUnavailable(self.name)
+
+    def index(self, instance, index_name):
+        pass
+
+    def delete(self, instance, index_name):
+        pass
+
+
+class InMemoryBackend(BaseSearchBackend):
+    """
+    Process local document store understanding the subset of the query DSL
+    ESModelViewSet generates (bool filter/must, term(s), range, match,
+    multi_match, prefix, wildcard, nested). Meant for tests.
+    """
+
+    name = "memory"
+    documents = defaultdict(dict)  # index_name -> {id: document}
+
+    @classmethod
+    def reset(cls):
+        cls.documents.clear()
+
+    def index(self, instance, index_name):
+        document = self.viewset.serialize_for_elasticsearch(self.viewset.serialize_instance(instance))
+        self.documents[index_name][str(instance.pk)] = json.loads(json.dumps(document, default=str))
+
+    def delete(self, instance, index_name):
+        self.documents[index_name].pop(str(instance.pk), None)
+
+    def get(self, index_name, pk, request=None):
+        try:
+            document = self.documents[index_name][str(pk)]
+        except KeyError:
+            raise SearchBackendUnavailable(f"{index_name}/{pk} not found")
+        source = self.viewset.get_source_filter(request, use_defaults=False) if request is not None else None
+        return self._project(document, source)
+
+    def _matching(self, index_name, query):
+        clause = query.get("query", {"match_all": {}})
+        hits = [doc for doc in self.documents[index_name].values() if self._matches(doc, clause)]
+        return sorted(hits, key=lambda doc: (str(type(doc.get("id"))), doc.get("id")))
+
+    def search(self, index_name, query, page=1, per_page=20, aggs=None, source=None):
+        hits = self._matching(index_name, query)
+        start = (page - 1) * per_page
+        facets = {}
+        for key, agg in (aggs or {}).items():
+            field = agg["terms"]["field"]
+            counts = Counter(self._value(doc, field) for doc in hits if self._value(doc, field) is not None)
+            facets[key[len("facet_"):]] = [
+                {"value": value, "count": count} for value, count in counts.most_common(agg["terms"].get("size", 10))
+            ]
+        return {
+            "results": [self._project(doc, source) for doc in hits[start:start + per_page]],
+            "total": len(hits),
+            "relation": "eq",
+            "facets": facets,
+        }
+
+    def search_cursor(self, index_name, query, per_page=20, cursor=None, ordering=None, source=None):
+        try:
+            offset = int(base64.urlsafe_b64decode(cursor.encode()).decode()) if cursor else 0
+        except (ValueError, UnicodeDecodeError):
+            raise ValidationError({"cursor": "Invalid cursor."})
+        hits = self._matching(index_name, query)
+        page = hits[offset:offset + per_page]
+        next_offset = offset + per_page
+        next_cursor = base64.urlsafe_b64encode(str(next_offset).encode()).decode() if next_offset < len(hits) else None
+        return [self._project(doc, source) for doc in page], next_cursor, len(hits)
+
+    @staticmethod
+    def _field(name):
+        for suffix in (".keyword", ".ngram"):
+            if name.endswith(suffix):
+                return name[:-len(suffix)]
+        return name
+
+    def _value(self, doc, field):
+        value = doc
+        for part in self._field(field).split("."):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+
+    @staticmethod
+    def _text(value):
+        return str(value).lower() if value is not None else ""
+
+    def _matches(self, doc, clause):
+        kind, body = next(iter(clause.items()))
+        if kind == "match_all":
+            return True
+        if kind == "bool":
+            return all(self._matches(doc, c) for c in body.get("filter", []) + body.get("must", []))
+        if kind == "nested":
+            return self._matches(doc, body["query"])
+        if kind == "multi_match":
+            words = self._text(body["query"]).split()
+            haystack = " ".join(self._text(self._value(doc, f)) for f in body.get("fields", []))
+            return all(word in haystack for word in words)
+
+        field, condition = next(iter(body.items()))
+        value = self._value(doc, field)
+        if kind == "term":
+            expected = condition.get("value") if isinstance(condition, dict) else condition
+            return self._text(value) == self._text(expected)
+        if kind == "terms":
+            return self._text(value) in {self._text(v) for v in condition}
+        if kind == "range":
+            if value is None:
+                return False
+            checks = {"gte": lambda a, b: a >= b, "lte": lambda a, b: a <= b, "gt": lambda a, b: a > b, "lt": lambda a, b: a < b}
+            for op, bound in condition.items():
+                left = value
+                try:
+                    bound = type(value)(bound)
+                except (TypeError, ValueError):
+                    left, bound = str(value), str(bound)  # ISO dates compare as strings
+                if not checks[op](left, bound):
+                    return False
+            return True
+        if kind == "match":
+            query = condition.get("query") if isinstance(condition, dict) else condition
+            return all(word in self._text(value) for word in self._text(query).split())
+        if kind == "prefix":
+            prefix = condition.get("value") if isinstance(condition, dict) else condition
+            return self._text(value).startswith(self._text(prefix))
+        if kind == "wildcard":
+            pattern = condition.get("value") if isinstance(condition, dict) else condition
+            return fnmatch.fnmatchcase(self._text(value), self._text(pattern))
+        raise SearchBackendUnavailable(f"Unsupported clause {kind}")
+
+    @staticmethod
+    def _project(document, source):
+        if not source:
+            return dict(document)
+        includes, excludes = source.get("includes"), source.get("excludes") or []
+        return {
+            key: value for key, value in document.items()
+            if (not includes or any(fnmatch.fnmatchcase(key, p) for p in includes))
+            and not any(fnmatch.fnmatchcase(key, p) for p in excludes)
+        }
+
+
+def get_backend_class(path=None):
+    return import_string(path or getattr(settings, "SEARCH_BACKEND", "core.search_backends.ElasticsearchBackend"))
+
+
+class SearchMetrics:
+    """In-process counters per viewset and backend, also logged per request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = defaultdict(lambda: {"requests": 0, "fallbacks": 0, "total_ms": 0.0})
+
+    def record(self, viewset_name, backend_name, action, elapsed_ms, fallback=False):
+        with self._lock:
+            entry = self._data[(viewset_name, backend_name, action)]
+            entry["requests"] += 1
+            entry["total_ms"] += elapsed_ms
+            if fallback:
+                entry["fallbacks"] += 1
+        logger.info(
+            f"search {viewset_name}.{action} backend={backend_name} "
+            f"{'fallback ' if fallback else ''}{elapsed_ms:.1f}ms"
+        )
+
+    def snapshot(self):
+        with self._lock:
+            return {key: dict(value) for key, value in self._data.items()}
+
+    def reset(self):
+        with self._lock:
+            self._data.clear()
+
+
+metrics = SearchMetrics()
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import outbox
+from core.metadata import invalidate_entity_metadata, invalidate_option_model
+from core.models import Entity, OutboxEvent
+
+
+@receiver(post_save, sender=Entity)
+@receiver(post_delete, sender=Entity)
+def invalidate_entity_options(sender, instance, **kwargs):
+    invalidate_entity_metadata(instance)
+
+
+# Cached OPTIONS metadata inlines the rows of related models (core.metadata)
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_inline_options(sender, instance, raw=False, using=None, **kwargs):
+    if not raw:
+        invalidate_option_model(sender, using)
+
+
+# Change capture for the outbox (core.outbox); a no-op unless OUTBOX["ENABLED"]
+@receiver(post_save)
+def capture_outbox_save(sender, instance, raw=False, using=None, **kwargs):
+    if not raw:
+        outbox.record_change(instance, OutboxEvent.INDEX, using)
+
+
+@receiver(post_delete)
+def capture_outbox_delete(sender, instance, using=None, **kwargs):
+    outbox.record_change(instance, OutboxEvent.DELETE, using)
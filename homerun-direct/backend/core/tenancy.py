@@ -0,0 +1,93 @@
+"""
+Request scoped tenancy: the organizations and brands a user may see.
+
+get_tenancy(request) is the one place list filters, ES access filters and the
+viewset caches ask. It is resolved once per request and kept in the cache
+as a single compact entry per user, so session-less (JWT only) clients are
+scoped exactly like browser sessions. Organization and Brand writes that
+change ownership drop the entries of the users involved (organization.signals).
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+TENANCY_CACHE_TIMEOUT = 60 * 60  # 1 hour
+
+
+class Tenancy:
+    """``all_access`` users (superusers) are not filtered by ids."""
+
+    __slots__ = ("all_access", "organization_ids", "brand_ids")
+
+    def __init__(self, all_access=False, organization_ids=(), brand_ids=()):
+        self.all_access = all_access
+        self.organization_ids = sorted(organization_ids)
+        self.brand_ids = sorted(brand_ids)
+
+    def __eq__(self, other):
+        return isinstance(other, Tenancy) and (
+            (self.all_access, self.organization_ids, self.brand_ids)
+            == (other.all_access, other.organization_ids, other.brand_ids)
+        )
+
+    def __repr__(self):
+        if self.all_access:
+            return "Tenancy(all)"
+        return f"Tenancy(organizations={self.organization_ids}, brands={self.brand_ids})"
+
+
+def tenancy_cache_key(user_id):
+    return f"tenancy:user:{user_id}"
+
+
+def load_tenancy(user):
+    from organization.models import Brand, Organization  # Avoid circular import
+
+    return Tenancy(
+        organization_ids=Organization.objects.filter(user_id=user.pk).values_list("id", flat=True),
+        brand_ids=Brand.objects.filter(organization__user_id=user.pk).values_list("id", flat=True),
+    )
+
+
+def resolve_tenancy(user):
+    if user is None or not user.is_authenticated:
+        return Tenancy()
+    if user.is_superuser:
+        return Tenancy(all_access=True)
+
+    key = tenancy_cache_key(user.pk)
+    try:
+        cached = cache.get(key)
+    except Exception:
+        logger.warning("Tenancy cache unavailable, reading from the database", exc_info=True)
+        return load_tenancy(user)
+    if cached is not None:
+        organization_ids, brand_ids = cached
+        return Tenancy(organization_ids=organization_ids, brand_ids=brand_ids)
+
+    tenancy = load_tenancy(user)
+    timeout = getattr(settings, "TENANCY_CACHE_TIMEOUT", TENANCY_CACHE_TIMEOUT)
+    try:
+        cache.set(key, (tuple(tenancy.organization_ids), tuple(tenancy.brand_ids)), timeout=timeout)
+    except Exception:
+        logger.warning("Could not cache tenancy", exc_info=True)
+    return tenancy
+
+
+def get_tenancy(request):
+    """Tenancy of ``request.user``, memoized on the underlying HttpRequest."""
+    http_request = getattr(request, "_request", request)
+    tenancy = getattr(http_request, "_tenancy", None)
+    if not isinstance(tenancy, Tenancy):
+        tenancy = resolve_tenancy(getattr(request, "user", None))
+        http_request._tenancy = tenancy
+    return tenancy
+
+
+def invalidate_tenancy(*user_ids):
+    keys = [tenancy_cache_key(user_id) for user_id in user_ids if user_id]
+    if keys:
+        cache.delete_many(keys)
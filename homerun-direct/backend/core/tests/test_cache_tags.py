@@ -0,0 +1,63 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from core import cache_tags
+from core.mixin_redis import RedisCacheMixin
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def test_versioned_key_changes_after_bump():
+    key = cache_tags.versioned_key("property:1", ["model:property"])
+    assert key == cache_tags.versioned_key("property:1", ["model:property"])
+
+    cache_tags.bump("model:property")
+    assert cache_tags.versioned_key("property:1", ["model:property"]) != key
+
+
+def test_bump_missing_tag_seeds_version():
+    cache_tags.bump("model:never-read")
+    assert cache_tags.get_version("model:never-read") > 0
+
+
+def test_bump_uses_incr_not_delete_pattern():
+    mock_cache = MagicMock()
+    with patch("core.cache_tags.cache", mock_cache):
+        cache_tags.bump("model:a", "model:b")
+    assert mock_cache.incr.call_count == 2
+    mock_cache.delete_pattern.assert_not_called()
+
+
+def test_tags_for_instance_uses_organization():
+    instance = MagicMock(pk=7, organization_id=3)
+    instance._meta.label = "property.Units"
+    assert cache_tags.tags_for_instance(instance) == [
+        "model:property.units",
+        "model:property.units:pk:7",
+        "model:property.units:org:3",
+    ]
+
+
+def test_redis_mixin_invalidate_model_cache():
+    mixin = RedisCacheMixin()
+    mixin.set_to_tagged_cache("Property", {"id": 1}, pk=1, organization_id=4)
+    assert mixin.get_from_tagged_cache("Property", pk=1, organization_id=4) == {"id": 1}
+
+    mixin.invalidate_model_cache("Property", organization_id=4)
+    assert mixin.get_from_tagged_cache("Property", pk=1, organization_id=4) is None
+
+
+def test_redis_mixin_model_wide_invalidation_drops_organization_entries():
+    mixin = RedisCacheMixin()
+    mixin.set_to_tagged_cache("Property", {"id": 1}, pk=1, organization_id=4)
+    mixin.set_to_tagged_cache("Property", {"id": 2}, pk=2, organization_id=5)
+    mixin.set_to_tagged_cache("Property", [{"id": 1}, {"id": 2}])
+
+    mixin.invalidate_model_cache("Property", organization_id=4)
+    assert mixin.get_from_tagged_cache("Property") is None
+    assert mixin.get_from_tagged_cache("Property", pk=2, organization_id=5) == {"id": 2}
+
+    mixin.invalidate_model_cache("Property")
+    assert mixin.get_from_tagged_cache("Property", pk=2, organization_id=5) is None
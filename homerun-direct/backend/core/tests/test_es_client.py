@@ -0,0 +1,45 @@
+import pytest
+from unittest.mock import patch
+
+from core.es_client import CircuitBreaker, CircuitOpenError, create_client
+
+
+def test_circuit_breaker_opens_and_recovers_after_cooldown():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=10)
+    with patch("core.es_client.time.monotonic", return_value=100.0):
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.is_open
+        assert not breaker.allow()
+
+    with patch("core.es_client.time.monotonic", return_value=111.0):
+        assert breaker.allow()  # half-open trial
+        assert not breaker.allow()  # only one trial at a time
+        breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.allow()
+
+
+def test_client_skips_requests_while_circuit_is_open(settings):
+    settings.ELASTICSEARCH_DSL = {"default": {"hosts": "http://127.0.0.1:1", "max_retries": 0}}
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60)
+    client = create_client(breaker=breaker)
+
+    with pytest.raises(Exception) as first:
+        client.info()
+    assert not isinstance(first.value, CircuitOpenError)
+    assert breaker.is_open
+
+    with patch("elastic_transport.Transport.perform_request") as perform_request:
+        with pytest.raises(CircuitOpenError):
+            client.info()
+    perform_request.assert_not_called()
+
+
+def test_client_uses_configured_pool_and_timeouts(settings):
+    settings.ELASTICSEARCH_DSL = {"default": {"hosts": "http://127.0.0.1:1", "request_timeout": 2.5, "connections_per_node": 3}}
+    client = create_client()
+    node = next(iter(client.transport.node_pool.all()))
+    assert client._request_timeout == 2.5
+    assert node.config.connections_per_node == 3
@@ -0,0 +1,57 @@
+from unittest.mock import MagicMock
+
+from core import es_mappings
+from property.models import Availability, Property
+
+
+def test_build_properties_maps_model_fields():
+    properties = es_mappings.build_properties(Property, search_fields=["name"])
+
+    assert properties["id"] == {"type": "long"}
+    assert properties["features_adventure"] == es_mappings.DISABLED
+    assert properties["name"]["fields"]["keyword"]["type"] == "keyword"
+    assert "ngram" in properties["name"]["fields"]
+
+
+def test_calendar_blobs_are_not_indexed():
+    properties = es_mappings.build_properties(Availability)
+    assert properties["availability_calendar"] == es_mappings.DISABLED
+    assert properties["booking_calendar"] == es_mappings.DISABLED
+
+
+def test_index_body_applies_settings_and_registry(settings):
+    settings.ES_INDEX_SETTINGS = {"number_of_shards": 1, "refresh_interval": "5s"}
+    body = es_mappings.build_index_body("property", Property)
+
+    assert body["settings"]["index"] == {"number_of_shards": 1, "refresh_interval": "5s"}
+    assert "ngram_analyzer" in body["settings"]["analysis"]["analyzer"]
+    assert body["mappings"]["properties"]["organization_id"] == {"type": "long"}
+
+
+def test_ensure_index_creates_missing_index_once(monkeypatch):
+    monkeypatch.setattr(es_mappings, "_ensured_indices", set())
+    client = MagicMock()
+    client.indices.exists.return_value = False
+
+    es_mappings.ensure_index(client, "property")
+    es_mappings.ensure_index(client, "property")
+
+    client.indices.create.assert_called_once()
+    assert "mappings" in client.indices.create.call_args[1]
+
+
+
+def test_index_properties_are_memoized_and_read_only(monkeypatch):
+    import pytest
+
+    monkeypatch.setattr(es_mappings, "_index_bodies", {})
+    build = MagicMock(wraps=es_mappings.build_index_body)
+    monkeypatch.setattr(es_mappings, "build_index_body", build)
+
+    first = es_mappings.get_index_properties("property")
+    second = es_mappings.get_index_properties("property")
+
+    build.assert_called_once()
+    assert first == second and first["organization_id"] == {"type": "long"}
+    with pytest.raises(TypeError):
+        first["organization_id"] = {"type": "keyword"}
@@ -0,0 +1,210 @@
+import fnmatch
+import time
+
+import pytest
+from unittest.mock import patch, MagicMock
+from core.es_queue import (
+    BulkQueue, InMemoryQueueBackend, RedisQueueBackend, get_indexing_queue, reset_indexing_queue,
+)
+
+
+def make_queue(**kwargs):
+    options = {"batch_size": 2, "flush_interval": 0.01, "max_retries": 2, "retry_backoff": 0}
+    options.update(kwargs)
+    return BulkQueue(InMemoryQueueBackend(max_size=10), MagicMock, **options)
+
+
+def action(doc_id, op_type="index"):
+    return {"_op_type": op_type, "_index": "units", "_id": doc_id, "_source": {"id": doc_id}}
+
+
+@patch("core.es_queue.bulk", return_value=(3, []))
+def test_flush_sends_in_batches(mock_bulk):
+    q = make_queue()
+    for doc_id in range(3):
+        q.backend.put(action(doc_id))
+
+    q.flush()
+
+    assert [len(call[0][1]) for call in mock_bulk.call_args_list] == [2, 1]
+
+
+@patch("core.es_queue.bulk")
+def test_failed_batch_is_retried(mock_bulk):
+    mock_bulk.side_effect = [Exception("ES down"), (1, [])]
+    q = make_queue()
+    q.backend.put(action(1))
+
+    q.flush()
+
+    assert mock_bulk.call_count == 2
+    assert q.failed == 0
+
+
+@patch("core.es_queue.bulk")
+def test_only_retryable_items_are_resent(mock_bulk):
+    mock_bulk.side_effect = [
+        (0, [
+            {"index": {"_index": "units", "_id": "1", "status": 429, "error": "busy"}},
+            {"index": {"_index": "units", "_id": "2", "status": 400, "error": "mapper_parsing_exception"}},
+            {"delete": {"_index": "units", "_id": "3", "status": 404}},
+        ]),
+        (1, []),
+    ]
+    q = make_queue(batch_size=10)
+    for doc_id in (1, 2):
+        q.backend.put(action(doc_id))
+    q.backend.put(action(3, op_type="delete"))
+
+    q.flush()
+
+    retried = mock_bulk.call_args_list[1][0][1]
+    assert [a["_id"] for a in retried] == [1]
+    assert q.failed == 1
+
+
+@patch("core.es_queue.bulk", side_effect=Exception("ES down"))
+def test_gives_up_after_max_retries(mock_bulk):
+    q = make_queue(max_retries=2)
+    q.backend.put(action(1))
+
+    q.flush()
+
+    assert mock_bulk.call_count == 3
+    assert q.failed == 1
+    assert q.backend.size() == 1  # Requeued, not lost
+
+
+def test_put_drops_when_full_and_not_blocking():
+    q = BulkQueue(InMemoryQueueBackend(max_size=1), MagicMock, block=False)
+    q.start = MagicMock()  # No worker, keep the queue full
+    assert q.put(action(1)) is True
+    assert q.put(action(2)) is False
+    assert q.dropped == 1
+
+
+@patch("core.es_queue.bulk", return_value=(1, []))
+def test_indexing_queue_sends_inline_when_full(mock_bulk, settings):
+    settings.ES_INDEXING = {**settings.ES_INDEXING, "MAX_QUEUE_SIZE": 1, "PUT_TIMEOUT": 0.01}
+    reset_indexing_queue()
+    q = get_indexing_queue()
+    q.start = MagicMock()  # No worker, keep the queue full
+    q.prepare = None
+    try:
+        assert q.put(action(1)) is True
+        started = time.monotonic()
+        assert q.put(action(2)) is True
+        assert time.monotonic() - started < 1
+        assert [a["_id"] for a in mock_bulk.call_args[0][1]] == [2]
+        assert (q.overflowed, q.dropped) == (1, 0)
+    finally:
+        reset_indexing_queue()
+
+
+@patch("core.es_queue.bulk", side_effect=Exception("ES down"))
+def test_inline_send_failure_is_counted_as_dropped(mock_bulk):
+    q = BulkQueue(InMemoryQueueBackend(max_size=1), MagicMock, block=False, overflow="sync",
+                  max_retries=0, retry_backoff=0)
+    q.start = MagicMock()
+    q.put(action(1))
+
+    assert q.put(action(2)) is False
+    assert (q.overflowed, q.dropped) == (1, 1)
+
+
+class FakeRedis:
+    """Just the list commands RedisQueueBackend uses."""
+
+    def __init__(self):
+        self.lists = {}
+        self.keys = set()
+
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def rpush(self, key, *items):
+        self.lists.setdefault(key, []).extend(item.encode() for item in items)
+
+    def lmove(self, source, destination, src_side, dest_side):
+        items = self.lists.get(source)
+        if not items:
+            return None
+        item = items.pop(0 if src_side == "LEFT" else -1)
+        target = self.lists.setdefault(destination, [])
+        target.insert(0 if dest_side == "LEFT" else len(target), item)
+        return item
+
+    def lrem(self, key, count, item):
+        self.lists[key].remove(item)
+
+    def set(self, key, value, ex=None):
+        self.keys.add(key)
+
+    def exists(self, key):
+        return key in self.keys
+
+    def scan_iter(self, match):
+        return [key.encode() for key in list(self.lists) + list(self.keys) if fnmatch.fnmatch(key, match)]
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+@pytest.fixture
+def redis_backend():
+    with patch("django_redis.get_redis_connection", return_value=FakeRedis()):
+        return RedisQueueBackend("queue", max_size=10)
+
+
+def test_redis_batch_stays_claimed_until_acked(redis_backend):
+    for doc_id in range(3):
+        redis_backend.put(action(doc_id))
+
+    batch = redis_backend.get_batch(2, timeout=0)
+
+    assert [a["_id"] for a in batch] == [0, 1]
+    assert redis_backend.size() == 1
+    assert redis_backend.client.llen(redis_backend.processing_key) == 2
+    redis_backend.ack(batch)
+    assert redis_backend.client.llen(redis_backend.processing_key) == 0
+
+
+@patch("core.es_queue.bulk", side_effect=Exception("ES down"))
+def test_redis_failed_batch_is_requeued(mock_bulk, redis_backend):
+    q = BulkQueue(redis_backend, MagicMock, batch_size=2, max_retries=0, retry_backoff=0)
+    redis_backend.put(action(1))
+
+    q.flush()
+
+    assert redis_backend.size() == 1
+    assert redis_backend.client.llen(redis_backend.processing_key) == 0
+
+
+def test_redis_recovers_claims_of_dead_workers(redis_backend):
+    redis_backend.put(action(2))
+    redis_backend.client.rpush("queue:processing:other:1", '{"_id": 1}')
+
+    redis_backend.recover()
+
+    assert [a["_id"] for a in redis_backend.get_batch(2, timeout=0)] == [1, 2]
+
+
+def test_redis_keeps_claims_of_live_workers(redis_backend):
+    redis_backend.client.rpush("queue:processing:other:1", '{"_id": 1}')
+    redis_backend.client.set("queue:processing:other:1:alive", "1")
+
+    redis_backend.recover()
+
+    assert redis_backend.size() == 0
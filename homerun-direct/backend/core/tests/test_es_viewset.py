@@ -0,0 +1,112 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from django.core.cache import cache
+
+from core.models import Entity
+from core.search_backends import DatabaseBackend, InMemoryBackend, metrics
+from core.viewsets import ESModelViewSet
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clean_backends():
+    InMemoryBackend.reset()
+    metrics.reset()
+    yield
+    InMemoryBackend.reset()
+
+
+class EntitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Entity
+        fields = ["id", "name", "url_path", "model_path"]
+
+
+class EntitySearchViewSet(ESModelViewSet):
+    queryset = Entity.objects.all().order_by("id")
+    serializer_class = EntitySerializer
+    search_fields = ["name"]
+    index_name = "entity_search_test"
+    search_backend_class = InMemoryBackend
+    redis_cache = MagicMock()
+
+
+class Superuser:
+    is_authenticated = True
+    is_superuser = True
+    id = pk = 1
+
+
+def _request(method="get", path="/api/entities/", data=None):
+    factory = APIRequestFactory()
+    request = getattr(factory, method)(path, data or {}, format="json" if method != "get" else None)
+    request.session = {}
+    force_authenticate(request, user=Superuser())
+    return request
+
+
+def _create(name):
+    data = {"name": name, "url_path": f"/api/{name.lower()}/", "model_path": "master.Currency"}
+    return EntitySearchViewSet.as_view({"post": "create"})(_request("post", data=data))
+
+
+@pytest.mark.django_db
+def test_writes_are_mirrored_and_listed_through_backend():
+    _create("Alpha")
+    _create("Beta")
+
+    response = EntitySearchViewSet.as_view({"get": "list"})(_request(data={"search": "alp"}))
+    assert response.status_code == 200
+    assert [doc["name"] for doc in response.data["response"]] == ["Alpha"]
+    assert response.data["pagination"]["count"] == 1
+    assert metrics.snapshot()[("EntitySearchViewSet", "memory", "list")]["fallbacks"] == 0
+
+
+@pytest.mark.django_db
+def test_filters_cursor_and_projection():
+    for name in ["Alpha", "Beta", "Gamma"]:
+        _create(name)
+    view = EntitySearchViewSet.as_view({"get": "list"})
+
+    response = view(_request(data={"name__in": "Alpha,Gamma", "fields": "name"}))
+    assert [doc["name"] for doc in response.data["response"]] == ["Alpha", "Gamma"]
+    assert all(set(doc) == {"id", "name"} for doc in response.data["response"])
+
+    first = view(_request(data={"cursor": "", "per_page": 2}))
+    second = view(_request(data={"cursor": first.data["pagination"]["next_cursor"], "per_page": 2}))
+    assert len(first.data["response"]) == 2
+    assert len(second.data["response"]) == 1
+    assert second.data["pagination"]["next_cursor"] is None
+
+    assert view(_request(data={"unknown": "x"})).status_code == 400
+
+
+@pytest.mark.django_db
+def test_database_backend_serves_from_orm():
+    Entity.objects.create(name="Db", url_path="/api/db/", model_path="master.Currency")
+    with patch.object(EntitySearchViewSet, "search_backend_class", DatabaseBackend):
+        response = EntitySearchViewSet.as_view({"get": "list"})(_request())
+    assert response.status_code == 200
+    assert [row["name"] for row in response.data["response"]] == ["Db"]
+    assert metrics.snapshot()[("EntitySearchViewSet", "database", "list")]["fallbacks"] == 1
+
+
+@pytest.mark.django_db
+def test_backend_errors_fall_back_to_database():
+    entity = Entity.objects.create(name="Fallback", url_path="/api/fallback/", model_path="master.Currency")
+    with patch.object(InMemoryBackend, "search", side_effect=RuntimeError("cluster down")):
+        response = EntitySearchViewSet.as_view({"get": "list"})(_request())
+    assert [row["name"] for row in response.data["response"]] == ["Fallback"]
+
+    # Not indexed yet: retrieve is served from the database
+    response = EntitySearchViewSet.as_view({"get": "retrieve"})(_request(path=f"/api/entities/{entity.pk}/"), pk=entity.pk)
+    assert response.status_code == 200
+    assert response.data["name"] == "Fallback"
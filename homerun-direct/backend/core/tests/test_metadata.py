@@ -93,12 +93,15 @@ class CustomUIMetadataTest(TestCase):
 
 
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from rest_framework.test import APIRequestFactory
 from core.metadata import CustomUIMetadata
 from core.models import Entity
 from rest_framework import serializers
+from rest_framework.request import Request
 from django.test import RequestFactory
+from core.tenancy import Tenancy
+from rbac.models import OrganizatioRole
 
 
 
@@ -212,6 +215,97 @@ def test_build_ui_post(custom_metadata):
 
 
 
+@pytest.fixture
+def locmem_cache(settings):
+    from django.core.cache import cache
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _options_view():
+    view = MagicMock()
+    view.allowed_methods = ["GET", "POST", "OPTIONS"]
+    view.get_serializer_class.return_value = serializers.Serializer
+    view.get_serializer.return_value = MagicMock(fields={})
+    return view
+
+
+@pytest.mark.django_db
+def test_determine_metadata_is_cached_until_entity_saved(custom_metadata, request_factory, locmem_cache):
+    entity = Entity.objects.create(url_path="/cached-url", model_path="core.Entity", post_heading="First")
+    view = _options_view()
+
+    with patch.object(CustomUIMetadata, "build_metadata", wraps=custom_metadata.build_metadata) as build:
+        first = custom_metadata.determine_metadata(Request(request_factory.options("/cached-url")), view)
+        second = custom_metadata.determine_metadata(Request(request_factory.options("/cached-url")), view)
+        assert build.call_count == 1
+        assert second == first
+
+        entity.post_heading = "Second"
+        entity.save()
+        third = custom_metadata.determine_metadata(Request(request_factory.options("/cached-url")), view)
+        assert build.call_count == 2
+        assert third["POST"]["heading"] == "Second"
+
+
+def _user(pk):
+    return MagicMock(pk=pk, is_authenticated=True, is_superuser=False, group_id=None)
+
+
+@pytest.mark.django_db
+def test_metadata_cache_key_depends_on_permitted_actions(custom_metadata, request_factory, locmem_cache):
+    from rest_framework.exceptions import PermissionDenied
+    view = _options_view()
+
+    def check_permissions(request):
+        if request.user.pk == 2:
+            raise PermissionDenied()
+
+    view.check_permissions.side_effect = check_permissions
+    allowed, denied = Request(request_factory.options("/some-url")), Request(request_factory.options("/some-url"))
+    allowed.user, denied.user = _user(1), _user(2)
+    allowed._request._tenancy = denied._request._tenancy = Tenancy(organization_ids=[1])
+
+    assert custom_metadata.get_permitted_actions(allowed, view) == ["POST"]
+    assert custom_metadata.get_permitted_actions(denied, view) == []
+    assert custom_metadata.get_metadata_cache_key(allowed, view) != custom_metadata.get_metadata_cache_key(denied, view)
+
+
+@pytest.mark.django_db
+def test_permitted_actions_are_cached_per_user_and_entity(custom_metadata, request_factory, locmem_cache):
+    view = _options_view()
+    request = Request(request_factory.options("/some-url"))
+    request.user = _user(1)
+    request._request._tenancy = Tenancy(organization_ids=[1])
+
+    first = custom_metadata.get_metadata_cache_key(request, view)
+    second = custom_metadata.get_metadata_cache_key(request, view)
+
+    assert first == second
+    assert view.check_permissions.call_count == 1
+
+
+@pytest.mark.django_db
+def test_saving_an_inlined_related_model_invalidates_metadata(
+    custom_metadata, request_factory, locmem_cache, django_capture_on_commit_callbacks
+):
+    class RoleSerializer(serializers.Serializer):
+        group = serializers.PrimaryKeyRelatedField(queryset=OrganizatioRole.objects.all())
+
+    view = _options_view()
+    view.get_serializer.return_value = RoleSerializer()
+    request = Request(request_factory.options("/roles-url"))
+
+    before = custom_metadata.get_metadata_cache_key(request, view)
+    with django_capture_on_commit_callbacks(execute=True):
+        OrganizatioRole.objects.create(name="Employee")
+
+    assert custom_metadata.get_metadata_cache_key(request, view) != before
+
+
+
 
 # from rest_framework.metadata import SimpleMetadata
 # from core.models import Entity
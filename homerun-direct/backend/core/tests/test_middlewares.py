@@ -0,0 +1,109 @@
+import datetime
+import pytest
+from unittest.mock import MagicMock, patch
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from core import middlewares
+from core.es_queue import BulkQueue, InMemoryQueueBackend
+from core.middlewares import APILoggingMiddleware, audit_index_name, capture_body, should_log
+
+
+@pytest.fixture
+def audit_settings(settings):
+    settings.AUDIT_LOGGING = {"ENABLED": True, "MAX_BODY_BYTES": 10}
+    return settings
+
+
+@pytest.fixture
+def audit_queue():
+    queue = BulkQueue(InMemoryQueueBackend(max_size=2), MagicMock, block=False)
+    queue.start = MagicMock()  # No worker thread, inspect the backend directly
+    with patch("core.middlewares.get_audit_queue", return_value=queue):
+        yield queue
+
+
+def config(**overrides):
+    return {**middlewares.AUDIT_DEFAULTS, **overrides}
+
+
+def test_disabled_middleware_is_not_used(settings):
+    settings.AUDIT_LOGGING = {"ENABLED": False}
+    with pytest.raises(MiddlewareNotUsed):
+        APILoggingMiddleware(lambda request: HttpResponse())
+
+
+def test_should_log_sampling():
+    rates = config(SAMPLE_RATE=0, PATH_SAMPLE_RATES={"/api/": 0, "/api/property/": 1})
+    assert should_log("/auth/login/", 500, rates) is False
+    assert should_log("/api/unit/", 200, rates) is False
+    assert should_log("/api/unit/", 404, rates) is True
+    assert should_log("/api/property/1/", 200, rates) is True
+
+
+def test_audit_index_name_is_daily():
+    assert audit_index_name(datetime.datetime(2025, 3, 4), config()) == "api_logs-2025.03.04"
+
+
+def test_capture_body_is_capped_without_parsing():
+    body, size = capture_body(JsonResponse({"name": "x" * 50}), config(MAX_BODY_BYTES=10))
+    assert body == '{"name": "'
+    assert size == 62
+
+    assert capture_body(HttpResponse(b"\x89PNG", content_type="image/png"), config()) == (None, None)
+    assert capture_body(StreamingHttpResponse(iter([b"{}"]), content_type="application/json"), config()) == (None, None)
+
+
+def test_response_is_queued_not_indexed(audit_settings, audit_queue):
+    middleware = APILoggingMiddleware(lambda request: JsonResponse({"name": "x" * 50}))
+    request = RequestFactory().get("/api/property/")
+
+    with patch("core.middlewares.get_client") as mock_client:
+        middleware(request)
+
+    mock_client.assert_not_called()
+    (action,) = audit_queue.backend.get_batch(10, timeout=0)
+    assert action["_index"].startswith("api_logs-")
+    assert action["_id"] == request.request_id
+    assert action["_source"]["path"] == "/api/property/"
+    assert action["_source"]["body_truncated"] is True
+    assert len(action["_source"]["body"]) == 10
+
+
+def test_full_queue_drops_instead_of_blocking(audit_settings, audit_queue):
+    middleware = APILoggingMiddleware(lambda request: HttpResponse("ok"))
+
+    responses = [middleware(RequestFactory().get("/api/unit/")) for _ in range(3)]
+
+    assert all(response.status_code == 200 for response in responses)
+    assert audit_queue.backend.size() == 2
+    assert audit_queue.dropped == 1
+
+
+def test_token_endpoints_are_never_logged():
+    excluding_nothing = config(EXCLUDE_PATHS=[])
+    assert should_log("/google-auth/", 200, excluding_nothing) is False
+    assert should_log("/auth/token/refresh/", 500, excluding_nothing) is False
+
+
+def test_jwt_response_is_redacted(audit_settings, audit_queue):
+    audit_settings.AUDIT_LOGGING = {"ENABLED": True, "SENSITIVE_PATHS": []}
+    middleware = APILoggingMiddleware(lambda request: JsonResponse({
+        "access": "eyJhbGciOiJIUzI1NiJ9.access",
+        "refresh": "eyJhbGciOiJIUzI1NiJ9.refresh",
+        "user": {"id": 1, "email": "guest@example.com", "password": "secret"},
+    }))
+
+    middleware(RequestFactory().post("/api/login/"))
+
+    (action,) = audit_queue.backend.get_batch(10, timeout=0)
+    body = action["_source"]["body"]
+    assert "eyJ" not in body and "secret" not in body
+    assert '"access": "[REDACTED]"' in body
+    assert '"email": "guest@example.com"' in body
+
+
+def test_redaction_survives_a_capped_body():
+    body, _ = capture_body(JsonResponse({"token": "x" * 50}), config(MAX_BODY_BYTES=20))
+    assert body == '{"token": "[REDACTED]"'
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import MagicMock, patch
 from core.mixin_es import ElasticsearchIndexMixin, ElasticSearchMixin
+from rest_framework.exceptions import ValidationError
 from unittest.mock import MagicMock
 
 from organization.models import Location  # Import the actual model
@@ -20,31 +21,68 @@ def mixin():
     return ElasticSearchMixin()
 
 
+@pytest.fixture(autouse=True)
+def mock_ensure_index():
+    with patch("core.mixin_es.ensure_index") as ensure_index:
+        yield ensure_index
+
+
+@pytest.fixture
+def sync_indexing(settings):
+    settings.ES_INDEXING = {"ASYNC": False}
+
+
 @patch("core.mixin_es.es.index")
-def test_index_instance_success(mock_index, mixin):
+def test_index_instance_success(mock_index, mixin, sync_indexing):
     instance = MockModel(name="Test", pk=1)
     mixin.index_instance(instance, "test-index")
     mock_index.assert_called_once()
 
 
 @patch("core.mixin_es.es.delete")
-def test_clear_index_success(mock_delete, mixin):
+def test_clear_index_success(mock_delete, mixin, sync_indexing):
     instance = MockModel(pk=1)
     mixin.clear_index(instance, "test-index")
     mock_delete.assert_called_once_with(index="test-index", id=1, ignore=[404])
 
 
-@patch("core.mixin_es.bulk")
+@patch("core.mixin_es.enqueue_index")
+@patch("core.mixin_es.es.index")
+def test_index_instance_async_enqueues(mock_index, mock_enqueue, mixin, settings):
+    settings.ES_INDEXING = {"ASYNC": True}
+    mixin.index_instance(MockModel(name="Test", pk=1), "test-index")
+    mock_index.assert_not_called()
+    mock_enqueue.assert_called_once_with("test-index", 1, {})
+
+
+@patch("core.mixin_es.streaming_bulk")
 def test_bulk_index_queryset_success(mock_bulk, mixin):
     queryset = [MockModel(pk=i, name=f"obj{i}") for i in range(3)]
     for obj in queryset:
         obj._meta.fields = []
+    mock_bulk.side_effect = lambda client, actions, **kwargs: ((True, {}) for _ in actions)
 
-    mixin.bulk_index_queryset(queryset, "test-index")
+    stats = mixin.bulk_index_queryset(queryset, "test-index", thread_count=1)
     assert mock_bulk.called
-    assert mock_bulk.call_args[0][1][0]["_index"] == "test-index"
+    assert mock_bulk.call_args[1]["chunk_size"] == 500
+    assert stats == {"indexed": 3, "failed": 0, "errors": []}
 
 
+@patch("core.mixin_es.parallel_bulk")
+def test_bulk_index_queryset_parallel_reports_progress(mock_bulk, mixin):
+    queryset = (MockModel(pk=i) for i in range(5))
+    error = {"index": {"_id": 4, "status": 400}}
+    mock_bulk.side_effect = lambda client, actions, **kwargs: (
+        (action["_id"] != 4, error if action["_id"] == 4 else {}) for action in actions
+    )
+    progress = []
+
+    stats = mixin.bulk_index_queryset(
+        queryset, "test-index", chunk_size=2, thread_count=3, progress_callback=progress.append
+    )
+    assert mock_bulk.call_args[1]["thread_count"] == 3
+    assert stats == {"indexed": 4, "failed": 1, "errors": [error]}
+    assert [p["indexed"] + p["failed"] for p in progress] == [2, 4, 5]
 
 
 def test_serialize_instance_with_location():
@@ -79,6 +117,33 @@ def test_serialize_instance_with_location():
     assert result["longitude"] == -74.0060
 
 
+def test_serialize_instance_stores_fk_ids_without_fetching():
+    from property.models import Property
+    instance = Property(id=7, name="Cabin", property_type_id=3, organization_id=5)
+    with patch.object(ElasticsearchIndexMixin, "get_organization_ids", return_value={7: 11}):
+        result = ElasticsearchIndexMixin().serialize_instance(instance)
+    assert result["property_type"] == 3
+    assert result["organization"] == 5
+    assert result["organization_id"] == 11
+
+
+def test_serialization_plan_selects_location():
+    from property.models import Property, PropertyLocation
+    mixin = ElasticsearchIndexMixin()
+    assert mixin.get_serialization_plan(PropertyLocation)["select_related"] == ["location"]
+    assert mixin.get_serialization_plan(Property) == {"select_related": [], "prefetch_related": []}
+
+
+@pytest.mark.django_db
+def test_iter_index_actions_one_query_per_chunk(mixin, django_assert_num_queries):
+    from property.models import Property
+    properties = [Property(id=i, name=f"p{i}") for i in range(1, 6)]
+    with django_assert_num_queries(3):
+        actions = list(mixin.iter_index_actions(properties, "property", chunk_size=2))
+    assert [action["_id"] for action in actions] == [1, 2, 3, 4, 5]
+    assert all(action["_source"]["organization_id"] is None for action in actions)
+
+
 
 @patch("core.mixin_es.es.search")
 def test_search_elasticsearch_success(mock_search, mixin):
@@ -113,6 +178,17 @@ def test_build_elasticsearch_filters_basic():
     assert any("nested" in f for f in filters)
 
 
+def test_build_elasticsearch_filters_use_mapped_subfields():
+    mixin = ElasticSearchMixin()
+    mixin.index_name = "test-index"
+    properties = {"name": {"type": "text", "fields": {"keyword": {"type": "keyword"}, "ngram": {"type": "text"}}}}
+    with patch("core.mixin_es.get_index_properties", return_value=properties):
+        filters = mixin.build_elasticsearch_filters({"name__icontains": "Beach", "name__istartswith": "Be"})
+
+    assert {"match": {"name.ngram": {"query": "Beach", "operator": "and"}}} in filters
+    assert {"prefix": {"name.keyword": {"value": "Be", "case_insensitive": True}}} in filters
+
+
 def test_build_elasticsearch_filters_invalid_key():
     mixin = ElasticSearchMixin()
     params = {"some*weird&key": "val"}
@@ -121,8 +197,165 @@ def test_build_elasticsearch_filters_invalid_key():
 
 
 @patch("core.mixin_es.es.index", side_effect=Exception("ES down"))
-def test_index_instance_failure(mock_index, mixin):
+def test_index_instance_failure(mock_index, mixin, sync_indexing):
     instance = MockModel(name="Fail")
     with pytest.raises(Exception) as excinfo:
         mixin.index_instance(instance, "fail-index")
     assert "ES down" in str(excinfo.value)
+
+
+@patch("core.mixin_es.es")
+def test_search_elasticsearch_cursor_pages_with_search_after(mock_es, mixin):
+    mock_es.open_point_in_time.return_value = {"id": "pit-1"}
+    mock_es.search.return_value = {
+        "pit_id": "pit-2",
+        "hits": {"hits": [
+            {"_source": {"id": 1}, "sort": ["a", 1]},
+            {"_source": {"id": 2}, "sort": ["b", 2]},
+        ]},
+    }
+    results, cursor, _ = mixin.search_elasticsearch_cursor("test-index", {"query": {"match_all": {}}}, per_page=2, ordering="name")
+
+    assert results == [{"id": 1}, {"id": 2}]
+    body = mock_es.search.call_args[1]["body"]
+    assert body["pit"]["id"] == "pit-1"
+    assert body["sort"][-1] == {"id": {"order": "asc"}}
+
+    mock_es.search.return_value = {"pit_id": "pit-2", "hits": {"hits": [{"_source": {"id": 3}, "sort": ["c", 3]}]}}
+    results, next_cursor, _ = mixin.search_elasticsearch_cursor("test-index", {"query": {"match_all": {}}}, per_page=2, cursor=cursor)
+
+    body = mock_es.search.call_args[1]["body"]
+    assert body["search_after"] == ["b", 2]
+    assert body["pit"]["id"] == "pit-2"
+    assert next_cursor is None
+    mock_es.close_point_in_time.assert_called_once_with(id="pit-2")
+
+
+def test_search_elasticsearch_cursor_rejects_garbage(mixin):
+    with pytest.raises(ValidationError):
+        mixin.search_elasticsearch_cursor("test-index", {}, cursor="not-a-cursor")
+
+
+def test_build_elasticsearch_sort_uses_keyword_and_id_tiebreaker(mixin):
+    properties = {"name": {"type": "text", "fields": {"keyword": {"type": "keyword"}}}}
+    with patch("core.mixin_es.get_index_properties", return_value=properties):
+        sort = mixin.build_elasticsearch_sort("-name,-id")
+    assert sort == [
+        {"name.keyword": {"order": "desc", "unmapped_type": "keyword"}},
+        {"id": {"order": "desc"}},
+    ]
+
+
+@patch("core.mixin_es.es.search")
+def test_search_elasticsearch_page_returns_total_and_facets(mock_search, mixin, settings):
+    settings.ES_TRACK_TOTAL_HITS = 5000
+    mock_search.return_value = {
+        "hits": {"total": {"value": 5000, "relation": "gte"}, "hits": [{"_source": {"id": 1}}]},
+        "aggregations": {"facet_status": {"buckets": [{"key": "open", "doc_count": 7}]}},
+    }
+    data = mixin.search_elasticsearch_page("test-index", {"query": {"match_all": {}}}, aggs={"facet_status": {}})
+
+    assert mock_search.call_args[1]["body"]["track_total_hits"] == 5000
+    assert data["total"] == 5000 and data["relation"] == "gte"
+    assert data["facets"] == {"status": [{"value": "open", "count": 7}]}
+
+
+def test_build_facet_aggs_only_allows_facet_fields(mixin):
+    mixin.facet_fields = ["status"]
+    assert mixin.build_facet_aggs("status") == {"facet_status": {"terms": {"field": "status", "size": 20}}}
+    with pytest.raises(ValidationError):
+        mixin.build_facet_aggs("status,secret")
+
+
+def test_build_elasticsearch_filters_rejects_unknown_params(mixin):
+    mixin.filterable_fields = {"status": ["exact", "in"], "check_in": ["gte", "lte"]}
+    assert mixin.build_elasticsearch_filters({"status": "open", "check_in__gte": "2024-01-01"}) == [
+        {"match": {"status": "open"}},
+        {"range": {"check_in": {"gte": "2024-01-01"}}},
+    ]
+    with pytest.raises(ValidationError) as excinfo:
+        mixin.build_elasticsearch_filters({"secret": "x", "status__icontains": "op"})
+    assert set(excinfo.value.detail) == {"secret", "status__icontains"}
+
+
+def test_filterable_fields_default_to_index_mapping(mixin):
+    mixin.index_name = "test-index"
+    properties = {"name": {"type": "text", "fields": {"keyword": {"type": "keyword"}}}, "beds": {"type": "long"}}
+    with patch("core.mixin_es.get_index_properties", return_value=properties):
+        filters = mixin.build_elasticsearch_filters({"name": "Villa", "beds": "3", "organization_id": "1"})
+        with pytest.raises(ValidationError):
+            mixin.build_elasticsearch_filters({"unknown": "1"})
+
+    assert filters == [
+        {"term": {"name.keyword": {"value": "Villa", "case_insensitive": True}}},
+        {"term": {"beds": "3"}},
+        {"match": {"organization_id": "1"}},
+    ]
+
+
+def _query_request(params):
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    return Request(APIRequestFactory().get("/", params))
+
+
+def test_get_source_filter_params_override_viewset_defaults(mixin):
+    mixin.source_excludes = ["features_*"]
+    assert mixin.get_source_filter(_query_request({})) == {"excludes": ["features_*"]}
+    assert mixin.get_source_filter(_query_request({"fields": "name,city", "exclude": "payload"})) == {
+        "includes": ["id", "name", "city"],
+        "excludes": ["payload"],
+    }
+
+
+@patch("core.mixin_es.es.get")
+def test_get_elasticsearch_document_projects_source(mock_get, mixin):
+    mixin.source_excludes = ["features_*"]
+    mock_get.return_value = {"_source": {"id": 1, "name": "Villa"}}
+
+    assert mixin.get_elasticsearch_document("test-index", 1, _query_request({"fields": "name"})) == {"id": 1, "name": "Villa"}
+    mock_get.assert_called_once_with(index="test-index", id=1, source_includes=["id", "name"])
+
+
+def test_operators_must_fit_the_mapping_type(mixin):
+    mixin.index_name = "test-index"
+    mixin.filterable_fields = {"check_in": ["exact", "gte", "icontains"], "beds": ["in", "istartswith"], "active": ["exact"]}
+    properties = {"check_in": {"type": "date"}, "beds": {"type": "long"}, "active": {"type": "boolean"}}
+    with patch("core.mixin_es.get_index_properties", return_value=properties):
+        assert mixin.build_elasticsearch_filters({"check_in__gte": "2024-01-01", "beds__in": "1,2"}) == [
+            {"range": {"check_in": {"gte": "2024-01-01"}}},
+            {"terms": {"beds": ["1", "2"]}},
+        ]
+        with pytest.raises(ValidationError) as excinfo:
+            mixin.build_elasticsearch_filters({"check_in__icontains": "2024", "beds__istartswith": "1"})
+        assert set(excinfo.value.detail) == {"check_in__icontains", "beds__istartswith"}
+
+
+def test_every_es_viewset_declares_filterable_fields():
+    from core.es_mappings import get_indexed_viewsets
+
+    undeclared = [
+        viewset.__name__ for viewset in get_indexed_viewsets().values()
+        if viewset.__module__.endswith(".viewsets") and viewset.filterable_fields is None
+    ]
+    assert undeclared == []
+
+
+@patch("core.mixin_es.es")
+def test_cursor_is_signed_per_index(mock_es, mixin):
+    import base64
+    import json
+
+    forged = base64.urlsafe_b64encode(json.dumps({
+        "pit": "pit-1", "after": [1], "sort": [{"_script": {"script": "1"}}],
+    }).encode()).decode()
+    cursor = mixin.encode_cursor("test-index", "pit-1", ["b", 2], "-name")
+
+    for index_name, value in [("test-index", forged), ("other-index", cursor)]:
+        with pytest.raises(ValidationError):
+            mixin.search_elasticsearch_cursor(index_name, {}, cursor=value)
+    mock_es.search.assert_not_called()
+
+    mock_es.search.return_value = {"hits": {"hits": []}}
+    mixin.search_elasticsearch_cursor("test-index", {}, cursor=cursor, ordering="_script")
+    assert mock_es.search.call_args[1]["body"]["sort"][0] == {"name": {"order": "desc", "unmapped_type": "keyword"}}
@@ -0,0 +1,43 @@
+import pytest
+from unittest.mock import MagicMock
+from django.db import transaction
+
+from core.on_commit import AfterCommitBatch
+
+
+@pytest.mark.django_db
+def test_batch_flushes_once_after_commit(django_capture_on_commit_callbacks):
+    flush = MagicMock()
+    batch = AfterCommitBatch(flush)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        batch.add(lambda items: items.add(1))
+        batch.add(lambda items: items.add(2))
+        flush.assert_not_called()
+
+    flush.assert_called_once_with({1, 2})
+
+
+@pytest.mark.django_db
+def test_rolled_back_items_join_the_next_commit(django_capture_on_commit_callbacks):
+    flush = MagicMock()
+    batch = AfterCommitBatch(flush)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError), transaction.atomic():
+            batch.add(lambda items: items.add(1))
+            raise RuntimeError
+        batch.add(lambda items: items.add(2))
+
+    flush.assert_called_once_with({1, 2})
+
+
+@pytest.mark.django_db(transaction=True)
+def test_batch_flushes_at_once_outside_a_transaction():
+    flush = MagicMock()
+    batch = AfterCommitBatch(flush)
+
+    batch.add(lambda items: items.add(1))
+    batch.add(lambda items: items.add(2))
+
+    assert flush.call_args_list == [(({1},),), (({2},),)]
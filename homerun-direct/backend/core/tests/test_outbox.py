@@ -0,0 +1,113 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from django.db import transaction
+
+from core import outbox
+from core.mixin_es import ElasticSearchMixin
+from core.models import Entity, OutboxEvent
+
+
+class EntityIndex(ElasticSearchMixin):
+    queryset = Entity.objects.all()
+
+
+@pytest.fixture
+def enabled(settings):
+    settings.OUTBOX = {"ENABLED": True, "MAX_ATTEMPTS": 2}
+    with patch.object(outbox, "_indices", {"core.entity": [("entity", EntityIndex)]}):
+        yield
+
+
+@pytest.fixture
+def mock_bulk():
+    with patch("core.outbox.bulk", return_value=(1, [])) as bulk, \
+            patch("core.outbox.get_client"), patch("core.outbox.ensure_index"):
+        yield bulk
+
+
+def make_entity(name):
+    return Entity.objects.create(name=name, url_path=f"/api/{name}/", model_path="core.Entity")
+
+
+@pytest.mark.django_db
+def test_disabled_outbox_records_nothing(settings):
+    settings.OUTBOX = {"ENABLED": False}
+    make_entity("alpha")
+    assert not OutboxEvent.objects.exists()
+
+
+@pytest.mark.django_db
+def test_changes_are_recorded_in_the_same_transaction(enabled):
+    entity = make_entity("alpha")
+    entity.save()
+    try:
+        with transaction.atomic():
+            make_entity("beta")
+            raise RuntimeError("rollback")
+    except RuntimeError:
+        pass
+
+    assert list(OutboxEvent.objects.values_list("object_pk", "operation")) == [
+        (str(entity.pk), "index"), (str(entity.pk), "index"),
+    ]
+
+
+@pytest.mark.django_db
+def test_drain_deduplicates_and_deletes_missing_rows(enabled, mock_bulk):
+    kept = make_entity("alpha")
+    kept.save()
+    gone = make_entity("beta")
+    gone_pk = gone.pk
+    gone.delete()
+
+    stats = outbox.drain()
+
+    assert stats == {"events": 4, "objects": 2, "failed": 0, "skipped": 0}
+    actions = mock_bulk.call_args[0][1]
+    assert [(a.get("_op_type", "index"), a["_id"]) for a in actions] == [("index", kept.pk), ("delete", gone_pk)]
+    assert not OutboxEvent.objects.exists()
+
+
+@pytest.mark.django_db
+def test_rows_are_left_to_the_worker_holding_their_oldest_event(enabled, mock_bulk):
+    entity = make_entity("alpha")
+    entity.save()
+    older, newer = OutboxEvent.objects.order_by("id")
+
+    # Another worker holds the older event (locked, so not claimed here)
+    with patch("core.outbox.claim_events", return_value=[newer]):
+        stats = outbox.drain()
+
+    assert stats == {"events": 1, "objects": 0, "failed": 0, "skipped": 1}
+    mock_bulk.assert_not_called()
+    assert OutboxEvent.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_failed_changes_stay_queued_until_max_attempts(enabled, mock_bulk):
+    mock_bulk.side_effect = Exception("ES down")
+    make_entity("alpha")
+
+    assert outbox.drain()["failed"] == 1
+    assert outbox.drain()["failed"] == 1
+    assert outbox.drain()["events"] == 0
+
+    event = OutboxEvent.objects.get()
+    assert event.attempts == 2
+    assert "ES down" in event.last_error
+
+
+@pytest.mark.django_db
+def test_registered_handlers_get_committed_rows(enabled, mock_bulk):
+    handler = MagicMock()
+    outbox.register_outbox_handler("core.Entity", handler)
+    try:
+        entity = make_entity("alpha")
+        outbox.record_changes(Entity, [entity.pk + 100], OutboxEvent.DELETE)
+        outbox.drain()
+    finally:
+        outbox._handlers.pop("core.entity", None)
+
+    instances, deleted_pks = handler.call_args[0]
+    assert instances == [entity]
+    assert deleted_pks == [entity.pk + 100]
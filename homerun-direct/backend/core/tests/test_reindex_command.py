@@ -0,0 +1,74 @@
+import pytest
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core.management.commands import reindex
+
+
+class FakeViewSet:
+    index_name = "entity"
+
+    def __init__(self):
+        self.queryset = MagicMock()
+
+    def bulk_index_queryset(self, queryset, index_name, **kwargs):
+        return {"indexed": 2, "failed": 0, "errors": []}
+
+
+@pytest.fixture
+def mock_es():
+    with patch("core.management.commands.reindex.es") as es:
+        es.count.return_value = {"count": 2}
+        yield es
+
+
+def _run(**options):
+    queryset = MagicMock()
+    queryset.count.return_value = 2
+    with patch.object(reindex, "get_indexed_viewsets", return_value={"entity": FakeViewSet}), \
+            patch.object(reindex.Command, "get_queryset", return_value=queryset):
+        call_command("reindex", stdout=StringIO(), **options)
+
+
+def test_get_indexed_viewsets_discovers_es_viewsets():
+    viewsets = reindex.get_indexed_viewsets()
+    assert "property" in viewsets and "organization" in viewsets
+
+
+def test_rebuild_swaps_alias_and_removes_legacy_index(mock_es):
+    mock_es.indices.exists_alias.return_value = False
+    mock_es.indices.exists.return_value = True
+    _run()
+
+    new_index = mock_es.indices.create.call_args[1]["index"]
+    assert new_index.startswith("entity_")
+    mock_es.indices.update_aliases.assert_called_once_with(actions=[
+        {"remove_index": {"index": "entity"}},
+        {"add": {"index": new_index, "alias": "entity"}},
+    ])
+
+
+def test_rebuild_moves_alias_and_deletes_old_index(mock_es):
+    mock_es.indices.exists_alias.return_value = True
+    mock_es.indices.get_alias.return_value = {"entity_20240101000000": {}}
+    _run()
+
+    actions = mock_es.indices.update_aliases.call_args[1]["actions"]
+    assert actions[0] == {"remove": {"index": "entity_20240101000000", "alias": "entity"}}
+    mock_es.indices.delete.assert_called_once_with(index="entity_20240101000000", ignore_unavailable=True)
+
+
+def test_rebuild_aborts_on_count_mismatch(mock_es):
+    mock_es.count.return_value = {"count": 1}
+    with pytest.raises(CommandError):
+        _run()
+    mock_es.indices.update_aliases.assert_not_called()
+    assert mock_es.indices.delete.called
+
+
+def test_since_reindexes_in_place(mock_es):
+    _run(since="2024-05-01")
+    mock_es.indices.create.assert_not_called()
+    mock_es.indices.update_aliases.assert_not_called()
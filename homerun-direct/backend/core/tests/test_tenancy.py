@@ -0,0 +1,55 @@
+import pytest
+from unittest.mock import patch
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from core.tenancy import Tenancy, get_tenancy, invalidate_tenancy, resolve_tenancy
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    from django.core.cache import cache
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class DummyUser:
+    is_authenticated = True
+
+    def __init__(self, user_id=1, is_superuser=False):
+        self.pk = user_id
+        self.is_superuser = is_superuser
+
+
+def _request(user):
+    http_request = RequestFactory().get("/api/brand/")
+    http_request.user = user
+    request = Request(http_request)
+    request.user = user
+    return request
+
+
+@patch("core.tenancy.load_tenancy", return_value=Tenancy(organization_ids=[2, 1], brand_ids=[7]))
+def test_get_tenancy_is_memoized_per_request(mock_load):
+    request = _request(DummyUser())
+    assert get_tenancy(request) is get_tenancy(request)
+    assert get_tenancy(request).organization_ids == [1, 2]
+    # A JWT only request has no session; the next request is served from the cache
+    assert get_tenancy(_request(DummyUser())) == Tenancy(organization_ids=[1, 2], brand_ids=[7])
+    assert mock_load.call_count == 1
+
+
+@patch("core.tenancy.load_tenancy", return_value=Tenancy(organization_ids=[1]))
+def test_invalidate_tenancy_reloads(mock_load):
+    resolve_tenancy(DummyUser(5))
+    invalidate_tenancy(5)
+    resolve_tenancy(DummyUser(5))
+    assert mock_load.call_count == 2
+
+
+@patch("core.tenancy.load_tenancy")
+def test_superuser_has_all_access_without_lookup(mock_load):
+    assert resolve_tenancy(DummyUser(is_superuser=True)).all_access is True
+    mock_load.assert_not_called()
@@ -0,0 +1,89 @@
+import pytest
+from unittest.mock import MagicMock
+from django.contrib.auth import get_user_model
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from core import ui_options
+from core.metadata import CustomUIMetadata
+from core.models import Entity
+from organization.models import Organization
+
+
+@pytest.fixture
+def entity_options():
+    ui_options.register_options_model("core.Entity", search_fields=["name"], label_field="name", threshold=2)
+    yield
+    ui_options.OPTIONS_REGISTRY.pop("core.entity", None)
+
+
+@pytest.fixture
+def entities(db):
+    return [
+        Entity.objects.create(name=name, url_path=f"/api/{name}/", model_path="core.Entity")
+        for name in ("alpha", "beta", "bravo")
+    ]
+
+
+@pytest.fixture
+def client(db):
+    user = get_user_model().objects.create_user(username="options", email="options@example.com", password="x")
+    api_client = APIClient()
+    api_client.force_authenticate(user)
+    return api_client
+
+
+def test_options_endpoint_pages_by_key(client, entity_options, entities):
+    first = client.get("/api/options/core.entity/", {"per_page": 2}).json()
+    assert [row["label"] for row in first["response"]] == ["alpha", "beta"]
+    assert first["pagination"]["next"] == entities[1].pk
+
+    second = client.get("/api/options/core.entity/", {"per_page": 2, "cursor": first["pagination"]["next"]}).json()
+    assert [row["value"] for row in second["response"]] == [entities[2].pk]
+    assert second["pagination"]["next"] is None
+
+
+def test_options_endpoint_is_scoped_to_tenancy(client, settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    user = get_user_model().objects.get(username="options")
+    Organization.objects.bulk_create([
+        Organization(organization_name="Mine", user=user), Organization(organization_name="Theirs"),
+    ])
+
+    found = client.get("/api/options/organization.organization/", {"search": "m"}).json()
+    assert [row["label"] for row in found["response"]] == ["Mine"]
+    assert client.get("/api/options/organization.organization/", {"search": "t"}).json()["response"] == []
+
+
+def test_options_endpoint_search_and_value(client, entity_options, entities):
+    found = client.get("/api/options/core.entity/", {"search": "B"}).json()
+    assert [row["label"] for row in found["response"]] == ["beta", "bravo"]
+
+    selected = client.get("/api/options/core.entity/", {"value": f"{entities[0].pk}"}).json()
+    assert selected["response"] == [{"id": entities[0].pk, "label": "alpha", "value": entities[0].pk}]
+
+
+def test_options_endpoint_only_serves_registered_models(client):
+    assert client.get("/api/options/rbac.directuser/").status_code == 404
+
+
+def test_build_ui_post_switches_to_remote_above_threshold(entity_options, entities):
+    serializer = MagicMock()
+    serializer.fields = {"entity": serializers.PrimaryKeyRelatedField(queryset=Entity.objects.all())}
+
+    result = CustomUIMetadata().build_ui_post({"entity": {"type": "field"}}, serializer)
+
+    assert result["entity"]["remote"] is True
+    assert result["entity"]["options"] == []
+    assert result["entity"]["options_url"] == "/api/options/core.entity/"
+
+
+def test_build_ui_post_keeps_small_models_inline(entity_options, entities):
+    ui_options.OPTIONS_REGISTRY["core.entity"]["threshold"] = 10
+    serializer = MagicMock()
+    serializer.fields = {"entity": serializers.PrimaryKeyRelatedField(queryset=Entity.objects.all())}
+
+    result = CustomUIMetadata().build_ui_post({"entity": {"type": "field"}}, serializer)
+
+    assert "remote" not in result["entity"]
+    assert len(result["entity"]["options"]) == 3
@@ -0,0 +1,122 @@
+import pytest
+from unittest.mock import patch
+from django.test import override_settings
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core import cache_tags
+from core.models import Entity
+from core.tenancy import Tenancy
+from core.viewsets import GenericModelViewSet
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class EntitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Entity
+        fields = ["id", "name", "url_path"]
+
+
+class EntityViewSet(GenericModelViewSet):
+    queryset = Entity.objects.all().order_by("id")
+    serializer_class = EntitySerializer
+    pagination_class = None
+
+
+class DummyUser:
+    is_authenticated = True
+
+    def __init__(self, user_id=1, is_superuser=False):
+        self.id = user_id
+        self.pk = user_id
+        self.is_superuser = is_superuser
+
+
+def _list_request(params=None, user=None, org_ids=None):
+    request = APIRequestFactory().get("/api/entities/", params or {})
+    if org_ids is not None:
+        request._tenancy = Tenancy(organization_ids=org_ids)
+    force_authenticate(request, user=user or DummyUser())
+    return request
+
+
+def _cache_key(params=None, user=None, org_ids=None):
+    request = Request(_list_request(params, user, org_ids))
+    return EntityViewSet().get_list_cache_key(request)
+
+
+@pytest.mark.django_db
+def test_list_cache_key_ignores_param_order():
+    assert _cache_key({"page": 1, "ordering": "name"}, org_ids=[1]) == _cache_key({"ordering": "name", "page": 1}, org_ids=[1])
+
+
+@pytest.mark.django_db
+def test_list_cache_key_differs_per_page_and_tenant():
+    base = _cache_key({"page": 1}, org_ids=[1])
+    assert base != _cache_key({"page": 2}, org_ids=[1])
+    assert base != _cache_key({"page": 1}, org_ids=[2])
+    assert base != _cache_key({"page": 1}, user=DummyUser(is_superuser=True))
+    assert base.startswith("EntityViewSet_list_")
+
+
+def test_list_cache_options_overrides():
+    config = {"TIMEOUT": 120, "MAX_BYTES": 10, "OVERRIDES": {"EntityViewSet": {"TIMEOUT": 5}}}
+    with override_settings(VIEWSET_CACHE=config):
+        assert EntityViewSet().get_list_cache_options() == {"TIMEOUT": 5, "MAX_BYTES": 10}
+
+
+@pytest.mark.django_db
+@patch("core.viewsets.cache")
+def test_list_uses_cached_payload(mock_cache):
+    mock_cache.get.return_value = [{"id": 99}]
+    response = EntityViewSet.as_view({"get": "list"})(_list_request(org_ids=[1]))
+    assert response.data == [{"id": 99}]
+    mock_cache.set.assert_not_called()
+
+
+@pytest.mark.django_db
+@patch("core.viewsets.cache")
+def test_list_skips_cache_for_oversized_payload(mock_cache):
+    mock_cache.get.return_value = None
+    Entity.objects.create(name="Big", url_path="/api/big/", model_path="master.Currency")
+    with override_settings(VIEWSET_CACHE={"TIMEOUT": 60, "MAX_BYTES": 1}):
+        EntityViewSet.as_view({"get": "list"})(_list_request(org_ids=[1]))
+    mock_cache.set.assert_not_called()
+
+    with override_settings(VIEWSET_CACHE={"TIMEOUT": 60, "MAX_BYTES": 1024 * 1024}):
+        EntityViewSet.as_view({"get": "list"})(_list_request(org_ids=[1]))
+    assert mock_cache.set.call_args[1]["timeout"] == 60
+
+
+@pytest.mark.django_db
+def test_list_cache_key_changes_only_for_own_organization_writes():
+    key = _cache_key({"page": 1}, org_ids=[1])
+    cache_tags.bump(*cache_tags.tags_for_instance(Entity(pk=5)))
+    assert _cache_key({"page": 1}, org_ids=[1]) != key  # Entity rows are shared
+
+    key = _cache_key({"page": 1}, org_ids=[1])
+    cache_tags.bump(cache_tags.organization_tag("core.Entity", 2))
+    assert _cache_key({"page": 1}, org_ids=[1]) == key
+    cache_tags.bump(cache_tags.organization_tag("core.Entity", 1))
+    assert _cache_key({"page": 1}, org_ids=[1]) != key
+
+
+@pytest.mark.django_db
+def test_update_bumps_tags_instead_of_scanning():
+    entity = Entity.objects.create(name="Old", url_path="/api/old/", model_path="master.Currency")
+    request = APIRequestFactory().put(
+        f"/api/entities/{entity.pk}/", {"name": "New", "url_path": "/api/old/"}, format="json"
+    )
+    force_authenticate(request, user=DummyUser(is_superuser=True))
+    detail_tag = cache_tags.object_tag("core.Entity", entity.pk)
+    before = cache_tags.get_version(detail_tag)
+
+    response = EntityViewSet.as_view({"put": "update"})(request, pk=entity.pk)
+
+    assert response.status_code == 200
+    assert cache_tags.get_version(detail_tag) == before + 1
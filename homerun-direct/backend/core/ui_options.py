@@ -0,0 +1,128 @@
+"""
+Select options of related fields in form metadata.
+
+Small related models keep their rows inline in the OPTIONS response. Models in
+OPTIONS_REGISTRY with more rows than their threshold are emitted as "remote":
+the field carries the URL of the options endpoint (core.views.OptionsView)
+and the front end searches and pages through it instead. Only registered
+models are served by the endpoint, limited to the caller's organizations
+through ``tenancy_field`` (the lookup of the organization id).
+
+The endpoint searches with ``UPPER(field) LIKE 'PREFIX%'``; every registered
+search field needs the matching expression index, see prefix_search_index().
+"""
+from django.apps import apps
+from django.conf import settings
+from django.db import migrations
+from django.urls import reverse
+
+UI_OPTIONS_DEFAULTS = {
+    "INLINE_THRESHOLD": 100,  # rows; above it registered models go remote
+    "PAGE_SIZE": 20,
+    "MAX_PAGE_SIZE": 100,
+}
+
+# model label (lower case) -> {"search_fields": [...], "label_field": str | None,
+#                               "tenancy_field": str | None, "threshold": int | None}
+OPTIONS_REGISTRY = {
+    "organization.organization": {
+        "search_fields": ["organization_name"], "label_field": "organization_name", "tenancy_field": "id",
+    },
+    "property.property": {"search_fields": ["name"], "label_field": "name", "tenancy_field": "organization_id"},
+    "property.units": {"search_fields": ["name"], "label_field": "name", "tenancy_field": "property__organization_id"},
+}
+
+
+def register_options_model(label, search_fields=(), label_field=None, tenancy_field=None, threshold=None):
+    """
+    Allow ``label`` (app_label.Model) on the options endpoint; threshold 0 is
+    always remote. Without ``tenancy_field`` the rows are shared by every
+    organization (reference data) and served unfiltered.
+    """
+    OPTIONS_REGISTRY[label.lower()] = {
+        "search_fields": list(search_fields),
+        "label_field": label_field,
+        "tenancy_field": tenancy_field,
+        "threshold": threshold,
+    }
+
+
+def prefix_search_index(model_label, field, index_name):
+    """
+    Migration operation adding the index the ``istartswith`` search of the
+    options endpoint uses on PostgreSQL: Django compiles it to
+    ``UPPER(column::text) LIKE UPPER('prefix%')``, which only a
+    text_pattern_ops index on the same expression can serve. Other databases
+    are left alone.
+    """
+
+    def create(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        model = apps.get_model(model_label)
+        column = model._meta.get_field(field).column
+        quote = schema_editor.quote_name
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {quote(index_name)} "
+            f"ON {quote(model._meta.db_table)} (UPPER({quote(column)}::text) text_pattern_ops)"
+        )
+
+    def drop(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.quote_name(index_name)}")
+
+    return migrations.RunPython(create, drop)
+
+
+def get_ui_options_settings():
+    return {**UI_OPTIONS_DEFAULTS, **getattr(settings, "UI_OPTIONS", {})}
+
+
+def get_options_entry(model):
+    return OPTIONS_REGISTRY.get(model._meta.label_lower)
+
+
+def get_options_model(label):
+    """Registered model for ``label`` or None."""
+    if label.lower() not in OPTIONS_REGISTRY:
+        return None
+    try:
+        return apps.get_model(label)
+    except (LookupError, ValueError):
+        return None
+
+
+def is_remote(model):
+    entry = get_options_entry(model)
+    if entry is None:
+        return False
+    threshold = entry.get("threshold")
+    if threshold is None:
+        threshold = get_ui_options_settings()["INLINE_THRESHOLD"]
+    if threshold <= 0:
+        return True
+    # Bounded probe instead of COUNT(*) over the whole table
+    return len(model._default_manager.order_by().values_list("pk", flat=True)[:threshold + 1]) > threshold
+
+
+def remote_options(model):
+    """Field attributes pointing the front end at the options endpoint."""
+    return {
+        "options": [],
+        "remote": True,
+        "options_url": reverse("ui-options", kwargs={"model": model._meta.label_lower}),
+        "options_params": {"search": "search", "cursor": "cursor", "per_page": "per_page", "value": "value"},
+        "per_page": get_ui_options_settings()["PAGE_SIZE"],
+    }
+
+
+def option_rows(model, queryset):
+    """[{"id", "label", "value"}] for ``queryset``; values come from the label column when registered."""
+    entry = get_options_entry(model) or {}
+    label_field = entry.get("label_field")
+    if label_field:
+        return [
+            {"id": pk, "label": label if label is not None else str(pk), "value": pk}
+            for pk, label in queryset.values_list("pk", label_field)
+        ]
+    return [{"id": obj.pk, "label": str(obj), "value": obj.pk} for obj in queryset]
@@ -1,4 +1,5 @@
 from django.urls import path
+from core.views import OptionsView
 from core.viewsets import GenericModelViewSet
 
 entity_list = GenericModelViewSet.as_view({"get": "list", "post": "create"})
@@ -16,5 +17,6 @@ urlpatterns = [
         "api/entities/metadata/",
         GenericModelViewSet.as_view({"get": "metadata"}),
         name="entity-metadata",
-    )
+    ),
+    path("api/options/<str:model>/", OptionsView.as_view(), name="ui-options"),
 ]
@@ -0,0 +1,68 @@
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.tenancy import get_tenancy
+from core.ui_options import get_options_entry, get_options_model, get_ui_options_settings, option_rows
+
+
+class OptionsView(APIView):
+    """
+    Select options of a registered model (core.ui_options.OPTIONS_REGISTRY),
+    limited to the caller's organizations, ordered by primary key and paged
+    by key without a COUNT.
+
+    ?search= prefix match on the registered search fields
+    ?value=1,2 resolves the labels of already selected values
+    ?cursor= (the ``next`` of the previous page) / ?per_page=
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, model):
+        model_class = get_options_model(model)
+        if model_class is None:
+            raise NotFound(f"No options for '{model}'.")
+        entry = get_options_entry(model_class)
+        config = get_ui_options_settings()
+        try:
+            cursor = request.query_params.get("cursor")
+            cursor = int(cursor) if cursor else None
+            per_page = min(max(int(request.query_params.get("per_page", config["PAGE_SIZE"])), 1), config["MAX_PAGE_SIZE"])
+        except ValueError:
+            raise ValidationError({"cursor": "cursor and per_page must be integers."})
+
+        queryset = model_class._default_manager.order_by("pk")
+        tenancy_field = entry.get("tenancy_field")
+        if tenancy_field:
+            tenancy = get_tenancy(request)
+            if not tenancy.all_access:
+                queryset = queryset.filter(**{f"{tenancy_field}__in": tenancy.organization_ids})
+
+        values = request.query_params.get("value")
+        if values:
+            try:
+                queryset = queryset.filter(pk__in=[value for value in values.split(",") if value])
+            except ValueError:
+                raise ValidationError({"value": "Invalid value."})
+
+        search = request.query_params.get("search", "").strip()
+        search_fields = entry["search_fields"]
+        if search and search_fields:
+            condition = Q()
+            for field in search_fields:
+                condition |= Q(**{f"{field}__istartswith": search})
+            queryset = queryset.filter(condition)
+
+        if cursor is not None:
+            queryset = queryset.filter(pk__gt=cursor)
+        rows = option_rows(model_class, queryset[:per_page + 1])
+        return Response({
+            "response": rows[:per_page],
+            "pagination": {
+                "per_page": per_page,
+                "next": rows[per_page - 1]["id"] if len(rows) > per_page else None,
+            },
+        })
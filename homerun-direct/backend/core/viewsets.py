@@ -1,9 +1,28 @@
+import hashlib
+import logging
+import pickle
+import time
+from math import ceil
+from urllib.parse import urlencode
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import filters, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
 from django.core.cache import cache
+from core import cache_tags
+from core.mixin_es import ElasticSearchMixin
+from core.mixin_redis import RedisCacheMixin
+from core.outbox import outbox_enabled
+from core.pagination import CustomPagination
+from core.search_backends import SearchBackendUnavailable, get_backend_class, metrics
+from rbac.org_level_permission import apply_organization_level_filter
+from core.tenancy import get_tenancy
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+logger = logging.getLogger(__name__)
+
 class GenericResponseMixin:
     """
     A Mixin that standardizes API responses for all ViewSets.
@@ -35,21 +54,132 @@ class GenericResponseMixin:
 
 
 class GenericModelViewSet(ModelViewSet, GenericResponseMixin):
+    # Per-viewset list cache settings. ``None`` falls back to
+    # settings.VIEWSET_CACHE (see get_list_cache_options).
+    list_cache_timeout = None
+    list_cache_max_bytes = None
+
+    def get_list_cache_options(self):
+        """
+        Resolve the list cache TTL and max payload size for this viewset.
+
+        Order of precedence: settings.VIEWSET_CACHE["OVERRIDES"][<ViewSetName>],
+        then the class attributes, then the project wide defaults.
+        """
+        config = getattr(settings, "VIEWSET_CACHE", {})
+        options = {
+            "TIMEOUT": config.get("TIMEOUT", 300),
+            "MAX_BYTES": config.get("MAX_BYTES", 512 * 1024),
+        }
+        if self.list_cache_timeout is not None:
+            options["TIMEOUT"] = self.list_cache_timeout
+        if self.list_cache_max_bytes is not None:
+            options["MAX_BYTES"] = self.list_cache_max_bytes
+        options.update(config.get("OVERRIDES", {}).get(self.__class__.__name__, {}))
+        return options
+
+    def get_cache_org_ids(self, request):
+        """
+        Organization ids the requesting user can see, or ``None`` when the
+        response is not tenant restricted (superusers, anonymous requests).
+        """
+        user = getattr(request, "user", None)
+        if user is None or not user.is_authenticated or user.is_superuser:
+            return None
+        return get_tenancy(request).organization_ids
+
+    def get_cache_scope(self, request):
+        """
+        Identify the organization scope the response was built for, so two
+        tenants never share a cached page.
+        """
+        user = getattr(request, "user", None)
+        if user is None or not user.is_authenticated:
+            return "anon"
+        org_ids = self.get_cache_org_ids(request)
+        if org_ids is None:
+            return "all"
+        return "orgs:" + ",".join(str(org_id) for org_id in org_ids)
+
+    def get_cache_model_label(self):
+        queryset = getattr(self, "queryset", None)
+        if queryset is not None:
+            return queryset.model._meta.label
+        return self.__class__.__name__
+
+    def get_list_cache_tags(self, request):
+        """
+        Tags whose versions are embedded in the list key. Tenant scoped lists
+        only depend on their own organizations, so writes in another
+        organization leave them cached.
+        """
+        label = self.get_cache_model_label()
+        org_ids = self.get_cache_org_ids(request)
+        if org_ids is None:
+            return [cache_tags.epoch_tag(label), cache_tags.model_tag(label)]
+        return [cache_tags.epoch_tag(label), cache_tags.shared_tag(label)] + [
+            cache_tags.organization_tag(label, org_id) for org_id in org_ids
+        ]
+
+    def get_queryset_fingerprint(self):
+        """Fingerprint of the SQL behind the list, changes when get_queryset() does."""
+        try:
+            return str(self.get_queryset().query)
+        except Exception:
+            queryset = getattr(self, "queryset", None)
+            return queryset.model._meta.label if queryset is not None else ""
+
+    def get_list_cache_key(self, request):
+        """
+        Build the list cache key from the normalized query string, the
+        requesting user's organization scope, the queryset fingerprint and
+        the current versions of the list's cache tags.
+        """
+        params = sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            for value in values
+            if value != ""
+        )
+        versions = cache_tags.get_versions(self.get_list_cache_tags(request))
+        raw = "|".join([
+            urlencode(params),
+            self.get_cache_scope(request),
+            self.get_queryset_fingerprint(),
+            ".".join(str(version) for version in versions),
+        ])
+        digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+        return f"{self.__class__.__name__}_list_{digest}"
+
     def list(self, request, *args, **kwargs):
-        """Cache GET response"""
-        cache_key = f"{self.__class__.__name__}_list"
+        """Cache GET response per query, tenant and queryset"""
+        options = self.get_list_cache_options()
+        if not options["TIMEOUT"]:
+            return super().list(request, *args, **kwargs)
+
+        cache_key = self.get_list_cache_key(request)
         cached_data = cache.get(cache_key)
 
-        if cached_data:
+        if cached_data is not None:
             return Response(cached_data)
 
         response = super().list(request, *args, **kwargs)
-        cache.set(cache_key, response.data, timeout=300)  # 5 minutes
+        if response.status_code == status.HTTP_200_OK:
+            try:
+                payload_size = len(pickle.dumps(response.data, pickle.HIGHEST_PROTOCOL))
+            except (pickle.PicklingError, TypeError, AttributeError):
+                return response  # Not cacheable
+            if payload_size <= options["MAX_BYTES"]:
+                cache.set(cache_key, response.data, timeout=options["TIMEOUT"])
         return response
 
     def retrieve(self, request, *args, **kwargs):
         """Cache individual object retrieval"""
-        cache_key = f"{self.__class__.__name__}_detail_{kwargs['pk']}"
+        label = self.get_cache_model_label()
+        cache_key = cache_tags.versioned_key(
+            f"{self.__class__.__name__}_detail_{kwargs['pk']}",
+            [cache_tags.epoch_tag(label), cache_tags.object_tag(label, kwargs["pk"])],
+        )
         cached_data = cache.get(cache_key)
 
         if cached_data:
@@ -59,21 +189,220 @@ class GenericModelViewSet(ModelViewSet, GenericResponseMixin):
         cache.set(cache_key, response.data, timeout=300)
         return response
 
+    def get_object(self):
+        obj = super().get_object()
+        # Tags are taken before the write, while pk and organization are intact
+        self._cache_write_tags = set(cache_tags.tags_for_instance(obj))
+        return obj
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        self._cache_serializer = serializer  # Remembered for invalidate_cache()
+        return serializer
+
+    def invalidate_cache(self):
+        """
+        Bump the cache tags touched by a write. Costs one INCR per tag instead
+        of scanning the keyspace; entries built with the old versions expire
+        on their own.
+        """
+        tags = set(getattr(self, "_cache_write_tags", ()))
+        serializer = getattr(self, "_cache_serializer", None)
+        instance = getattr(serializer, "instance", None)
+        if instance is not None and hasattr(instance, "_meta") and instance.pk is not None:
+            tags.update(cache_tags.tags_for_instance(instance))
+
+        if not tags:
+            # Unknown row, drop everything cached for this model
+            tags = {cache_tags.epoch_tag(self.get_cache_model_label())}
+        cache_tags.bump(*sorted(tags))
+
     def create(self, request, *args, **kwargs):
-        """Clear cache on create"""
+        """Invalidate cache on create"""
         response = super().create(request, *args, **kwargs)
-        cache.delete_pattern(f"{self.__class__.__name__}_*")
+        self.invalidate_cache()
         return response
 
     def update(self, request, *args, **kwargs):
-        """Clear cache on update"""
+        """Invalidate cache on update"""
         response = super().update(request, *args, **kwargs)
-        print("XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",response)
-        cache.delete_pattern(f"{self.__class__.__name__}_*")
+        self.invalidate_cache()
         return response
 
     def destroy(self, request, *args, **kwargs):
-        """Clear cache on delete"""
+        """Invalidate cache on delete"""
         response = super().destroy(request, *args, **kwargs)
-        cache.delete_pattern(f"{self.__class__.__name__}_*")
+        self.invalidate_cache()
+        return response
+
+
+class ESModelViewSet(ElasticSearchMixin, GenericModelViewSet):
+    """
+    Model viewset whose list/retrieve are answered by a search backend
+    (Elasticsearch by default, see core.search_backends) and whose writes are
+    mirrored to it. Any backend failure falls back to the database path of
+    GenericModelViewSet; every read is timed in core.search_backends.metrics.
+    """
+    permission_classes = [IsAuthenticated]
+    filter_backends = [filters.OrderingFilter]
+    pagination_class = CustomPagination
+    # Dotted path or class; None uses settings.SEARCH_BACKEND
+    search_backend_class = None
+    # Index fields ?search= runs against; defaults to search_fields
+    es_search_fields = None
+    # Serve retrieve from the database when the backend cannot
+    retrieve_fallback = True
+
+    redis_cache = RedisCacheMixin()
+
+    def get_search_backend(self):
+        backend_class = self.search_backend_class
+        if backend_class is None or isinstance(backend_class, str):
+            backend_class = get_backend_class(backend_class)
+        return backend_class(self)
+
+    def get_search_fields(self):
+        if self.es_search_fields is not None:
+            return list(self.es_search_fields)
+        return list(getattr(self, "search_fields", None) or [])
+
+    def apply_access_filter(self, request, filter_clauses):
+        apply_organization_level_filter(request, filter_clauses)
+
+    def build_search_query(self, request):
+        filter_clauses = self.build_elasticsearch_filters(request.query_params)
+        self.apply_access_filter(request, filter_clauses)
+
+        must_clauses = []
+        search_query = request.query_params.get("search")
+        search_fields = self.get_search_fields()
+        if search_query and search_fields:
+            must_clauses.append({
+                "multi_match": {
+                    "query": search_query,
+                    "fields": search_fields,
+                    "type": "best_fields",
+                    "lenient": True,  # Numeric fields in the list must not fail text queries
+                }
+            })
+        return {"query": {"bool": {"filter": filter_clauses, "must": must_clauses}}}
+
+    def get_page_params(self, request):
+        try:
+            page = int(request.query_params.get("page", 1))
+            per_page = int(request.query_params.get("per_page", 50))
+        except ValueError:
+            raise ValidationError({"page": "page and per_page must be integers."})
+        if page < 1 or per_page < 1:
+            raise ValidationError({"page": "page and per_page must be positive."})
+        return page, min(per_page, CustomPagination.max_page_size)
+
+    def page_list_response(self, backend, request, query, page, per_page):
+        """page/per_page list response whose count is the index wide hit total."""
+        aggs = self.build_facet_aggs(request.query_params.get("facets"))
+        data = backend.search(
+            index_name=self.index_name,
+            query=query,
+            page=page,
+            per_page=per_page,
+            aggs=aggs,
+            source=self.get_source_filter(request),
+        )
+        total = data["total"]
+        has_next = (page - 1) * per_page + len(data["results"]) < total or (
+            data["relation"] == "gte" and len(data["results"]) == per_page
+        )
+        payload = {
+            "response": data["results"],
+            "pagination": {
+                "count": total,
+                "count_relation": data["relation"],
+                "total_pages": ceil(total / per_page),
+                "per_page": per_page,
+                "previous": None if page == 1 else page - 1,
+                "next": page + 1 if has_next else None,
+            }
+        }
+        if aggs:
+            payload["facets"] = data["facets"]
+        return Response(payload, status=status.HTTP_200_OK)
+
+    def cursor_list_response(self, backend, request, query, per_page):
+        """List response for ``?cursor=`` requests; an empty cursor starts from the first page."""
+        results, next_cursor, total = backend.search_cursor(
+            index_name=self.index_name,
+            query=query,
+            per_page=per_page,
+            cursor=request.query_params.get("cursor"),
+            ordering=request.query_params.get("ordering"),
+            source=self.get_source_filter(request),
+        )
+        return Response({
+            "response": results,
+            "pagination": {
+                "count": total,
+                "per_page": per_page,
+                "next_cursor": next_cursor,
+            }
+        }, status=status.HTTP_200_OK)
+
+    def list(self, request, *args, **kwargs):
+        page, per_page = self.get_page_params(request)
+        query = self.build_search_query(request)
+        backend = self.get_search_backend()
+        started = time.monotonic()
+        try:
+            if "cursor" in request.query_params:
+                response = self.cursor_list_response(backend, request, query, per_page)
+            else:
+                response = self.page_list_response(backend, request, query, page, per_page)
+        except ValidationError:
+            raise
+        except Exception as e:
+            if not isinstance(e, SearchBackendUnavailable):
+                logger.warning(f"{self.__class__.__name__}: {backend.name} list failed, falling back to DB: {e}")
+            response = self.fallback_list(request, *args, **kwargs)
+            self._record_search(backend, "list", started, fallback=True)
+            return response
+        self._record_search(backend, "list", started)
         return response
+
+    def fallback_list(self, request, *args, **kwargs):
+        """Database list served when the search backend fails."""
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        backend = self.get_search_backend()
+        started = time.monotonic()
+        try:
+            document = backend.get(self.index_name, kwargs.get("pk"), request)
+        except Exception as e:
+            if not isinstance(e, SearchBackendUnavailable):
+                logger.warning(f"{self.__class__.__name__}: {backend.name} retrieve failed: {e}")
+            self._record_search(backend, "retrieve", started, fallback=self.retrieve_fallback)
+            if not self.retrieve_fallback:
+                return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+            return super().retrieve(request, *args, **kwargs)
+        self._record_search(backend, "retrieve", started)
+        return Response(document)
+
+    def _record_search(self, backend, action, started, fallback=False):
+        metrics.record(
+            self.__class__.__name__, backend.name, action, (time.monotonic() - started) * 1000, fallback=fallback
+        )
+
+    # With the outbox enabled, core.outbox indexes the change once it is committed
+    def perform_create(self, serializer):
+        instance = serializer.save()
+        if not outbox_enabled():
+            self.get_search_backend().index(instance, self.index_name)
+
+    def perform_update(self, serializer):
+        instance = serializer.save()
+        if not outbox_enabled():
+            self.get_search_backend().index(instance, self.index_name)
+
+    def perform_destroy(self, instance):
+        if not outbox_enabled():
+            self.get_search_backend().delete(instance, self.index_name)
+        instance.delete()
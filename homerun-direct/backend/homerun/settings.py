@@ -83,8 +83,8 @@ SIMPLE_JWT = {
 
 
 MIDDLEWARE = [
-    # Audit Logging
-    #"core.middlewares.APILoggingMiddleware",
+    # Audit Logging, switched on by AUDIT_LOGGING["ENABLED"]
+    "core.middlewares.APILoggingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -268,13 +268,120 @@ CACHES = {
     }
 }
 
+# GenericModelViewSet list cache (TIMEOUT in seconds, 0 disables caching).
+# Per viewset values go in OVERRIDES, e.g. {"PropertyViewSet": {"TIMEOUT": 60}}
+VIEWSET_CACHE = {
+    "TIMEOUT": config("VIEWSET_CACHE_TIMEOUT", default=300, cast=int),
+    "MAX_BYTES": config("VIEWSET_CACHE_MAX_BYTES", default=512 * 1024, cast=int),
+    "OVERRIDES": {},
+}
+
+# Seconds the organization/brand ids of a user stay cached (core.tenancy)
+TENANCY_CACHE_TIMEOUT = config("TENANCY_CACHE_TIMEOUT", default=3600, cast=int)
+
+# Seconds a serialized organization stays in the read-through cache (organization.cache_utils)
+ORGANIZATION_CACHE_TIMEOUT = config("ORGANIZATION_CACHE_TIMEOUT", default=3600, cast=int)
+
+# core.metadata.CustomUIMetadata OPTIONS cache (TIMEOUT in seconds, 0 disables caching)
+METADATA_CACHE = {
+    "TIMEOUT": config("METADATA_CACHE_TIMEOUT", default=3600, cast=int),
+}
+
+# Select options in form metadata (core.ui_options). Registered models with more
+# than INLINE_THRESHOLD rows are served by /api/options/<app_label.model>/ instead
+UI_OPTIONS = {
+    "INLINE_THRESHOLD": config("UI_OPTIONS_INLINE_THRESHOLD", default=100, cast=int),
+    "PAGE_SIZE": 20,
+    "MAX_PAGE_SIZE": 100,
+}
+
 # Elasticsearch
 ELASTICSEARCH_DSL = {
     'default': {
-        'hosts': f"http://localhost:9200"
+        'hosts': f"http://localhost:9200",
+        # Client options used by core.es_client.get_client()
+        'request_timeout': config("ES_REQUEST_TIMEOUT", default=5.0, cast=float),
+        'max_retries': config("ES_MAX_RETRIES", default=1, cast=int),
+        'retry_on_timeout': False,
+        'connections_per_node': config("ES_CONNECTIONS_PER_NODE", default=10, cast=int),
+        'sniff_on_start': config("ES_SNIFF_ON_START", default=False, cast=bool),
+        'sniff_on_node_failure': config("ES_SNIFF_ON_NODE_FAILURE", default=False, cast=bool),
     },
 }
 
+# Skip Elasticsearch for COOLDOWN seconds after FAILURE_THRESHOLD consecutive failures
+ES_CIRCUIT_BREAKER = {
+    "FAILURE_THRESHOLD": config("ES_CIRCUIT_FAILURE_THRESHOLD", default=5, cast=int),
+    "COOLDOWN": config("ES_CIRCUIT_COOLDOWN", default=30.0, cast=float),
+}
+
+# Backend answering ESModelViewSet reads (core.search_backends): Elasticsearch, Database or InMemory
+SEARCH_BACKEND = config("SEARCH_BACKEND", default="core.search_backends.ElasticsearchBackend")
+
+# Index level settings applied when an index is created (core.es_mappings)
+ES_INDEX_SETTINGS = {
+    "number_of_shards": config("ES_NUMBER_OF_SHARDS", default=1, cast=int),
+    "number_of_replicas": config("ES_NUMBER_OF_REPLICAS", default=1, cast=int),
+    "refresh_interval": config("ES_REFRESH_INTERVAL", default="5s"),
+}
+
+# Hits counted exactly for list totals; beyond it ES reports a lower bound ("gte")
+ES_TRACK_TOTAL_HITS = config("ES_TRACK_TOTAL_HITS", default=10000, cast=int)
+
+# Background bulk indexing of viewset writes (core.es_queue)
+ES_INDEXING = {
+    "ASYNC": config("ES_INDEXING_ASYNC", default=True, cast=bool),
+    "BACKEND": config("ES_INDEXING_BACKEND", default="memory"),  # memory | redis
+    "BATCH_SIZE": config("ES_INDEXING_BATCH_SIZE", default=500, cast=int),
+    "FLUSH_INTERVAL": config("ES_INDEXING_FLUSH_INTERVAL", default=1.0, cast=float),
+    "MAX_QUEUE_SIZE": 10000,
+    "PUT_TIMEOUT": config("ES_INDEXING_PUT_TIMEOUT", default=0.05, cast=float),  # then OVERFLOW applies
+    "OVERFLOW": config("ES_INDEXING_OVERFLOW", default="sync"),  # sync (index inline) | drop
+    "MAX_RETRIES": 3,
+    "RETRY_BACKOFF": 0.5,
+    "BULK_CHUNK_SIZE": config("ES_BULK_CHUNK_SIZE", default=500, cast=int),
+    "BULK_THREAD_COUNT": config("ES_BULK_THREAD_COUNT", default=4, cast=int),
+}
+
+# Transactional outbox (core.outbox). When enabled, model saves/deletes are
+# recorded in the same transaction and applied to Elasticsearch and Redis by
+# `manage.py drain_outbox --loop`; viewsets and the admin stop indexing inline
+OUTBOX = {
+    "ENABLED": config("OUTBOX_ENABLED", default=False, cast=bool),
+    "BATCH_SIZE": config("OUTBOX_BATCH_SIZE", default=500, cast=int),
+    "MAX_ATTEMPTS": 5,
+    "POLL_INTERVAL": config("OUTBOX_POLL_INTERVAL", default=1.0, cast=float),
+}
+
+# Organizations embedding a saved related row (e.g. their Location) are
+# reindexed after commit in one bulk request; fan-outs above MAX_INLINE run as
+# an Elasticsearch update_by_query task instead (organization.signals)
+CASCADE_REINDEX = {
+    "MAX_INLINE": config("CASCADE_REINDEX_MAX_INLINE", default=500, cast=int),
+}
+
+# property.availability day bitmaps: nights after today they cover, and the
+# longest stay the availability search accepts
+AVAILABILITY_ENGINE = {
+    "HORIZON_DAYS": config("AVAILABILITY_HORIZON_DAYS", default=1095, cast=int),
+    "MAX_STAY": config("AVAILABILITY_MAX_STAY", default=365, cast=int),
+}
+
+# API audit logging (core.middlewares.APILoggingMiddleware). Documents are queued
+# in process and bulk indexed into daily <INDEX_PREFIX>-YYYY.MM.DD indices; a
+# full queue drops documents instead of slowing requests down
+AUDIT_LOGGING = {
+    "ENABLED": config("AUDIT_LOGGING_ENABLED", default=False, cast=bool),
+    "INDEX_PREFIX": config("AUDIT_LOGGING_INDEX_PREFIX", default="api_logs"),
+    "EXCLUDE_PATHS": ["/auth", "/static", "/admin/jsi18n"],
+    "SAMPLE_RATE": config("AUDIT_LOGGING_SAMPLE_RATE", default=1.0, cast=float),
+    "PATH_SAMPLE_RATES": {},
+    "ALWAYS_LOG_STATUS": 400,
+    "MAX_BODY_BYTES": config("AUDIT_LOGGING_MAX_BODY_BYTES", default=1024, cast=int),
+    "MAX_QUEUE_SIZE": config("AUDIT_LOGGING_MAX_QUEUE_SIZE", default=5000, cast=int),
+    "BATCH_SIZE": 200,
+    "FLUSH_INTERVAL": 2.0,
+}
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
@@ -2,26 +2,31 @@ from django.contrib import admin
 from .models import OrganizationType, Organization ,Brand
 
 from core.mixin_es import ElasticSearchMixin  # Make sure this is the correct path to your mixin
+from core.outbox import outbox_enabled
 
 # ✅ Proper mixin for ES indexing from Admin
 class ElasticsearchAdminMixin(ElasticSearchMixin):
     index_name = None  # must be defined in subclass
 
+    def sync_index(self):
+        # With the outbox enabled, core.outbox picks the change up after commit
+        return self.index_name and not outbox_enabled()
+
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
-        if self.index_name:
+        if self.sync_index():
             print(f"📦 Indexing {obj} into {self.index_name}")
             self.index_instance(obj, self.index_name)
 
     def delete_model(self, request, obj):
-        if self.index_name:
+        if self.sync_index():
             print(f"❌ Removing {obj} from {self.index_name}")
             self.clear_index(obj, self.index_name)
         super().delete_model(request, obj)
 
     def delete_queryset(self, request, queryset):
         for obj in queryset:
-            if self.index_name:
+            if self.sync_index():
                 self.clear_index(obj, self.index_name)
         super().delete_queryset(request, queryset)
 
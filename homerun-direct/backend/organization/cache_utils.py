@@ -1,53 +1,98 @@
-import json
-from redis import Redis
-from elasticsearch import Elasticsearch
-from django.core.serializers.json import DjangoJSONEncoder
-from elasticsearch import Elasticsearch
+"""
+Read-through cache of serialized organizations.
 
-es_client = Elasticsearch(
-    [{"host": "localhost", "port": 9200, "scheme": "http"}]  # Add "scheme": "http"
-)
+Entries hold the OrganizationSerializer representation under
+``organization:{id}`` in the default cache, so they share the django-redis
+connection pool. get_organizations() fetches any number of them with one MGET
+and loads the misses with a single ``id__in`` query, writing them back with one
+pipelined set_many. Committed saves and deletes drop the entries
+(organization.signals), and a committed Location save drops the organizations
+that embed it (organization.models).
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+ORGANIZATION_CACHE_TIMEOUT = 60 * 60  # 1 hour
+
+
+def organization_cache_key(organization_id):
+    return f"organization:{organization_id}"
+
+
+def get_cache_timeout():
+    return getattr(settings, "ORGANIZATION_CACHE_TIMEOUT", ORGANIZATION_CACHE_TIMEOUT)
+
+
+def serialize_organization(organization):
+    from organization.serializers import OrganizationSerializer  # Avoid circular import
+    return dict(OrganizationSerializer(organization).data)
+
+
+def load_organizations(organization_ids):
+    """{id: serialized organization} straight from the database, in one query."""
+    from organization.models import Organization  # Avoid circular import
+
+    organizations = Organization.objects.filter(id__in=organization_ids).select_related(
+        "location", "subscription_plan", "user"
+    )
+    return {organization.id: serialize_organization(organization) for organization in organizations}
+
+
+def get_organizations(organization_ids):
+    """
+    {id: serialized organization} for the ids that exist, in the order given.
+    Cache errors fall back to the database.
+    """
+    organization_ids = list(dict.fromkeys(int(organization_id) for organization_id in organization_ids))
+    if not organization_ids:
+        return {}
+
+    keys = {organization_cache_key(organization_id): organization_id for organization_id in organization_ids}
+    try:
+        cached = cache.get_many(list(keys))
+    except Exception:
+        logger.warning("Organization cache unavailable, reading from the database", exc_info=True)
+        cached = {}
+    found = {keys[key]: data for key, data in cached.items()}
+
+    missing = [organization_id for organization_id in organization_ids if organization_id not in found]
+    if missing:
+        loaded = load_organizations(missing)
+        found.update(loaded)
+        if loaded:
+            try:
+                cache.set_many(
+                    {organization_cache_key(organization_id): data for organization_id, data in loaded.items()},
+                    timeout=get_cache_timeout(),
+                )
+            except Exception:
+                logger.warning("Could not cache organizations", exc_info=True)
+
+    return {organization_id: found[organization_id] for organization_id in organization_ids if organization_id in found}
+
+
+def get_organization(organization_id):
+    return get_organizations([organization_id]).get(int(organization_id))
 
-# Initialize Redis & Elasticsearch clients
-redis_client = Redis(host="localhost", port=6379, db=0)
 
 def update_cache(organization):
-    from organization.models import Organization
     """
-    Updates the given organization in Redis and Elasticsearch.
+    Stores the current representation of ``organization`` and returns it.
 
     :param organization: Organization object
     """
     if not organization:
-        return
-
-    # ✅ Convert Organization instance to dictionary
-    organization_data = {
-        "id": organization.id,
-        "organization_name": organization.organization_name,
-        "user_email": organization.user.email if organization.user else None,
-        "subscription_plan": organization.subscription_plan.name if organization.subscription_plan else None,
-        "stripe_subscription_id": organization.stripe_subscription_id,
-        "is_organization_created": organization.is_organization_created,
-        "is_payment_done": organization.is_payment_done,
-        "location": {
-            "street_address": organization.location.street_address if organization.location else None,
-            "city": organization.location.city if organization.location else None,
-            "state_province": organization.location.state_province if organization.location else None,
-            "postal_code": organization.location.postal_code if organization.location else None,
-            "country": organization.location.country if organization.location else None,
-            "latitude": float(organization.location.latitude) if organization.location and organization.location.latitude else None,
-            "longitude": float(organization.location.longitude) if organization.location and organization.location.longitude else None,
-        },
-        "created_at": organization.created_at.isoformat(),
-    }
-
-    # ✅ Store in Redis
-    redis_key = f"organization:{organization.id}"
-    redis_client.set(redis_key, json.dumps(organization_data, cls=DjangoJSONEncoder))
-
-    # ✅ Store in Elasticsearch
-    es_index = "organizations"
-    es_client.index(index=es_index, id=organization.id, body=organization_data)
-
-    print(f"✅ Cache updated for Organization ID {organization.id}")
+        return None
+    data = serialize_organization(organization)
+    cache.set(organization_cache_key(organization.id), data, timeout=get_cache_timeout())
+    return data
+
+
+def invalidate_organizations(*organization_ids):
+    keys = [organization_cache_key(organization_id) for organization_id in organization_ids if organization_id]
+    if keys:
+        cache.delete_many(keys)
@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from core.ui_options import prefix_search_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0003_alter_brandinfos_logo_white_image'),
+    ]
+
+    operations = [
+        prefix_search_index('organization.Organization', 'organization_name', 'org_name_upper_prefix_idx'),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+import logging
+
+from django.db import models, transaction
 from master.models import (
     Language,
     Currency,
@@ -10,7 +12,7 @@ from master.models import (
 )
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from organization.cache_utils import update_cache
+from organization.cache_utils import invalidate_organizations
 from elasticsearch import Elasticsearch
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -18,6 +20,8 @@ from redis import Redis
 from elasticsearch import Elasticsearch
 from core.models import BaseModel
 
+logger = logging.getLogger(__name__)
+
 
 class Organization(BaseModel):
     organization_name = models.CharField(max_length=100, null=True)
@@ -356,10 +360,17 @@ class BrandsEmployees(BaseModel):
 
 
 @receiver(post_save, sender=Location)
-def update_organization_cache_on_location_change(sender, instance, **kwargs):
-    """Update cache for all organizations linked to this location"""
-    organizations = instance.organization_set.all()
-    for org in organizations:
-        update_cache(org)
+def update_organization_cache_on_location_change(sender, instance, using=None, **kwargs):
+    """Drop the cached organizations embedding this location once committed; the next read reloads them"""
+    organization_ids = list(instance.organization_set.values_list("pk", flat=True))
+
+    def invalidate():
+        try:
+            invalidate_organizations(*organization_ids)
+        except Exception:
+            logger.warning(f"Could not invalidate cached organizations of location {instance.pk}", exc_info=True)
+
+    if organization_ids:
+        transaction.on_commit(invalidate, using=using)
 
 
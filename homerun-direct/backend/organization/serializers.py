@@ -1,10 +1,10 @@
 from core.serializers import GenericSerializer
+from core.tenancy import invalidate_tenancy
 from rest_framework import serializers
 from .models import Organization
 from master.models import Location,LocationableType
 from rest_framework.response import Response
 from django.core.exceptions import ValidationError
-from organization.cache_utils import update_cache
 from .models import Brand
 from rest_framework.request import Request
 from rest_framework import serializers
@@ -113,13 +113,8 @@ class OrganizationSerializer(GenericSerializer):
 
         organization = super().create(validated_data)
 
-        # Store organization ID in the session
-        session = self.context['request'].session
-        organization_ids = session.get("organization_ids", [])
-        if organization.id not in organization_ids:
-            organization_ids.append(organization.id)
-            session["organization_ids"] = organization_ids
-            session.modified = True  # Mark session as changed
+        # The owner's tenancy (core.tenancy) now includes the new organization
+        invalidate_tenancy(organization.user_id)
 
         return organization
 
@@ -186,15 +181,8 @@ class BrandSerializer(serializers.ModelSerializer):
         # Create the Brand instance
         brand = super().create(validated_data)
 
-        # Attach its ID to the session
-        request = self.context.get('request')
-        if request:
-            session = request.session
-            brand_ids = session.get("brand_ids", [])
-            if brand.id not in brand_ids:
-                brand_ids.append(brand.id)
-                session["brand_ids"] = brand_ids
-                session.modified = True
+        # The owner's tenancy (core.tenancy) now includes the new brand
+        invalidate_tenancy(brand.organization.user_id)
 
         return brand    # ← make sure to return the created instance!
 
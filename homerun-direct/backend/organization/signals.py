@@ -1,21 +1,112 @@
-from django.db.models.signals import post_save
+import logging
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from master.models import (
     Language, Currency,
     CompanyType, PaymentProcessor, Location, SubscriptionPlan
 )
-from .models import Organization
-from core.mixin_es import ElasticSearchMixin
+from .cache_utils import invalidate_organizations, update_cache
+from .models import Brand, Organization
+from core.mixin_es import ElasticSearchMixin, es
+from core.models import OutboxEvent
+from core.on_commit import AfterCommitBatch
+from core.outbox import outbox_enabled, record_changes, register_outbox_handler
+from core.tenancy import invalidate_tenancy
+
+logger = logging.getLogger(__name__)
 
 cache_search = ElasticSearchMixin()
 
+ORGANIZATION_INDEX = "organization"
+
+CASCADE_REINDEX_DEFAULTS = {
+    "MAX_INLINE": 500,
+}
+
+
+def get_cascade_settings():
+    return {**CASCADE_REINDEX_DEFAULTS, **getattr(settings, "CASCADE_REINDEX", {})}
+
+
+class CascadeReindexer:
+    """
+    Reindexes the documents of ``model`` that embed a saved related row.
+
+    Only relations serialize_instance() reads through (get_serialization_plan)
+    change the document; the others are stored as their id and need nothing.
+    Related pks are collected during the transaction and applied once after
+    commit: up to CASCADE_REINDEX["MAX_INLINE"] documents in one bulk request,
+    larger fan-outs as an update_by_query task Elasticsearch runs in the
+    background.
+    """
+
+    def __init__(self, model, index_name, indexer):
+        self.model = model
+        self.index_name = index_name
+        self.indexer = indexer
+        self.pending = AfterCommitBatch(self.flush, factory=partial(defaultdict, set))
+
+    def depends_on(self, fk_field):
+        return fk_field in self.indexer.get_serialization_plan(self.model)["select_related"]
+
+    def add(self, fk_field, related_pk, using=None):
+        self.pending.add(lambda batch: batch[fk_field].add(related_pk), using)
+
+    def flush(self, batch):
+        max_inline = get_cascade_settings()["MAX_INLINE"]
+        for fk_field, related_pks in batch.items():
+            try:
+                pks = list(
+                    self.model.objects.filter(**{f"{fk_field}__in": related_pks})
+                    .order_by("pk").values_list("pk", flat=True)[:max_inline + 1]
+                )
+                if len(pks) > max_inline:
+                    self.update_by_query(fk_field, related_pks)
+                elif pks:
+                    self.indexer.bulk_index_queryset(self.model.objects.filter(pk__in=pks), self.index_name, thread_count=1)
+            except Exception:
+                logger.warning(f"Could not reindex {self.index_name} documents of {fk_field} {sorted(related_pks)}", exc_info=True)
+
+    def update_by_query(self, fk_field, related_pks):
+        related_model = self.model._meta.get_field(fk_field).related_model
+        for related in related_model.objects.filter(pk__in=related_pks):
+            es.update_by_query(
+                index=self.index_name,
+                query={"term": {fk_field: related.pk}},
+                script={
+                    "lang": "painless",
+                    "source": "for (entry in params.fields.entrySet()) { ctx._source[entry.getKey()] = entry.getValue(); }",
+                    "params": {"fields": self.embedded_fields(fk_field, related)},
+                },
+                conflicts="proceed",
+                wait_for_completion=False,
+            )
+
+    def embedded_fields(self, fk_field, related):
+        """The document fields taken from ``related``, e.g. the flattened Location columns."""
+        document = self.indexer.serialize_instance(self.model(**{fk_field: related}))
+        own_fields = {field.name for field in self.model._meta.fields}
+        return self.indexer.serialize_for_elasticsearch({k: v for k, v in document.items() if k not in own_fields})
+
+
+organization_reindexer = CascadeReindexer(Organization, ORGANIZATION_INDEX, cache_search)
+
+
 def reindex_related_entity_by_fk(model, fk_field: str):
     @receiver(post_save, sender=model)
-    def _reindex(sender, instance, **kwargs):
-        filter_kwargs = {fk_field: instance}
-        orgs = Organization.objects.filter(**filter_kwargs)
-        for org in orgs:
-            cache_search.index_instance(org, "organization")
+    def _reindex(sender, instance, raw=False, using=None, **kwargs):
+        if raw or not organization_reindexer.depends_on(fk_field):
+            return
+        if outbox_enabled():
+            pks = list(Organization.objects.filter(**{fk_field: instance}).values_list("pk", flat=True))
+            record_changes(Organization, pks, OutboxEvent.INDEX, using)
+            return
+        organization_reindexer.add(fk_field, instance.pk, using)
     return _reindex
 
 # Connect signals here:
@@ -26,3 +117,91 @@ reindex_related_entity_by_fk(CompanyType, "company_type")
 reindex_related_entity_by_fk(PaymentProcessor, "payment_processor")
 reindex_related_entity_by_fk(Location, "location")
 reindex_related_entity_by_fk(SubscriptionPlan, "subscription_plan")
+
+
+# Keep the cached organizations and the owners' tenancy current
+@receiver(pre_save, sender=Organization)
+def remember_organization_owner(sender, instance, **kwargs):
+    instance._previous_user_id = (
+        Organization.objects.filter(pk=instance.pk).values_list("user_id", flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Organization)
+def update_user_organizations(sender, instance, created=False, using=None, **kwargs):
+    # Caches are only touched once the row is committed, or a concurrent read
+    # could cache the old row again after the invalidation
+    previous_user_id = getattr(instance, "_previous_user_id", None)
+    transaction.on_commit(partial(_refresh_organization_caches, instance, previous_user_id, created), using=using)
+
+
+def _refresh_organization_caches(instance, previous_user_id, created):
+    try:
+        invalidate_organizations(instance.pk)
+        if created or previous_user_id != instance.user_id:
+            invalidate_tenancy(previous_user_id, instance.user_id)
+    except Exception:
+        logger.warning(f"Could not update cached organizations for organization {instance.pk}", exc_info=True)
+
+
+def refresh_user_organizations(organizations, deleted_pks):
+    """Outbox handler: the committed organizations replace the cached ones."""
+    for organization in organizations:
+        update_cache(organization)
+
+
+register_outbox_handler("organization.Organization", refresh_user_organizations)
+
+
+@receiver(post_delete, sender=Organization)
+def remove_user_organization(sender, instance, using=None, **kwargs):
+    transaction.on_commit(partial(_drop_organization_caches, instance.pk, instance.user_id), using=using)
+
+
+def _drop_organization_caches(organization_id, user_id):
+    try:
+        invalidate_organizations(organization_id)
+        if not user_id:
+            return
+        invalidate_tenancy(user_id)
+    except Exception:
+        logger.warning(f"Could not update cached organizations for organization {organization_id}", exc_info=True)
+
+
+def _owner_id(organization_id):
+    if organization_id is None:
+        return None
+    return Organization.objects.filter(pk=organization_id).values_list("user_id", flat=True).first()
+
+
+def _invalidate_tenancy_on_commit(user_ids, brand_id, using):
+    def invalidate():
+        try:
+            invalidate_tenancy(*user_ids)
+        except Exception:
+            logger.warning(f"Could not invalidate tenancy for brand {brand_id}", exc_info=True)
+    transaction.on_commit(invalidate, using=using)
+
+
+# Brands are scoped through their organization's owner
+@receiver(pre_save, sender=Brand)
+def remember_brand_organization(sender, instance, **kwargs):
+    instance._previous_organization_id = (
+        Brand.objects.filter(pk=instance.pk).values_list("organization_id", flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Brand)
+def update_brand_tenancy(sender, instance, created, using=None, **kwargs):
+    previous_organization_id = getattr(instance, "_previous_organization_id", None)
+    if not created and previous_organization_id == instance.organization_id:
+        return
+    owners = (_owner_id(instance.organization_id), _owner_id(previous_organization_id))
+    _invalidate_tenancy_on_commit(owners, instance.pk, using)
+
+
+@receiver(post_delete, sender=Brand)
+def remove_brand_tenancy(sender, instance, using=None, **kwargs):
+    _invalidate_tenancy_on_commit((_owner_id(instance.organization_id),), instance.pk, using)
@@ -1,289 +1,97 @@
 # test_cache_utils.py
 
-import json
 import pytest
 from unittest.mock import patch, MagicMock
-from django.utils.timezone import now
-from organization.cache_utils import update_cache
+from django.core.cache import cache
+from organization.cache_utils import (
+    get_organization, get_organizations, invalidate_organizations, load_organizations,
+    organization_cache_key, update_cache,
+)
+from organization.models import Organization
 
 
 @pytest.fixture
-def mock_organization():
-    mock_user = MagicMock()
-    mock_user.email = "user@example.com"
-    
-    mock_subscription_plan = MagicMock()
-    mock_subscription_plan.name = "Pro"
-    
-    mock_location = MagicMock()
-    mock_location.street_address = "123 Main St"
-    mock_location.city = "Metropolis"
-    mock_location.state_province = "State"
-    mock_location.postal_code = "12345"
-    mock_location.country = "Country"
-    mock_location.latitude = "40.7128"
-    mock_location.longitude = "-74.0060"
-
-    mock_org = MagicMock()
-    mock_org.id = 1
-    mock_org.organization_name = "TestOrg"
-    mock_org.user = mock_user
-    mock_org.subscription_plan = mock_subscription_plan
-    mock_org.stripe_subscription_id = "sub_12345"
-    mock_org.is_organization_created = True
-    mock_org.is_payment_done = True
-    mock_org.location = mock_location
-    mock_org.created_at = now()
-
-    return mock_org
-
-
-@patch("organization.cache_utils.redis_client.set")
-@patch("organization.cache_utils.es_client.index")
-def test_update_cache_full_data(mock_es_index, mock_redis_set, mock_organization):
-    update_cache(mock_organization)
-
-    expected_key = f"organization:{mock_organization.id}"
-    redis_call_args = mock_redis_set.call_args[0]
-    es_call_args = mock_es_index.call_args[1]
-
-    assert redis_call_args[0] == expected_key
-    assert isinstance(json.loads(redis_call_args[1]), dict)
-    assert es_call_args["index"] == "organizations"
-    assert es_call_args["id"] == mock_organization.id
-    assert isinstance(es_call_args["body"], dict)
-
-
-@patch("organization.cache_utils.redis_client.set")
-@patch("organization.cache_utils.es_client.index")
-def test_update_cache_with_missing_optional_fields(mock_es_index, mock_redis_set):
-    mock_org = MagicMock()
-    mock_org.id = 2
-    mock_org.organization_name = "PartialOrg"
-    mock_org.user = None
-    mock_org.subscription_plan = None
-    mock_org.stripe_subscription_id = None
-    mock_org.is_organization_created = False
-    mock_org.is_payment_done = False
-    mock_org.location = None
-    mock_org.created_at = now()
-
-    update_cache(mock_org)
-
-    redis_data = json.loads(mock_redis_set.call_args[0][1])
-    assert redis_data["user_email"] is None
-    assert redis_data["subscription_plan"] is None
-    assert redis_data["location"]["city"] is None
+def locmem_cache(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    cache.clear()
+    yield
+    cache.clear()
 
 
-def test_update_cache_with_none_input():
-    # Should simply return without doing anything
-    assert update_cache(None) is None
+def fake_load(organization_ids):
+    return {organization_id: {"id": organization_id} for organization_id in organization_ids if organization_id != 3}
+
+
+@patch("organization.cache_utils.load_organizations", side_effect=fake_load)
+def test_get_organizations_reads_through(mock_load, locmem_cache):
+    assert get_organizations([1, 2, 3]) == {1: {"id": 1}, 2: {"id": 2}}
+    mock_load.assert_called_once_with([1, 2, 3])
+
+    mock_load.reset_mock()
+    result = get_organizations(["2", 1])
+
+    assert list(result) == [2, 1]
+    mock_load.assert_not_called()
+
+
+@patch("organization.cache_utils.load_organizations", side_effect=fake_load)
+def test_only_misses_are_loaded(mock_load, locmem_cache):
+    cache.set(organization_cache_key(1), {"id": 1, "cached": True})
+
+    assert get_organizations([1, 2]) == {1: {"id": 1, "cached": True}, 2: {"id": 2}}
+    mock_load.assert_called_once_with([2])
+
 
+@patch("organization.cache_utils.load_organizations", side_effect=fake_load)
+@patch("organization.cache_utils.cache")
+def test_cache_down_falls_back_to_database(mock_cache, mock_load):
+    mock_cache.get_many.side_effect = ConnectionError("Redis down")
+    mock_cache.set_many.side_effect = ConnectionError("Redis down")
 
-@patch("organization.cache_utils.redis_client.set", side_effect=ConnectionError("Redis down"))
-@patch("organization.cache_utils.es_client.index")
-def test_redis_down(mock_es_index, mock_redis_set, mock_organization):
-    with pytest.raises(ConnectionError):
-        update_cache(mock_organization)
+    assert get_organization(1) == {"id": 1}
 
 
-@patch("organization.cache_utils.redis_client.set")
-@patch("organization.cache_utils.es_client.index", side_effect=ConnectionError("Elasticsearch down"))
-def test_elasticsearch_down(mock_es_index, mock_redis_set, mock_organization):
-    with pytest.raises(ConnectionError):
-        update_cache(mock_organization)
-
-
-@patch("organization.cache_utils.redis_client.set")
-@patch("organization.cache_utils.es_client.index")
-def test_invalid_latitude(mock_es_index, mock_redis_set):
-    mock_org = MagicMock()
-    mock_org.id = 3
-    mock_org.organization_name = "BadLocationOrg"
-    mock_org.user = MagicMock(email="user@example.com")
-    mock_org.subscription_plan = MagicMock(name="Basic")
-    mock_org.stripe_subscription_id = "sub_99999"
-    mock_org.is_organization_created = True
-    mock_org.is_payment_done = True
-    mock_org.location = MagicMock(
-        street_address="456 Elm St",
-        city="Gotham",
-        state_province="Province",
-        postal_code="54321",
-        country="Land",
-        latitude="invalid",  # Should raise ValueError
-        longitude="30.0"
-    )
-    mock_org.created_at = now()
-
-    with pytest.raises(ValueError):
-        update_cache(mock_org)
-
-
-@patch("organization.cache_utils.redis_client.set")
-@patch("organization.cache_utils.es_client.index")
-def test_missing_created_at(mock_es_index, mock_redis_set):
-    mock_org = MagicMock()
-    mock_org.id = 4
-    mock_org.organization_name = "NoDateOrg"
-    mock_org.user = MagicMock(email="user@example.com")
-    mock_org.subscription_plan = MagicMock(name="Premium")
-    mock_org.stripe_subscription_id = "sub_77777"
-    mock_org.is_organization_created = True
-    mock_org.is_payment_done = True
-    mock_org.location = None
-    mock_org.created_at = None  # Should raise AttributeError on isoformat
-
-    with pytest.raises(AttributeError):
-        update_cache(mock_org)
-
+@pytest.mark.django_db
+@patch("organization.cache_utils.serialize_organization", side_effect=lambda org: {"id": org.id})
+def test_load_organizations_uses_one_query(mock_serialize, django_assert_num_queries):
+    Organization.objects.bulk_create([Organization(organization_name=name) for name in "AB"])
+    ids = [organization.id for organization in Organization.objects.filter(organization_name__in=["A", "B"])]
+
+    with django_assert_num_queries(1):
+        loaded = load_organizations(ids)
+
+    assert sorted(loaded) == sorted(ids)
+
+
+@patch("organization.cache_utils.serialize_organization", return_value={"id": 5, "organization_name": "Fresh"})
+def test_update_cache_stores_current_representation(mock_serialize, locmem_cache):
+    data = update_cache(MagicMock(id=5))
+
+    assert data == {"id": 5, "organization_name": "Fresh"}
+    assert cache.get(organization_cache_key(5)) == data
+
+
+def test_update_cache_with_none_input():
+    # Should simply return without doing anything
+    assert update_cache(None) is None
 
 
+def test_invalidate_organizations(locmem_cache):
+    cache.set(organization_cache_key(7), {"id": 7})
 
+    invalidate_organizations(7, None)
 
+    assert cache.get(organization_cache_key(7)) is None
 
 
+@pytest.mark.django_db
+def test_organization_save_invalidates_after_commit(locmem_cache, django_capture_on_commit_callbacks):
+    from organization.signals import update_user_organizations
+    organization = Organization(id=11, organization_name="Before")
+    cache.set(organization_cache_key(organization.id), {"id": organization.id, "organization_name": "Before"})
 
+    with django_capture_on_commit_callbacks(execute=True):
+        update_user_organizations(Organization, organization)
+        assert cache.get(organization_cache_key(organization.id)) is not None
 
-
-# # test_cache_utils.py
-
-# import json
-# import pytest
-# from unittest.mock import patch, MagicMock
-# from django.utils.timezone import now
-# from organization.cache_utils import update_cache
-
-
-# @pytest.fixture
-# def mock_organization():
-#     mock_user = MagicMock(email="user@example.com")
-#     mock_subscription_plan = MagicMock(name="Pro")
-#     mock_location = MagicMock(
-#         street_address="123 Main St",
-#         city="Metropolis",
-#         state_province="State",
-#         postal_code="12345",
-#         country="Country",
-#         latitude="40.7128",
-#         longitude="-74.0060"
-#     )
-
-#     mock_org = MagicMock(
-#         id=1,
-#         organization_name="TestOrg",
-#         user=mock_user,
-#         subscription_plan=mock_subscription_plan,
-#         stripe_subscription_id="sub_12345",
-#         is_organization_created=True,
-#         is_payment_done=True,
-#         location=mock_location,
-#         created_at=now()
-#     )
-
-#     return mock_org
-
-
-# @patch("organization.cache_utils.redis_client.set")
-# @patch("organization.cache_utils.es_client.index")
-# def test_update_cache_full_data(mock_es_index, mock_redis_set, mock_organization):
-#     update_cache(mock_organization)
-
-#     expected_key = f"organization:{mock_organization.id}"
-#     redis_call_args = mock_redis_set.call_args[0]
-#     es_call_args = mock_es_index.call_args[1]
-
-#     assert redis_call_args[0] == expected_key
-#     assert isinstance(json.loads(redis_call_args[1]), dict)
-#     assert es_call_args["index"] == "organizations"
-#     assert es_call_args["id"] == mock_organization.id
-#     assert isinstance(es_call_args["body"], dict)
-
-
-# @patch("organization.cache_utils.redis_client.set")
-# @patch("organization.cache_utils.es_client.index")
-# def test_update_cache_with_missing_optional_fields(mock_es_index, mock_redis_set):
-#     mock_org = MagicMock(
-#         id=2,
-#         organization_name="PartialOrg",
-#         user=None,
-#         subscription_plan=None,
-#         stripe_subscription_id=None,
-#         is_organization_created=False,
-#         is_payment_done=False,
-#         location=None,
-#         created_at=now()
-#     )
-
-#     update_cache(mock_org)
-
-#     redis_data = json.loads(mock_redis_set.call_args[0][1])
-#     assert redis_data["user_email"] is None
-#     assert redis_data["subscription_plan"] is None
-#     assert redis_data["location"]["city"] is None
-
-
-# def test_update_cache_with_none_input():
-#     # Should simply return without doing anything
-#     assert update_cache(None) is None
-
-
-# @patch("organization.cache_utils.redis_client.set", side_effect=ConnectionError("Redis down"))
-# @patch("organization.cache_utils.es_client.index")
-# def test_redis_down(mock_es_index, mock_redis_set, mock_organization):
-#     with pytest.raises(ConnectionError):
-#         update_cache(mock_organization)
-
-
-# @patch("organization.cache_utils.redis_client.set")
-# @patch("organization.cache_utils.es_client.index", side_effect=ConnectionError("Elasticsearch down"))
-# def test_elasticsearch_down(mock_es_index, mock_redis_set, mock_organization):
-#     with pytest.raises(ConnectionError):
-#         update_cache(mock_organization)
-
-
-# @patch("organization.cache_utils.redis_client.set")
-# @patch("organization.cache_utils.es_client.index")
-# def test_invalid_latitude(mock_es_index, mock_redis_set):
-#     mock_org = MagicMock(
-#         id=3,
-#         organization_name="BadLocationOrg",
-#         user=MagicMock(email="user@example.com"),
-#         subscription_plan=MagicMock(name="Basic"),
-#         stripe_subscription_id="sub_99999",
-#         is_organization_created=True,
-#         is_payment_done=True,
-#         location=MagicMock(
-#             street_address="456 Elm St",
-#             city="Gotham",
-#             state_province="Province",
-#             postal_code="54321",
-#             country="Land",
-#             latitude="invalid",  # Should raise ValueError
-#             longitude="30.0"
-#         ),
-#         created_at=now()
-#     )
-
-#     with pytest.raises(ValueError):
-#         update_cache(mock_org)
-
-
-# @patch("organization.cache_utils.redis_client.set")
-# @patch("organization.cache_utils.es_client.index")
-# def test_missing_created_at(mock_es_index, mock_redis_set):
-#     mock_org = MagicMock(
-#         id=4,
-#         organization_name="NoDateOrg",
-#         user=MagicMock(email="user@example.com"),
-#         subscription_plan=MagicMock(name="Premium"),
-#         stripe_subscription_id="sub_77777",
-#         is_organization_created=True,
-#         is_payment_done=True,
-#         location=None,
-#         created_at=None  # Should raise AttributeError on isoformat
-#     )
-
-#     with pytest.raises(AttributeError):
-#         update_cache(mock_org)
+    assert cache.get(organization_cache_key(organization.id)) is None
@@ -8,7 +8,9 @@
 
 import pytest
 from unittest.mock import patch
+from django.db import transaction
 from organization.models import Organization
+from organization.signals import organization_reindexer
 from master.models import (
     Language, Currency, CompanyType, PaymentProcessor, Location, SubscriptionPlan, OrganizationType
 )
@@ -23,7 +25,7 @@ def test_user():
 
 # Fixture to provide necessary organization field values for testing
 @pytest.fixture
-def required_org_fields():
+def org_fields_without_location():
     payment_processor = PaymentProcessor.objects.create(value="Stripe", label="Stripe")
     return {
         "organization_type": OrganizationType.objects.create(value="Startup", old_id="org001"),
@@ -31,64 +33,101 @@ def required_org_fields():
         "currency": Currency.objects.create(value="USD", old_id="USD"),
         "company_type": CompanyType.objects.create(value="SaaS"),
         "payment_processor": payment_processor,
-        "location": Location.objects.create(city="NYC", locationable_type_id=1),
         "subscription_plan": SubscriptionPlan.objects.create(
             name="Pro", interval="monthly", price_cents=1000, provider=payment_processor
         ),
     }
 
-# Test to ensure reindexing happens when FK is saved
+
+@pytest.fixture
+def required_org_fields(org_fields_without_location):
+    return {
+        **org_fields_without_location,
+        "location": Location.objects.create(city="NYC", locationable_type_id=1),
+    }
+
+@pytest.fixture
+def bulk_mock():
+    # The Location receiver in organization.models drops cached organizations
+    with patch("organization.signals.cache_search.bulk_index_queryset") as bulk, \
+            patch("organization.models.invalidate_organizations"):
+        yield bulk
+
+
+def create_org(test_user, required_org_fields, **overrides):
+    return Organization.objects.create(**{
+        "organization_name": "Test Org",
+        "user": test_user,
+        "terms_agreement": True,
+        **required_org_fields,
+        **overrides,
+    })
+
+
+# Only relations embedded in the document (the flattened Location) trigger a reindex
 @pytest.mark.django_db
-@patch("organization.signals.cache_search.index_instance")
 @pytest.mark.parametrize("fk_model, fk_field, fk_kwargs", [
     (Language, "language", {"value": "en", "old_id": "lang001"}),
     (Currency, "currency", {"value": "usd", "old_id": "curr001"}),
     (CompanyType, "company_type", {"value": "saas"}),
     (PaymentProcessor, "payment_processor", {"value": "stripe", "label": "Stripe"}),
-    (Location, "location", {"city": "NYC", "locationable_type_id": 1}),
-    (SubscriptionPlan, "subscription_plan", {
-        "name": "Pro", "interval": "monthly", "price_cents": 1000,
-    }),
 ])
-def test_signal_triggers_index_instance_on_fk_save(
-    index_mock, fk_model, fk_field, fk_kwargs, required_org_fields, test_user
+def test_fk_stored_as_id_does_not_reindex(
+    bulk_mock, fk_model, fk_field, fk_kwargs, required_org_fields, test_user, django_capture_on_commit_callbacks
 ):
-    # Create necessary PaymentProcessor for SubscriptionPlan if needed
-    if fk_model.__name__ == "SubscriptionPlan":
-        processor = PaymentProcessor.objects.create(label="Stripe", value="stripe")
-        fk_kwargs["provider_id"] = processor.id
-
-    # Ensure that we are saving the fk_model instance before linking it to the Organization
     instance = fk_model.objects.create(**fk_kwargs)
+    create_org(test_user, required_org_fields, **{fk_field: instance})
 
-    # Create Organization with the necessary fields
-    org_data = {
-        "organization_name": "Test Org",
-        "user": test_user,
-        "terms_agreement": True,
-        **{k: v for k, v in required_org_fields.items() if k != fk_field},
-        fk_field: instance,
-    }
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        instance.save()
+
+    assert not [callback for callback in callbacks if callback.func.__self__ is organization_reindexer.pending]
+    bulk_mock.assert_not_called()
 
-    org = Organization.objects.create(**org_data)
 
-    # Ensure that instance.save() will trigger the post_save signal
-    instance.save()
+@pytest.mark.django_db
+def test_location_saves_reindex_once_after_commit(
+    bulk_mock, org_fields_without_location, test_user, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        location = Location.objects.create(city="NYC", locationable_type_id=1)
+        org = create_org(test_user, org_fields_without_location, location=location)
+        with transaction.atomic():
+            location.city = "Boston"
+            location.save()
+            location.save()
+            bulk_mock.assert_not_called()
 
-    # Confirm that index_instance was called for the Organization
-    index_mock.assert_called_with(org, "organization")
+    bulk_mock.assert_called_once()
+    queryset, index_name = bulk_mock.call_args[0]
+    assert list(queryset) == [org]
+    assert index_name == "organization"
 
 
-# Test to ensure no indexing when no Organization is linked
 @pytest.mark.django_db
-@patch("organization.signals.cache_search.index_instance")
-def test_signal_does_not_index_when_no_organization(index_mock):
-    # Create Language and save it without linking to an organization
-    lang = Language.objects.create(old_id="lang002", value="fr")
-    lang.save()
+def test_large_fan_out_runs_update_by_query(
+    bulk_mock, org_fields_without_location, test_user, settings, django_capture_on_commit_callbacks
+):
+    settings.CASCADE_REINDEX = {"MAX_INLINE": 0}
+
+    with patch("organization.signals.es") as es_mock, django_capture_on_commit_callbacks(execute=True):
+        location = Location.objects.create(city="Boston", locationable_type_id=1)
+        create_org(test_user, org_fields_without_location, location=location)
+        location.save()
 
-    # Ensure no signal was triggered
-    index_mock.assert_not_called()
+    bulk_mock.assert_not_called()
+    kwargs = es_mock.update_by_query.call_args[1]
+    assert kwargs["query"] == {"term": {"location": location.pk}}
+    assert kwargs["script"]["params"]["fields"]["city"] == "Boston"
+    assert kwargs["wait_for_completion"] is False
 
 
+# Test to ensure no indexing when no Organization is linked
+@pytest.mark.django_db
+def test_signal_does_not_index_when_no_organization(bulk_mock, django_capture_on_commit_callbacks):
+    location = Location.objects.create(city="Paris", locationable_type_id=1)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        location.save()
 
+    bulk_mock.assert_not_called()
@@ -6,6 +6,7 @@ from rest_framework.test import APIRequestFactory, force_authenticate
 from unittest.mock import patch, MagicMock
 from django.contrib.auth import get_user_model
 from organization.viewsets import OrganizationViewSet
+from core.tenancy import Tenancy
 from rest_framework import status
 from rest_framework.request import Request
 
@@ -33,32 +34,29 @@ def mock_request_with_session(api_factory, test_user):
 
 
 # ✅ POSITIVE: List view (Elasticsearch success)
-@patch("organization.viewsets.OrganizationViewSet.search_elasticsearch")
+@patch("organization.viewsets.OrganizationViewSet.search_elasticsearch_page")
 def test_list_success(mock_search, api_factory, test_user):
-    mock_search.return_value = [{"organization_name": "Org A"}]
+    mock_search.return_value = {
+        "results": [{"organization_name": "Org A"}], "total": 3, "relation": "eq", "facets": {}
+    }
     view = OrganizationViewSet.as_view({"get": "list"})
     request = api_factory.get("/api/organization/?page=1&per_page=1")
     request.session = {}
+    request._tenancy = Tenancy(organization_ids=[1])
     force_authenticate(request, user=test_user)
     response = view(request)
     assert response.status_code == 200
     assert "response" in response.data
+    assert response.data["pagination"]["count"] == 3
+    assert response.data["pagination"]["next"] == 2
 
 
 
 
 
-@patch("organization.viewsets.es.get")  # Correct path to patch
-@patch("django.shortcuts.get_object_or_404")
-def test_retrieve_success(mock_get_object_or_404, mock_es_get, api_factory, test_user):
-    # Mock Elasticsearch response
-    mock_es_get.return_value = {"_source": {"organization_name": "Test Org"}}
-
-    # Mock fallback
-    mock_org = MagicMock()
-    mock_org.id = 1
-    mock_org.organization_name = "Test Org"
-    mock_get_object_or_404.return_value = mock_org
+@patch("organization.viewsets.get_organization")
+def test_retrieve_success(mock_get_organization, api_factory, test_user):
+    mock_get_organization.return_value = {"id": 1, "organization_name": "Test Org"}
 
     # Setup view and request
     view = OrganizationViewSet.as_view({"get": "retrieve"})
@@ -70,8 +68,7 @@ def test_retrieve_success(mock_get_object_or_404, mock_es_get, api_factory, test
 
     assert response.status_code == 200
     assert response.data["organization_name"] == "Test Org"
-
-
+    mock_get_organization.assert_called_once_with(1)
 
 
 # ✅ POSITIVE: create_checkout_session success
@@ -158,8 +155,8 @@ def test_verify_payment_stripe_error(mock_retrieve, api_factory, test_user):
 
 
 
-@patch("core.mixin_es.es.get", side_effect=Exception("Document not found"))
-def test_retrieve_fail(mock_es_get, api_factory, test_user):
+@patch("organization.viewsets.get_organization", return_value=None)
+def test_retrieve_fail(mock_get_organization, api_factory, test_user):
     view = OrganizationViewSet.as_view({"get": "retrieve"})
     request = api_factory.get("/api/organization/1/")
     force_authenticate(request, user=test_user)
@@ -169,3 +166,24 @@ def test_retrieve_fail(mock_es_get, api_factory, test_user):
     assert response.status_code == 404
     assert response.data == {"detail": "Not found."}
 
+
+
+@pytest.mark.django_db
+@patch("organization.viewsets.get_organizations")
+@patch("organization.viewsets.OrganizationViewSet.search_elasticsearch_page", side_effect=ConnectionError("ES down"))
+def test_list_fallback_reads_through_organization_cache(mock_search, mock_get_organizations, api_factory):
+    from organization.models import Organization
+    user = User.objects.create_user(username="owner", password="password123")
+    Organization.objects.bulk_create([Organization(organization_name=name, user=user) for name in "AB"])
+    ids = list(Organization.objects.order_by("id").values_list("id", flat=True))
+    mock_get_organizations.side_effect = lambda page_ids: {i: {"id": i} for i in page_ids}
+
+    request = api_factory.get("/api/organization/?page=1&per_page=1")
+    request._tenancy = Tenancy(organization_ids=ids)
+    force_authenticate(request, user=user)
+    response = OrganizationViewSet.as_view({"get": "list"})(request)
+
+    assert response.status_code == 200
+    assert response.data["response"] == [{"id": ids[0]}]
+    assert response.data["pagination"]["count"] == 2
+    mock_get_organizations.assert_called_once_with([ids[0]])
@@ -2,10 +2,11 @@ from core.mixin_es import es
 
 from django.conf import settings
 from django.shortcuts import get_object_or_404
-from core.viewsets import GenericModelViewSet
+from core.viewsets import ESModelViewSet, GenericModelViewSet
 from rest_framework import  status ,filters
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.settings import api_settings
 from rest_framework.response import Response
 from .models import (
     Organization,Brand, BrandFooters, BrandHeaders, BrandInfos, BrandHomePages,BrandPages,
@@ -30,220 +31,83 @@ from django.contrib.auth import get_user_model
 from payment.services.stripe_service import create_checkout_session
 from core.pagination import CustomPagination
 from rest_framework_simplejwt.tokens import RefreshToken
-from core.mixin_es import ElasticSearchMixin
+from core.mixin_es import (
+    BOOLEAN_OPERATORS, EXACT_OPERATORS, RANGE_OPERATORS, TEXT_OPERATORS, ElasticSearchMixin,
+)
 import stripe
 from core.mixin_redis import RedisCacheMixin
+from organization.cache_utils import get_organization, get_organizations
 from urllib.parse import urlencode
 
 
 from rbac.org_level_permission import apply_organization_level_filter,apply_brand_level_filter
+from core.tenancy import get_tenancy
 User = get_user_model()
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
-class ESModelViewSet(ElasticSearchMixin, GenericModelViewSet):
-    permission_classes = [IsAuthenticated]
-    filter_backends = [filters.OrderingFilter]
-    pagination_class = CustomPagination
-    redis_cache = RedisCacheMixin()
-
-    def get_searchable_fields(self):
-        # Get all field names dynamically from the model
-        model_fields = self.queryset.model._meta.get_fields()
-
-        # Dynamically filter out fields that we can search (e.g., CharFields, TextFields)
-        searchable_fields = [
-            field.name
-            for field in model_fields
-            if isinstance(field, (models.CharField, models.TextField))
-        ]
-        
-        # You can also manually add or exclude specific fields if needed
-        searchable_fields = [field for field in searchable_fields if field != 'id']  # exclude 'id' if you don't want it
-
-        return searchable_fields
-
-    def list(self, request, *args, **kwargs):
-        page = int(request.query_params.get('page', 1))
-        per_page = int(request.query_params.get('per_page', 50))
-        filters = request.query_params
-        must_clauses = self.build_elasticsearch_filters(filters)
-        # ✅ Allow filtering/search by organization_id (thanks to step 1 above)
-        org_id = request.query_params.get("organization_id")
-        if org_id:
-            must_clauses.append({
-                "term": {
-                    "organization_id": org_id
-                }
-            })
-        apply_organization_level_filter(request, must_clauses)
-
-        # Optional search term
-        search_query = request.query_params.get('search')
-        if search_query and hasattr(self, 'search_fields'):
-            must_clauses.append({
-                'multi_match': {
-                    'query': search_query,
-                    'fields': searchable_fields,
-                    'type': 'best_fields'
-                }
-            })
-
-        query = {'query': {'bool': {'must': must_clauses}}}
-
-        try:
-            results = self.search_elasticsearch(
-                index_name=self.index_name,
-                query=query,
-                page=page,
-                per_page=per_page
-            )
-            return Response({
-                'response': results,
-                'pagination': {
-                    'count': len(results),
-                    'per_page': per_page,
-                    'previous': None if page == 1 else page - 1,
-                    'next': None if len(results) < per_page else page + 1
-                }
-            }, status=status.HTTP_200_OK)
-        except Exception as e:
-            print('⚠️ ES fallback:', e)
-            return super().list(request, *args, **kwargs)
-
-    def perform_create(self, serializer):
-        instance = serializer.save()
-        self.index_instance(instance, self.index_name)
-        self.redis_cache.set_user_org_session(self.request.user)
-
-    def perform_update(self, serializer):
-        instance = serializer.save()
-        self.index_instance(instance, self.index_name)
-        self.redis_cache.set_user_org_session(self.request.user)
-
-    def perform_destroy(self, instance):
-        self.clear_index(instance, self.index_name)
-        instance.delete()
-
-    from core.mixin_es import es 
-    def retrieve(self, request, *args, **kwargs):
-        pk = kwargs.get("pk")
-        try:
-            es_doc = self.es.get(index=self.index_name, id=pk)["_source"]
-            return Response(es_doc)
-        except Exception as e:
-            print("🔥 ES retrieve failed. Falling back to DB:", e)
-            return super().retrieve(request, *args, **kwargs)
-
-
-class BrandViewSet(ElasticSearchMixin, GenericModelViewSet):
+# Shared by the BrandPageSlice* viewsets, whose documents have the same shape
+BRAND_PAGE_SLICE_FILTERS = {
+    "id": EXACT_OPERATORS,
+    "brand_page": EXACT_OPERATORS,
+    "page_sort": RANGE_OPERATORS,
+    "custom_name": TEXT_OPERATORS,
+    "created_at": RANGE_OPERATORS,
+    "updated_at": RANGE_OPERATORS,
+}
+
+class BrandViewSet(ESModelViewSet):
     serializer_class = BrandSerializer
     queryset = Brand.objects.all()
-    filter_backends = [filters.OrderingFilter]
-    pagination_class = CustomPagination
+    permission_classes = api_settings.DEFAULT_PERMISSION_CLASSES  # Was never restricted to IsAuthenticated
     search_fields = ['name', 'description', 'currency', 'language']
+    es_search_fields = [
+        "organization",
+        "name",
+        "description",
+        "currency",
+        "language",
+        "date_format",
+        "verify_image",
+        "verify_image_description",
+        "verify_signature",
+        "cms_version"
+    ]
     ordering_fields = ['name', 'created_at']
+    facet_fields = ['currency', 'language']
     index_name = "brand"
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization": EXACT_OPERATORS,
+        "name": TEXT_OPERATORS,
+        "currency": TEXT_OPERATORS,
+        "language": TEXT_OPERATORS,
+        "default": BOOLEAN_OPERATORS,
+        "tax_rate": RANGE_OPERATORS,
+        "rate_inflator": RANGE_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
     redis_cache = RedisCacheMixin()
 
     def get_queryset(self):
         qs = Brand.objects.all()
         if self.action in ['update', 'partial_update', 'retrieve']:  # <-- skip permission filter
             return qs
-        if not self.redis_cache.has_all_org_access(self.request.user):
-            org_ids = self.redis_cache.get_user_org_ids(self.request.user)
-            qs = qs.filter(id__in=org_ids)
+        tenancy = get_tenancy(self.request)
+        if not tenancy.all_access:
+            qs = qs.filter(id__in=tenancy.brand_ids)
         return qs
-    
-    
 
-    def list(self, request, *args, **kwargs):
-        page = int(request.query_params.get("page", 1))
-        per_page = int(request.query_params.get("per_page", 50))
-
-        filters = request.query_params
-        must_clauses = self.build_elasticsearch_filters(filters)
-
-        # 🔐 Apply session-based brand permission filtering
-        apply_brand_level_filter(request, must_clauses)
-
-        search_query = request.query_params.get("search")
-        if search_query:
-            must_clauses.append({
-                "multi_match": {
-                    "query": search_query,
-                    "fields": [
-                        "organization"
-                        "name",
-                        "description",
-                        "currency",
-                        "language",
-                        "date_format",
-                        "verify_image",
-                        "verify_image_description",
-                        "verify_signature",
-                        "cms_version"
-                    ]
-                }
-            })
-        print("AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA",must_clauses)
-        query = {
-            "query": {
-                "bool": {
-                    "must": must_clauses
-                }
-            }
-        }
-
-        try:
-            results = self.search_elasticsearch(
-                index_name=self.index_name,
-                query=query,
-                page=page,
-                per_page=per_page
-            )
-            return Response({
-                "response": results,
-                "pagination": {
-                    "count": len(results),
-                    "per_page": per_page,
-                    "previous": None if page == 1 else page - 1,
-                    "next": None if len(results) < per_page else page + 1
-                }
-            }, status=200)
-        except Exception as e:
-            print("🔥 Elasticsearch failed:", e)
-            return super().list(request, *args, **kwargs)
-
-    def perform_create(self, serializer):
-        instance = serializer.save()
-        self.index_instance(instance, self.index_name)
-        self.redis_cache.set_user_org_session(self.request.user)
-
-    def perform_update(self, serializer):
-        instance = serializer.save()
-        print("SSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSS")
-        self.index_instance(instance, self.index_name)
-        self.redis_cache.set_user_org_session(self.request.user)
-
-    def perform_destroy(self, instance):
-        self.clear_index(instance, self.index_name)
-        instance.delete()
-
-    from core.mixin_es import es 
-    def retrieve(self, request, *args, **kwargs):
-        pk = kwargs.get("pk")
-        try:
-            es_doc = self.es.get(index=self.index_name, id=pk)["_source"]
-            return Response(es_doc)
-        except Exception as e:
-            print("🔥 ES retrieve failed:Falling back to DB", e)
-            return super().retrieve(request, *args, **kwargs)
+    def apply_access_filter(self, request, filter_clauses):
+        # 🔐 Apply tenancy-based brand permission filtering
+        apply_brand_level_filter(request, filter_clauses)
 
 
 
-class OrganizationViewSet(ElasticSearchMixin,GenericModelViewSet):
+class OrganizationViewSet(ESModelViewSet):
     
     serializer_class = OrganizationSerializer
+    permission_classes = api_settings.DEFAULT_PERMISSION_CLASSES  # Was never restricted to IsAuthenticated
     
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['organization_name', 'created_at', 'user__email']
@@ -266,7 +130,49 @@ class OrganizationViewSet(ElasticSearchMixin,GenericModelViewSet):
     ordering_fields = [
         'organization_name', 'created_at', 'subscription_plan__name', 'user__email'
     ]
+    es_search_fields = [
+        "organization_name",
+        "organization_type",
+        "language",
+        "currency",
+        "company_type",
+        "payment_processor",
+        "location.city",
+        "location.country",
+        "location.street_address",
+        "location.apt_suite",
+        "location.state_province",
+        "location.postal_code",
+        "subscription_plan",
+        "user.email",
+        "user.first_name",
+        "user.last_name",
+        "stripe_subscription_id"
+    ]
     index_name = "organization"  # Define your Elasticsearch index name
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization_name": TEXT_OPERATORS,
+        "subdomain": TEXT_OPERATORS,
+        "status": TEXT_OPERATORS,
+        "confirmed": BOOLEAN_OPERATORS,
+        "organization_type": EXACT_OPERATORS,
+        "language": EXACT_OPERATORS,
+        "currency": EXACT_OPERATORS,
+        "company_type": EXACT_OPERATORS,
+        "payment_processor": EXACT_OPERATORS,
+        "subscription_plan": EXACT_OPERATORS,
+        "user": EXACT_OPERATORS,
+        "parent_id": EXACT_OPERATORS,
+        "is_organization_created": BOOLEAN_OPERATORS,
+        "is_payment_done": BOOLEAN_OPERATORS,
+        "city": TEXT_OPERATORS,
+        "state_province": TEXT_OPERATORS,
+        "postal_code": TEXT_OPERATORS,
+        "country": TEXT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
     redis_cache = RedisCacheMixin()
     # ✅ ADD this queryset as a fallback
     queryset = Organization.objects.all()
@@ -275,114 +181,34 @@ class OrganizationViewSet(ElasticSearchMixin,GenericModelViewSet):
         qs = Organization.objects.all()
         if self.action in ['update', 'partial_update', 'retrieve']:  # <-- skip permission filter
             return qs
-        if not self.redis_cache.has_all_org_access(self.request.user):
-            org_ids = self.redis_cache.get_user_org_ids(self.request.user)
-            qs = qs.filter(id__in=org_ids)
-        return qs   
-    def list(self, request, *args, **kwargs):
-        page = int(request.query_params.get("page", 1))
-        per_page = int(request.query_params.get("per_page", 50))
-
-        excluded_keys = {"page", "per_page", "search", "ordering"}
-        filters = request.query_params
-        must_clauses = self.build_elasticsearch_filters(filters)
-        # 🔐 Apply org access filtering if not super admin
-        apply_organization_level_filter(request, must_clauses)
-
-
-        # Optional: Add full-text search
-        search_query = request.query_params.get("search")
-        if search_query:
-            must_clauses.append({
-                "multi_match": {
-                    "query": search_query,
-                    "fields": [
-                        "organization_name",
-                        "organization_type",
-                        "language",
-                        "currency",
-                        "company_type",
-                        "payment_processor",
-                        "location.city",
-                        "location.country",
-                        "location.street_address",
-                        "location.apt_suite",
-                        "location.state_province",
-                        "location.postal_code",
-                        "subscription_plan",
-                        "user.email",
-                        "user.first_name",
-                        "user.last_name",
-                        "stripe_subscription_id"
-                    ],
-                    "type": "best_fields"
-                }
-            })
-
-        query = {
-            "query": {
-                "bool": {
-                    "must": must_clauses
-                }
-            }
-        }
-
-        try:
-            results = self.search_elasticsearch(
-                index_name=self.index_name,
-                query=query,
-                page=page,
-                per_page=per_page
-            )
-            base_url = request.build_absolute_uri(request.path)
-            query_dict = request.query_params.copy()
-
-            def build_url(target_page):
-                query_dict["page"] = target_page
-                query_dict["per_page"] = per_page
-                return f"{base_url}?{urlencode(query_dict)}"
-
-            previous_url = build_url(page - 1) if page > 1 else None
-            next_url = build_url(page + 1) if len(results) == per_page else None
-
-            return Response({
-                "response": results,
-                "pagination": {
-                    "count": len(results),
-                    "per_page": per_page,
-                    "previous": None if page == 1 else page - 1,
-                    "next": None if len(results) < per_page else page + 1
-                }
-            }, status=status.HTTP_200_OK)
-        except Exception as e:
-            print("⚠️ Elasticsearch fallback due to error:", e)
-            return None #self.get_queryset()
-
-
-    def perform_create(self, serializer):
-        instance = serializer.save()
-        self.index_instance(instance, self.index_name)
-        self.redis_cache.set_user_org_session(self.request.user)
-
-    def perform_update(self, serializer):
-        instance = serializer.save()
-        self.index_instance(instance, self.index_name)
-        self.redis_cache.set_user_org_session(self.request.user)
+        tenancy = get_tenancy(self.request)
+        if not tenancy.all_access:
+            qs = qs.filter(id__in=tenancy.organization_ids)
+        return qs
 
-    def perform_destroy(self, instance):
-        self.clear_index(instance, self.index_name)
-        instance.delete()
+    def fallback_list(self, request, *args, **kwargs):
+        """
+        The database only pages the ids; the rows are read through the
+        organization cache (organization.cache_utils) like retrieve().
+        """
+        ids = self.filter_queryset(self.get_queryset()).values_list("id", flat=True)
+        page = self.paginate_queryset(ids)
+        ids = list(ids if page is None else page)
+        organizations = get_organizations(ids)
+        data = [organizations[organization_id] for organization_id in ids if organization_id in organizations]
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
 
     def retrieve(self, request, *args, **kwargs):
-        pk = kwargs.get("pk")
+        """Served from the read-through organization cache (organization.cache_utils)."""
         try:
-            print("***********************************************************")
-            es_doc = es.get(index=self.index_name, id=pk)["_source"]
-        except Exception:
-            return Response({"detail": "Not found."}, status=404)
-
-        return Response(es_doc)
-
+            data = get_organization(kwargs["pk"])
+        except (TypeError, ValueError):
+            data = None
+        if data is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(data)
 
     @action(detail=False, methods=['post'],url_path="create-checkout-session")
     def create_checkout_session(self, request):
@@ -435,6 +261,12 @@ class OrganizationViewSet(ElasticSearchMixin,GenericModelViewSet):
 class BrandFootersViewSet(ESModelViewSet):
     serializer_class = BrandFootersSerializer
     index_name = "brandfooters"
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "brand": EXACT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
     queryset = BrandFooters.objects.all()
     redis_cache = RedisCacheMixin()
 
@@ -442,6 +274,12 @@ class BrandFootersViewSet(ESModelViewSet):
 class BrandHeadersViewSet(ESModelViewSet):
     serializer_class = BrandHeadersSerializer
     index_name = "brandheaders"
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "brand": EXACT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
     queryset = BrandHeaders.objects.all()
     redis_cache = RedisCacheMixin()
 
@@ -450,6 +288,16 @@ class BrandHeadersViewSet(ESModelViewSet):
 class BrandHomePagesViewSet(ESModelViewSet):
     serializer_class = BrandHomePagesSerializer
     index_name = "brandhomepages"
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "brand": EXACT_OPERATORS,
+        "template": EXACT_OPERATORS,
+        "title": TEXT_OPERATORS,
+        "cms_display_name": TEXT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
+    source_excludes = ['payload']
     queryset = BrandHomePages.objects.all()
     redis_cache = RedisCacheMixin()
 
@@ -458,6 +306,15 @@ class BrandHomePagesViewSet(ESModelViewSet):
 class BrandInfosViewSet(ESModelViewSet):
     serializer_class = BrandInfosSerializer
     index_name = "brandinfos"
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "brand": EXACT_OPERATORS,
+        "theme": EXACT_OPERATORS,
+        "legacy": BOOLEAN_OPERATORS,
+        "bootstrap4": BOOLEAN_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
     queryset = BrandInfos.objects.all()
     redis_cache = RedisCacheMixin()
 
@@ -465,6 +322,19 @@ class BrandInfosViewSet(ESModelViewSet):
 class BrandPagesViewSet(ESModelViewSet):
     serializer_class = BrandPagesSerializer
     index_name = "brandpages"
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "brand": EXACT_OPERATORS,
+        "template": EXACT_OPERATORS,
+        "title": TEXT_OPERATORS,
+        "slug": TEXT_OPERATORS,
+        "featured": BOOLEAN_OPERATORS,
+        "published": BOOLEAN_OPERATORS,
+        "published_at": RANGE_OPERATORS,
+        "contact_form": BOOLEAN_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
     queryset = BrandPages.objects.all()
     redis_cache = RedisCacheMixin()
 
@@ -472,24 +342,28 @@ class BrandPagesViewSet(ESModelViewSet):
 class BrandPageSliceHeadlineViewSet(ESModelViewSet):
     serializer_class = BrandPageSliceHeadlineSerializer
     index_name = "brandpagesliceheadline"
+    filterable_fields = BRAND_PAGE_SLICE_FILTERS
     queryset = BrandPageSliceHeadline.objects.all()
     redis_cache = RedisCacheMixin()
 
 class BrandPageSliceAmenitiesViewSet(ESModelViewSet):
     serializer_class = BrandPageSliceAmenitiesSerializer
     index_name = "brandpagesliceamenities"
+    filterable_fields = BRAND_PAGE_SLICE_FILTERS
     queryset = BrandPageSliceAmenities.objects.all()
     redis_cache = RedisCacheMixin()
 
 class BrandPageSliceFeaturedListingsViewSet(ESModelViewSet):
     serializer_class = BrandPageSliceFeaturedListingsSerializer
     index_name = "brandpageslicefeaturedlistings"
+    filterable_fields = BRAND_PAGE_SLICE_FILTERS
     queryset = BrandPageSliceFeaturedListings.objects.all()
     redis_cache = RedisCacheMixin()
 
 class BrandPageSliceGridContentBlocksViewSet(ESModelViewSet):
     serializer_class = BrandPageSliceGridContentBlocksSerializer
     index_name = "brandpageslicegridcontentblocks"
+    filterable_fields = BRAND_PAGE_SLICE_FILTERS
     queryset = BrandPageSliceGridContentBlocks.objects.all()
     redis_cache = RedisCacheMixin()
 
@@ -497,6 +371,7 @@ class BrandPageSliceGridContentBlocksViewSet(ESModelViewSet):
 class BrandPageSliceHeadlinesViewSet(ESModelViewSet):
     serializer_class = BrandPageSliceHeadlineSerializer
     index_name = "brandpagesliceheadlines"
+    filterable_fields = BRAND_PAGE_SLICE_FILTERS
     queryset = BrandPageSliceHeadline.objects.all()
     redis_cache = RedisCacheMixin()
 
@@ -505,6 +380,7 @@ class BrandPageSliceHeadlinesViewSet(ESModelViewSet):
 class BrandPageSliceHomepageHerosViewSet(ESModelViewSet):
     serializer_class = BrandPageSliceHomepageHerosSerializer
     index_name = "brandpageslicehomepageheros"
+    filterable_fields = BRAND_PAGE_SLICE_FILTERS
     queryset = BrandPageSliceHomepageHeros.objects.all()
     redis_cache = RedisCacheMixin()
 
@@ -512,6 +388,7 @@ class BrandPageSliceHomepageHerosViewSet(ESModelViewSet):
 class BrandPageSliceLocalActivitiesViewSet(ESModelViewSet):
     serializer_class = BrandPageSliceLocalActivitiesSerializer
     index_name = "brandpageslicelocalactivities"
+    filterable_fields = BRAND_PAGE_SLICE_FILTERS
     queryset = BrandPageSliceLocalActivities.objects.all()
     redis_cache = RedisCacheMixin()
 
@@ -519,6 +396,7 @@ class BrandPageSliceLocalActivitiesViewSet(ESModelViewSet):
 class BrandPageSliceMediaContentBlocksViewSet(ESModelViewSet):
     serializer_class = BrandPageSliceMediaContentBlocksSerializer
     index_name = "brandpageslicemediacontentblocks"
+    filterable_fields = BRAND_PAGE_SLICE_FILTERS
     queryset = BrandPageSliceMediaContentBlocks.objects.all()
     redis_cache = RedisCacheMixin()
 
@@ -527,6 +405,7 @@ class BrandPageSliceMediaContentBlocksViewSet(ESModelViewSet):
 class BrandPageSlicePhotoGalleriesViewSet(ESModelViewSet):
     serializer_class = BrandPageSlicePhotoGalleriesSerializer
     index_name = "brandpageslicephotogalleries"
+    filterable_fields = BRAND_PAGE_SLICE_FILTERS
     queryset = BrandPageSlicePhotoGalleries.objects.all()
     redis_cache = RedisCacheMixin()
 
@@ -534,6 +413,7 @@ class BrandPageSlicePhotoGalleriesViewSet(ESModelViewSet):
 class BrandPageSlicePullQuotesViewSet(ESModelViewSet):
     serializer_class = BrandPageSlicePullQuotesSerializer
     index_name = "brandpageslicepullquotes"
+    filterable_fields = BRAND_PAGE_SLICE_FILTERS
     queryset = BrandPageSlicePullQuotes.objects.all()
     redis_cache = RedisCacheMixin()
 
@@ -541,6 +421,7 @@ class BrandPageSlicePullQuotesViewSet(ESModelViewSet):
 class BrandPageSliceReviewsViewSet(ESModelViewSet):
     serializer_class = BrandPageSliceReviewsSerializer
     index_name = "brandpageslicereviews"
+    filterable_fields = BRAND_PAGE_SLICE_FILTERS
     queryset = BrandPageSliceReviews.objects.all()
     redis_cache = RedisCacheMixin()
 
@@ -548,12 +429,14 @@ class BrandPageSliceReviewsViewSet(ESModelViewSet):
 class BrandPageSliceSingleImagesViewSet(ESModelViewSet):
     serializer_class = BrandPageSliceSingleImagesSerializer
     index_name = "brandpageslicesingleimages"
+    filterable_fields = BRAND_PAGE_SLICE_FILTERS
     queryset = BrandPageSliceSingleImages.objects.all()
     redis_cache = RedisCacheMixin()
 
 class BrandPageSliceVideoEmbedsViewSet(ESModelViewSet):
     serializer_class = BrandPageSliceVideoEmbedsSerializer
     index_name = "brandpageslicevideoembeds"
+    filterable_fields = BRAND_PAGE_SLICE_FILTERS
     queryset = BrandPageSliceVideoEmbeds.objects.all()
     redis_cache = RedisCacheMixin()
 
@@ -561,12 +444,28 @@ class BrandPageSliceVideoEmbedsViewSet(ESModelViewSet):
 class BrandPageSlicesViewSet(ESModelViewSet):
     serializer_class = BrandPageSlicesSerializer
     index_name = "brandpageslices"
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "brand_page": EXACT_OPERATORS,
+        "slice_key": TEXT_OPERATORS,
+        "default_name": TEXT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
     queryset = BrandPageSlices.objects.all()
     redis_cache = RedisCacheMixin()
 
 class BrandsEmployeesViewSet(ESModelViewSet):
     serializer_class = BrandsEmployeesSerializer
     index_name = "brandsemployees"
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "brand": EXACT_OPERATORS,
+        "employee_id": EXACT_OPERATORS,
+        "all_id": EXACT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
     queryset = BrandsEmployees.objects.all()
 
     redis_cache = RedisCacheMixin()
@@ -0,0 +1,426 @@
+"""
+Availability engine: one day bitmap of blocked nights per unit.
+
+Bit ``n`` of a unit's bitmap is the night of ``EPOCH + n days``; a set bit
+means the night is booked or blocked. Bits use Redis' SETBIT order (most
+significant bit first). The bitmap is stored after a header holding its
+horizon, the last night it covers: nights past the horizon are unknown, not
+free, and a search reaching past it rebuilds the unit first. The horizon also
+tells a built unit with no blocked nights from a unit never built.
+
+A unit's bitmap is rebuilt from its Availability calendars and its active
+bookings whenever one of them changes (property.signals, after commit), so
+deleted or moved bookings never leave stale bits behind. Every change bumps a
+per unit generation before the rows are read and a bitmap is only stored if
+no newer generation was stored meanwhile, so concurrent rebuilds cannot
+leave an older bitmap behind. search_available_units() reads only the bytes
+covering the requested window of every candidate unit in one pipeline; units
+not built yet are built on the fly.
+"""
+import logging
+import struct
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core.mixin_redis import get_raw_redis
+from core.on_commit import AfterCommitBatch
+
+logger = logging.getLogger(__name__)
+
+EPOCH = date(2020, 1, 1)
+HEADER = struct.Struct(">BI")  # format version, horizon (offset of the last night covered)
+HEADER_VERSION = 1
+AVAILABILITY_DEFAULTS = {
+    "HORIZON_DAYS": 3 * 365,  # nights after today a bitmap covers
+    "MAX_STAY": 365,  # longest stay a search accepts
+}
+
+# Calendar values meaning "not available" (availability_calendar) or "taken" (booking_calendar)
+BLOCKED_VALUES = {"blocked", "unavailable", "booked", "reserved", "closed", "n", "no", "false", "0"}
+
+
+def get_availability_settings():
+    return {**AVAILABILITY_DEFAULTS, **getattr(settings, "AVAILABILITY_ENGINE", {})}
+
+
+def day_offset(day):
+    return (day - EPOCH).days
+
+
+def bitmap_key(unit_id):
+    return f"availability:unit:{unit_id}"
+
+
+def generation_key(unit_id):
+    """Bumped on every change of the unit."""
+    return f"availability:unit:{unit_id}:generation"
+
+
+def stored_generation_key(unit_id):
+    """Generation of the stored bitmap."""
+    return f"availability:unit:{unit_id}:stored"
+
+
+def read_header(data):
+    """Horizon of a stored bitmap, None when ``data`` is not one."""
+    if len(data) < HEADER.size:
+        return None
+    version, horizon = HEADER.unpack(data[:HEADER.size])
+    return horizon if version == HEADER_VERSION else None
+
+
+def _as_date(value):
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return parse_date(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def _is_blocked(value):
+    if isinstance(value, dict):
+        if "available" in value:
+            return not value["available"]
+        value = value.get("status")
+    if isinstance(value, bool):
+        return not value
+    if isinstance(value, (int, float)):
+        return value == 0
+    return isinstance(value, str) and value.strip().lower() in BLOCKED_VALUES
+
+
+def calendar_blocked_nights(calendar, taken=False):
+    """
+    Blocked nights of an availability or booking calendar. Accepted shapes:
+
+    - {"2025-07-01": false | "blocked" | {"available": false} | ...}
+    - [{"start": "2025-07-01", "end": "2025-07-05"}, ...] (also check_in/check_out, end excluded)
+    - ["2025-07-01", ...]
+
+    With ``taken`` every dated entry counts as blocked (booking_calendar).
+    """
+    if not calendar:
+        return
+    if isinstance(calendar, dict):
+        for key, value in calendar.items():
+            day = _as_date(key)
+            if day is not None and (taken or _is_blocked(value)):
+                yield day
+        return
+    if not isinstance(calendar, list):
+        return
+    for entry in calendar:
+        if isinstance(entry, dict):
+            start = _as_date(entry.get("start") or entry.get("check_in"))
+            end = _as_date(entry.get("end") or entry.get("check_out"))
+            if start is None or (not taken and not _is_blocked(entry.get("status", "blocked"))):
+                continue
+            yield from _nights(start, end or start + timedelta(days=1))
+        else:
+            day = _as_date(entry)
+            if day is not None:
+                yield day
+
+
+def _nights(check_in, check_out):
+    for n in range((check_out - check_in).days):
+        yield check_in + timedelta(days=n)
+
+
+def build_bitmap(nights, until):
+    """Header + bitmap of ``nights`` between EPOCH and ``until``, included."""
+    horizon = day_offset(until)
+    bits = bytearray(horizon // 8 + 1)
+    for night in nights:
+        offset = day_offset(night)
+        if 0 <= offset <= horizon:
+            bits[offset // 8] |= 0x80 >> (offset % 8)
+    # Trailing free bytes are dropped, the header says how far the bitmap goes
+    return HEADER.pack(HEADER_VERSION, horizon) + bytes(bits.rstrip(b"\x00"))
+
+
+def window_is_free(window, first, last):
+    """
+    ``window`` holds the bitmap bytes from byte ``first // 8``; True when no bit
+    between offsets ``first`` and ``last`` (excluded) is set. The caller makes
+    sure ``last - 1`` is within the horizon: bytes missing before it are free.
+    """
+    base = (first // 8) * 8
+    for offset in range(first, last):
+        index = (offset - base) // 8
+        if index >= len(window):
+            return True  # Past the last blocked night
+        if window[index] & (0x80 >> (offset % 8)):
+            return False
+    return True
+
+
+class RedisBitmapStore:
+    # Stores the bitmap unless a newer generation of the unit was stored already
+    REPLACE_SCRIPT = """
+        local stored = tonumber(redis.call('GET', KEYS[2]) or '-1')
+        if stored > tonumber(ARGV[2]) then return 0 end
+        redis.call('SET', KEYS[1], ARGV[1])
+        redis.call('SET', KEYS[2], ARGV[2])
+        return 1
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.replace_script = client.register_script(self.REPLACE_SCRIPT)
+
+    def generations(self, unit_ids, bump=False):
+        """{unit_id: generation}, bumped first with ``bump``."""
+        pipe = self.client.pipeline(transaction=False)
+        for unit_id in unit_ids:
+            if bump:
+                pipe.incr(generation_key(unit_id))
+            else:
+                pipe.get(generation_key(unit_id))
+        return {unit_id: int(value or 0) for unit_id, value in zip(unit_ids, pipe.execute())}
+
+    def replace(self, bitmaps, generations):
+        pipe = self.client.pipeline(transaction=False)
+        for unit_id, bitmap in bitmaps.items():
+            self.replace_script(
+                keys=[bitmap_key(unit_id), stored_generation_key(unit_id)],
+                args=[bitmap, generations[unit_id]],
+                client=pipe,
+            )
+        pipe.execute()
+
+    def windows(self, ranges):
+        """
+        {unit_id: (horizon, bytes from ``first_byte`` to ``last_byte``) or None
+        when the unit was never built} for ``ranges`` = {unit_id: (first_byte, last_byte)}.
+        """
+        unit_ids = list(ranges)
+        pipe = self.client.pipeline(transaction=False)
+        for unit_id in unit_ids:
+            first_byte, last_byte = ranges[unit_id]
+            key = bitmap_key(unit_id)
+            pipe.getrange(key, 0, HEADER.size - 1)
+            pipe.getrange(key, HEADER.size + first_byte, HEADER.size + last_byte)
+        replies = pipe.execute()
+        windows = {}
+        for i, unit_id in enumerate(unit_ids):
+            horizon = read_header(replies[2 * i])
+            windows[unit_id] = None if horizon is None else (horizon, replies[2 * i + 1])
+        return windows
+
+
+class CacheBitmapStore:
+    """
+    Same contract through the Django cache API, for non Redis backends (tests,
+    local dev). The generation check is not atomic there.
+    """
+
+    def generations(self, unit_ids, bump=False):
+        if not bump:
+            stored = cache.get_many([generation_key(unit_id) for unit_id in unit_ids])
+            return {unit_id: stored.get(generation_key(unit_id), 0) for unit_id in unit_ids}
+        generations = {}
+        for unit_id in unit_ids:
+            cache.add(generation_key(unit_id), 0, timeout=None)
+            generations[unit_id] = cache.incr(generation_key(unit_id))
+        return generations
+
+    def replace(self, bitmaps, generations):
+        stored = cache.get_many([stored_generation_key(unit_id) for unit_id in bitmaps])
+        entries = {}
+        for unit_id, bitmap in bitmaps.items():
+            if stored.get(stored_generation_key(unit_id), -1) > generations[unit_id]:
+                continue
+            entries[bitmap_key(unit_id)] = bitmap
+            entries[stored_generation_key(unit_id)] = generations[unit_id]
+        cache.set_many(entries, timeout=None)
+
+    def windows(self, ranges):
+        stored = cache.get_many([bitmap_key(unit_id) for unit_id in ranges])
+        return {
+            unit_id: slice_window(stored.get(bitmap_key(unit_id)), first_byte, last_byte)
+            for unit_id, (first_byte, last_byte) in ranges.items()
+        }
+
+
+def slice_window(bitmap, first_byte, last_byte):
+    """(horizon, bytes from ``first_byte`` to ``last_byte``) of a whole stored bitmap."""
+    horizon = read_header(bitmap) if bitmap else None
+    if horizon is None:
+        return None
+    return horizon, bitmap[HEADER.size + first_byte:HEADER.size + last_byte + 1]
+
+
+def get_bitmap_store():
+    client = get_raw_redis()
+    if client is None:
+        return CacheBitmapStore()
+    return RedisBitmapStore(client)
+
+
+def load_blocked_nights(unit_ids):
+    """{unit_id: set of blocked nights} from Availability calendars and active bookings."""
+    from booking.models import Bookings  # Avoid circular import
+    from property.models import Availability, UnitListing
+
+    blocked = {unit_id: set() for unit_id in unit_ids}
+    rows = Availability.objects.filter(unit_id__in=unit_ids).values_list(
+        "unit_id", "availability_calendar", "booking_calendar"
+    )
+    for unit_id, availability_calendar, booking_calendar in rows:
+        blocked[unit_id].update(calendar_blocked_nights(availability_calendar))
+        blocked[unit_id].update(calendar_blocked_nights(booking_calendar, taken=True))
+
+    listings = dict(UnitListing.objects.filter(unit_id__in=unit_ids).values_list("id", "unit_id"))
+    if listings:
+        bookings = (
+            Bookings.objects.filter(unit_listing_id__in=list(listings), check_in__isnull=False)
+            .exclude(cancelled=True).exclude(archived=True)
+            .values_list("unit_listing_id", "check_in", "check_out")
+        )
+        for listing_id, check_in, check_out in bookings:
+            blocked[listings[listing_id]].update(_nights(check_in, check_out or check_in + timedelta(days=1)))
+    return blocked
+
+
+def rebuild_units(unit_ids, store=None, until=None, changed=False):
+    """
+    Recomputes the bitmaps of ``unit_ids`` from the database, up to HORIZON_DAYS
+    after today or ``until`` if later, stores them and returns them. ``changed``
+    bumps the generation of the units (their rows changed). A store error is
+    logged: searches rebuild units on read.
+    """
+    unit_ids = sorted({unit_id for unit_id in unit_ids if unit_id is not None})
+    if not unit_ids:
+        return {}
+    store = store or get_bitmap_store()
+    try:
+        # Taken before the rows are read, see the module docstring
+        generations = store.generations(unit_ids, bump=changed)
+    except Exception:
+        logger.warning("Could not read availability generations of units %s", unit_ids, exc_info=True)
+        generations = None
+
+    horizon = timezone.localdate() + timedelta(days=get_availability_settings()["HORIZON_DAYS"])
+    until = max(horizon, until) if until else horizon
+    bitmaps = {
+        unit_id: build_bitmap(nights, until)
+        for unit_id, nights in load_blocked_nights(unit_ids).items()
+    }
+    if generations is not None:
+        try:
+            store.replace(bitmaps, generations)
+        except Exception:
+            logger.warning("Could not store availability bitmaps of units %s", unit_ids, exc_info=True)
+    return bitmaps
+
+
+def units_of_listings(listing_ids):
+    from property.models import UnitListing  # Avoid circular import
+    return list(UnitListing.objects.filter(id__in=listing_ids).values_list("unit_id", flat=True))
+
+
+class UnitRules:
+    __slots__ = ("unit_id", "stay_min", "stay_max", "max_advance", "preparation")
+
+    def __init__(self, unit_id, stay_min, stay_max, max_advance, preparation):
+        self.unit_id = unit_id
+        self.stay_min = stay_min
+        self.stay_max = stay_max
+        self.max_advance = max_advance
+        self.preparation = preparation or 0
+
+    def accepts(self, nights, lead_days):
+        if self.stay_min and nights < self.stay_min:
+            return False
+        if self.stay_max and nights > self.stay_max:
+            return False
+        if self.max_advance is not None and lead_days > self.max_advance:
+            return False
+        return True
+
+
+def load_unit_rules(organization_ids=None, unit_ids=None):
+    from property.models import Availability  # Avoid circular import
+
+    queryset = Availability.objects.order_by("id")
+    if organization_ids is not None:
+        queryset = queryset.filter(organization_id__in=organization_ids)
+    if unit_ids is not None:
+        queryset = queryset.filter(unit_id__in=unit_ids)
+    rows = queryset.values_list(
+        "unit_id", "default_stay_min", "default_stay_max", "max_advance_res", "preparation_time"
+    )
+    # The latest Availability row of a unit wins
+    return {row[0]: UnitRules(*row) for row in rows}
+
+
+def search_available_units(check_in, check_out, organization_ids=None, unit_ids=None, store=None, today=None):
+    """
+    Sorted ids of the units free for the nights [check_in, check_out) whose
+    stay length, advance booking window and preparation time allow the stay.
+    Preparation time (days) must be free before check-in and after check-out.
+    """
+    nights = (check_out - check_in).days
+    if nights <= 0:
+        return []
+    lead_days = (check_in - (today or timezone.localdate())).days
+    candidates = [
+        rules for rules in load_unit_rules(organization_ids, unit_ids).values()
+        if rules.accepts(nights, lead_days)
+    ]
+    if not candidates:
+        return []
+
+    store = store or get_bitmap_store()
+    checks = {}
+    for rules in candidates:
+        first = day_offset(check_in) - rules.preparation
+        last = day_offset(check_out) + rules.preparation
+        checks[rules.unit_id] = (max(first, 0), last)
+    ranges = {unit_id: (first // 8, (last - 1) // 8) for unit_id, (first, last) in checks.items()}
+    try:
+        windows = store.windows(ranges)
+    except Exception:
+        logger.warning("Availability store unavailable, reading from the database", exc_info=True)
+        windows = dict.fromkeys(ranges)
+
+    # Units never built, or whose horizon stops before the window (time passed)
+    stale = [
+        unit_id for unit_id, window in windows.items()
+        if window is None or window[0] < checks[unit_id][1] - 1
+    ]
+    if stale:
+        until = EPOCH + timedelta(days=max(checks[unit_id][1] for unit_id in stale))
+        built = rebuild_units(stale, store, until=until)
+        for unit_id in stale:
+            windows[unit_id] = slice_window(built[unit_id], *ranges[unit_id])
+
+    return sorted(
+        unit_id for unit_id, (first, last) in checks.items()
+        if window_is_free(windows[unit_id][1], first, last)
+    )
+
+
+def flush_unit_rebuilds(unit_ids):
+    try:
+        rebuild_units(unit_ids, changed=True)
+    except Exception:
+        logger.warning(f"Could not rebuild availability of units {sorted(unit_ids)}", exc_info=True)
+
+
+# Units whose bookings or availability changed, rebuilt once after commit
+unit_rebuild_queue = AfterCommitBatch(flush_unit_rebuilds)
+
+
+def schedule_rebuild(unit_ids, using=None):
+    unit_ids = {unit_id for unit_id in unit_ids if unit_id is not None}
+    if unit_ids:
+        unit_rebuild_queue.add(lambda batch: batch.update(unit_ids), using)
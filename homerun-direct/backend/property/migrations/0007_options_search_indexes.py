@@ -0,0 +1,15 @@
+from django.db import migrations
+
+from core.ui_options import prefix_search_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('property', '0006_externalcontract_units_external_contract_and_more'),
+    ]
+
+    operations = [
+        prefix_search_index('property.Property', 'name', 'property_name_upper_prefix_idx'),
+        prefix_search_index('property.Units', 'name', 'units_name_upper_prefix_idx'),
+    ]
@@ -0,0 +1,316 @@
+"""
+Batch quote engine over Pricing calendars.
+
+quote_stays() prices any number of (unit, check_in, check_out, guests) stays
+at once. The nightly rates of every unit over the span of all the stays are
+laid out as one units x days NumPy matrix (weekday/weekend defaults, then the
+pricing_calendar overrides), so a stay's room rate is the difference of two
+entries of its row's cumulative sum. Discounts, additional guest charges,
+fees (FeeAccounts, with their los_ranges resolved into a fee x nights table)
+and taxes (UnitListing) are then computed for all stays with array operations.
+Loading takes three queries whatever the number of units.
+
+Amounts are integer cents; Pricing and FeeAccounts amounts are in currency
+units, percentages (discounts, percent fees, tax_rate, adj_tax,
+rate_inflator) in percent.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+WEEKEND_NIGHTS = (4, 5)  # Friday and Saturday nights
+WEEK_NIGHTS = 7
+MONTH_NIGHTS = 28
+
+FLAT, PERCENT = "flat", "percent"
+PER_STAY, DAILY, PER_GUEST, MONTHLY = "per_stay", "daily", "perGuestReservation", "monthly"
+OWNER_FREQUENCIES = {"perOwnerReservation"}  # Charged to the owner, not part of a guest quote
+CALENDAR_AMOUNT_KEYS = ("amount", "rate", "price", "nightly")
+
+
+def to_cents(amount):
+    if amount is None or amount == "":
+        return None
+    return int((Decimal(str(amount)) * 100).to_integral_value())
+
+
+def calendar_rate_cents(value):
+    """Nightly rate of a pricing_calendar entry, None when it does not set one."""
+    if isinstance(value, dict):
+        for key in CALENDAR_AMOUNT_KEYS:
+            if value.get(f"{key}_cents") is not None:
+                return int(value[f"{key}_cents"])
+            if value.get(key) is not None:
+                return to_cents(value[key])
+        return None
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return to_cents(value)
+    if isinstance(value, str):
+        try:
+            return to_cents(value)
+        except ArithmeticError:
+            return None
+    return None
+
+
+class UnitPricing:
+    __slots__ = (
+        "unit_id", "organization_id", "weekday_cents", "weekend_cents", "week_discount", "month_discount",
+        "calendar", "guest_cents", "guest_start",
+    )
+
+    def __init__(self, unit_id, organization_id, weekday, weekend, week_discount, month_discount,
+                 calendar, guest_cents, guest_start):
+        self.unit_id = unit_id
+        self.organization_id = organization_id
+        self.weekday_cents = to_cents(weekday) or 0
+        self.weekend_cents = to_cents(weekend) if weekend is not None else self.weekday_cents
+        self.week_discount = float(week_discount or 0)
+        self.month_discount = float(month_discount or 0)
+        self.calendar = calendar if isinstance(calendar, dict) else {}
+        self.guest_cents = guest_cents or 0
+        self.guest_start = guest_start or 0
+
+    def overrides(self, first_night, last_night):
+        """(night, cents) of the calendar entries between two nights, included."""
+        first, last = first_night.isoformat(), last_night.isoformat()
+        for key, value in self.calendar.items():
+            # ISO dates compare as strings, only entries in the span get parsed
+            if not isinstance(key, str) or not first <= key[:10] <= last:
+                continue
+            try:
+                night = parse_date(key[:10])
+            except ValueError:
+                continue
+            cents = calendar_rate_cents(value)
+            if night is not None and cents is not None:
+                yield night, cents
+
+
+class UnitTax:
+    __slots__ = ("rate", "max_nights", "inflator", "currency")
+
+    def __init__(self, tax_rate=0.0, adj_tax=0.0, max_night_with_tax_rate=0, exclude_tax=False,
+                 tax_adjustable=False, rate_inflator=None, currency="usd"):
+        self.rate = 0.0 if exclude_tax else (tax_rate or 0.0) + ((adj_tax or 0.0) if tax_adjustable else 0.0)
+        self.max_nights = max_night_with_tax_rate or 0  # Longer stays are not taxed, 0 means no limit
+        self.inflator = rate_inflator or 0.0
+        self.currency = currency or "usd"
+
+
+def load_pricing(unit_ids):
+    """{unit_id: UnitPricing}, the latest Pricing row of a unit wins."""
+    from property.models import Pricing  # Avoid circular import
+
+    rows = Pricing.objects.filter(unit_id__in=unit_ids).order_by("id").values_list(
+        "unit_id", "organization_id", "default_nightly_weekday", "default_nightly_weekend",
+        "discount_full_week", "discount_full_month", "pricing_calendar",
+        "additional_guest_amount_cents", "additional_guest_start",
+    )
+    return {row[0]: UnitPricing(*row) for row in rows}
+
+
+def load_taxes(unit_ids):
+    """{unit_id: UnitTax} from the unit's primary listing, or its first one."""
+    from property.models import UnitListing  # Avoid circular import
+
+    rows = UnitListing.objects.filter(unit_id__in=unit_ids).order_by("-primary", "id").values_list(
+        "unit_id", "tax_rate", "adj_tax", "max_night_with_tax_rate", "exclude_tax",
+        "tax_adjustable", "rate_inflator", "currency",
+    )
+    taxes = {}
+    for unit_id, *fields in rows:
+        taxes.setdefault(unit_id, UnitTax(*fields))
+    return taxes
+
+
+def load_fees(organization_ids):
+    """Active fees charged to guests, as dicts, for ``organization_ids``."""
+    from property.models import FeeAccounts  # Avoid circular import
+
+    return list(
+        FeeAccounts.objects.filter(
+            organization_id__in=organization_ids, active=True, optional=False,
+            internal_use_only=False, included_in_base_rent=False,
+        ).exclude(frequency__in=OWNER_FREQUENCIES).order_by("id").values(
+            "organization_id", "calculation_type", "calculation_amount", "frequency", "taxable", "los_ranges",
+        )
+    )
+
+
+def fee_amount_table(fees, max_nights):
+    """
+    fees x (max_nights + 1) amounts: cents for flat fees, percent for percent
+    fees. The first los_ranges entry with min_nights <= nights <= max_nights
+    replaces calculation_amount.
+    """
+    table = np.zeros((len(fees), max_nights + 1))
+    nights = np.arange(max_nights + 1)
+    for row, fee in enumerate(fees):
+        scale = 1 if fee["calculation_type"] == PERCENT else 100
+        table[row] = float(fee["calculation_amount"] or 0) * scale
+        covered = np.zeros(max_nights + 1, dtype=bool)
+        for los in fee["los_ranges"] or []:
+            try:
+                low = int(los.get("min_nights") or 0)
+                high = int(los.get("max_nights") or max_nights)
+                amount = float(los["calculation_amount"]) * scale
+            except (AttributeError, KeyError, TypeError, ValueError):
+                continue
+            match = (nights >= low) & (nights <= high) & ~covered
+            table[row, match] = amount
+            covered |= match
+    return table
+
+
+def nightly_rate_matrix(pricings, first_night, days):
+    """units x days nightly rates in cents, defaults overridden by the calendars."""
+    weekend = np.isin((np.arange(days) + first_night.weekday()) % 7, WEEKEND_NIGHTS)
+    weekday_cents = np.array([pricing.weekday_cents for pricing in pricings], dtype=np.int64)
+    weekend_cents = np.array([pricing.weekend_cents for pricing in pricings], dtype=np.int64)
+    rates = np.where(weekend[None, :], weekend_cents[:, None], weekday_cents[:, None])
+
+    last_night = first_night + timedelta(days=days - 1)
+    for row, pricing in enumerate(pricings):
+        for night, cents in pricing.overrides(first_night, last_night):
+            rates[row, (night - first_night).days] = cents
+    return rates
+
+
+def stay_sums(rates, row, start, nights):
+    """Sum of rates[row, start:start + nights] for every stay, through one cumulative sum."""
+    cumulative = np.concatenate([np.zeros((rates.shape[0], 1), dtype=rates.dtype), rates.cumsum(axis=1)], axis=1)
+    return cumulative[row, start + nights] - cumulative[row, start]
+
+
+def quote_stays(stays, now=None):
+    """
+    Unsaved Quote objects for ``stays`` = [(unit_id, check_in, check_out, num_guests)],
+    in the same order; None for a stay of a unit without Pricing or with no nights.
+    """
+    from property.models import Quote  # Avoid circular import
+
+    stays = list(stays)
+    if not stays:
+        return []
+    unit_ids = sorted({stay[0] for stay in stays})
+    pricing_by_unit = load_pricing(unit_ids)
+    valid = [
+        index for index, (unit_id, check_in, check_out, _) in enumerate(stays)
+        if unit_id in pricing_by_unit and check_in and check_out and check_out > check_in
+    ]
+    quotes = [None] * len(stays)
+    if not valid:
+        return quotes
+
+    taxes = load_taxes(list(pricing_by_unit))
+    pricings = list(pricing_by_unit.values())
+    rows = {pricing.unit_id: row for row, pricing in enumerate(pricings)}
+    fees = load_fees({pricing.organization_id for pricing in pricings})
+
+    first_night = min(stays[index][1] for index in valid)
+    days = (max(stays[index][2] for index in valid) - first_night).days
+    base_rates = nightly_rate_matrix(pricings, first_night, days)
+    inflators = np.array([taxes[p.unit_id].inflator if p.unit_id in taxes else 0.0 for p in pricings])
+    rates = np.rint(base_rates * (1 + inflators[:, None] / 100)).astype(np.int64)
+
+    # One entry per stay from here on
+    row = np.array([rows[stays[index][0]] for index in valid])
+    start = np.array([(stays[index][1] - first_night).days for index in valid])
+    nights = np.array([(stays[index][2] - stays[index][1]).days for index in valid])
+    guests = np.array([stays[index][3] or 0 for index in valid])
+    stay_pricings = [pricings[r] for r in row]
+    stay_taxes = [taxes.get(pricing.unit_id) or UnitTax() for pricing in stay_pricings]
+
+    room = stay_sums(rates, row, start, nights)
+    inflation = room - stay_sums(base_rates, row, start, nights)
+
+    week = np.array([pricing.week_discount for pricing in stay_pricings])
+    month = np.array([pricing.month_discount for pricing in stay_pricings])
+    discount_rate = np.where(nights >= MONTH_NIGHTS, month, np.where(nights >= WEEK_NIGHTS, week, 0.0))
+    discount = np.rint(room * discount_rate / 100).astype(np.int64)
+    net_room = room - discount
+
+    guest_cents = np.array([pricing.guest_cents for pricing in stay_pricings])
+    guest_start = np.array([pricing.guest_start for pricing in stay_pricings])
+    extras = np.maximum(guests - guest_start, 0) * guest_cents * nights
+
+    fee_total = np.zeros(len(valid), dtype=np.int64)
+    taxable_fees = np.zeros(len(valid), dtype=np.int64)
+    if fees:
+        table = fee_amount_table(fees, int(nights.max()))
+        amounts = table[:, nights].T  # stays x fees
+        applies = np.array([pricing.organization_id for pricing in stay_pricings])[:, None] == \
+            np.array([fee["organization_id"] for fee in fees])[None, :]
+        percent = np.array([fee["calculation_type"] == PERCENT for fee in fees])
+        frequency = np.array([fee["frequency"] for fee in fees])
+        multiplier = np.select(
+            [frequency == DAILY, frequency == PER_GUEST, frequency == MONTHLY],
+            [nights[:, None], np.maximum(guests, 1)[:, None], -(-nights // 30)[:, None]],
+            default=1,
+        )
+        charged = np.where(percent[None, :], net_room[:, None] * amounts / 100, amounts * multiplier)
+        charged = np.rint(np.where(applies, charged, 0)).astype(np.int64)
+        fee_total = charged.sum(axis=1)
+        taxable = np.array([bool(fee["taxable"]) for fee in fees])
+        taxable_fees = charged[:, taxable].sum(axis=1)
+
+    tax_rate = np.array([tax.rate for tax in stay_taxes])
+    max_taxed = np.array([tax.max_nights for tax in stay_taxes])
+    tax_rate = np.where((max_taxed > 0) & (nights > max_taxed), 0.0, tax_rate)
+    taxes_cents = np.rint((net_room + extras + taxable_fees) * tax_rate / 100).astype(np.int64)
+    subtotal = net_room + extras + fee_total
+    total = subtotal + taxes_cents
+
+    now = now or timezone.now()
+    for i, index in enumerate(valid):
+        unit_id, check_in, check_out, num_guests = stays[index]
+        pricing, tax = stay_pricings[i], stay_taxes[i]
+        daily = rates[row[i], start[i]:start[i] + nights[i]]
+        quotes[index] = Quote(
+            unit_id=unit_id,
+            organization_id=pricing.organization_id,
+            check_in=check_in,
+            check_out=check_out,
+            num_guests=num_guests,
+            currency=tax.currency,
+            billable_nights=int(nights[i]),
+            daily_rates=[
+                {"date": (check_in + timedelta(days=n)).isoformat(), "rate_cents": int(cents)}
+                for n, cents in enumerate(daily)
+            ],
+            room_rate_cents=int(room[i]),
+            inflation_rate=tax.inflator,
+            inflation_cents=int(inflation[i]),
+            discount_cents=int(discount[i]),
+            extras_cents=int(extras[i]),
+            fees_cents=int(fee_total[i]),
+            tax_rate=float(tax_rate[i]),
+            taxes_cents=int(taxes_cents[i]),
+            subtotal_cents=int(subtotal[i]),
+            total_cents=int(total[i]),
+            created_at=now,
+            updated_at=now,
+        )
+    return quotes
+
+
+def quote_units(unit_ids, check_in, check_out, num_guests=None):
+    """{unit_id: Quote} of one stay across ``unit_ids``, units without Pricing left out."""
+    unit_ids = list(dict.fromkeys(unit_ids))
+    quotes = quote_stays([(unit_id, check_in, check_out, num_guests) for unit_id in unit_ids])
+    return {unit_id: quote for unit_id, quote in zip(unit_ids, quotes) if quote is not None}
+
+
+QUOTE_SUMMARY_FIELDS = (
+    "unit_id", "check_in", "check_out", "num_guests", "currency", "billable_nights", "daily_rates",
+    "room_rate_cents", "inflation_cents", "discount_cents", "extras_cents", "fees_cents",
+    "tax_rate", "taxes_cents", "subtotal_cents", "total_cents",
+)
+
+
+def quote_summary(quote):
+    return {field: getattr(quote, field) for field in QUOTE_SUMMARY_FIELDS}
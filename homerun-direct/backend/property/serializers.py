@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db import models
 from core.serializers import GenericSerializer
 from organization.models import Organization
 from rest_framework import serializers
@@ -456,14 +457,37 @@ class UnitsSerializer(GenericSerializer):
         return instance
 
 
+class PropertyListSerializer(serializers.ListSerializer):
+    """Resolves the OrganizationProperty links of a whole page in one query."""
+
+    def to_representation(self, data):
+        instances = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        organization_ids = {}
+        links = (
+            OrganizationProperty.objects.filter(property_id__in=[instance.pk for instance in instances])
+            .order_by("pk").values_list("property_id", "organization_id")
+        )
+        for property_id, organization_id in links:
+            organization_ids.setdefault(property_id, organization_id)
+
+        self.child.organization_ids = organization_ids
+        try:
+            return [self.child.to_representation(instance) for instance in instances]
+        finally:
+            self.child.organization_ids = None
+
+
 class PropertySerializer(GenericSerializer):
     organization_id = serializers.IntegerField(write_only=True)
     property_type_id = serializers.IntegerField(write_only=True)
     id = serializers.IntegerField(read_only=True)
+    # {property_id: organization_id} filled in by PropertyListSerializer
+    organization_ids = None
 
     class Meta:
         model = Property
         fields = '__all__'
+        list_serializer_class = PropertyListSerializer
         extra_kwargs = {
             'extra': {'required': False},
         }
@@ -471,14 +495,17 @@ class PropertySerializer(GenericSerializer):
     def to_representation(self, instance):
         rep = super().to_representation(instance)
         # Add organization_id from the OrganizationProperty link (if exists)
-        org_prop = OrganizationProperty.objects.filter(property=instance).first()
-        rep["organization_id"] = (
-            org_prop.organization.id
-            if org_prop else instance.organization.id if instance.organization else None
-        )
+        if self.organization_ids is not None:
+            linked_org_id = self.organization_ids.get(instance.pk)
+        else:
+            linked_org_id = (
+                OrganizationProperty.objects.filter(property=instance)
+                .values_list("organization_id", flat=True).first()
+            )
+        rep["organization_id"] = linked_org_id if linked_org_id is not None else instance.organization_id
 
         # Include property_type_id in the output
-        rep["property_type_id"] = instance.property_type.id if instance.property_type else None
+        rep["property_type_id"] = instance.property_type_id
 
         return rep
 
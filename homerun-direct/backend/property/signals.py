@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from booking.models import Bookings
+from .availability import schedule_rebuild, units_of_listings
+from .models import Availability
+
+
+# Rebuild the availability bitmaps of the units a change touches, the previous
+# unit included when a row is moved to another one
+@receiver(pre_save, sender=Availability)
+def remember_availability_unit(sender, instance, **kwargs):
+    instance._previous_unit_id = (
+        Availability.objects.filter(pk=instance.pk).values_list("unit_id", flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Availability)
+@receiver(post_delete, sender=Availability)
+def rebuild_availability_units(sender, instance, using=None, raw=False, **kwargs):
+    if raw:
+        return
+    schedule_rebuild([instance.unit_id, getattr(instance, "_previous_unit_id", None)], using)
+
+
+@receiver(pre_save, sender=Bookings)
+def remember_booking_listing(sender, instance, **kwargs):
+    instance._previous_unit_listing_id = (
+        Bookings.objects.filter(pk=instance.pk).values_list("unit_listing_id", flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Bookings)
+@receiver(post_delete, sender=Bookings)
+def rebuild_booking_units(sender, instance, using=None, raw=False, **kwargs):
+    if raw:
+        return
+    listing_ids = {instance.unit_listing_id, getattr(instance, "_previous_unit_listing_id", None)} - {None}
+    if listing_ids:
+        schedule_rebuild(units_of_listings(listing_ids), using)
@@ -0,0 +1,219 @@
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.tenancy import Tenancy
+from property.availability import (
+    HEADER, CacheBitmapStore, RedisBitmapStore, UnitRules, bitmap_key, build_bitmap, calendar_blocked_nights,
+    day_offset, read_header, rebuild_units, schedule_rebuild, search_available_units, window_is_free,
+)
+from property.viewsets import AvailabilityViewSet
+
+TODAY = date(2025, 6, 1)
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    cache.clear()
+    yield
+    cache.clear()
+
+
+EPOCH_NIGHT = date(2020, 1, 1)
+
+
+def nights(start, count):
+    return {start + timedelta(days=n) for n in range(count)}
+
+
+def test_calendar_shapes():
+    calendar = {"2025-07-01": False, "2025-07-02": "blocked", "2025-07-03": True, "2025-07-04": {"available": False}}
+    assert set(calendar_blocked_nights(calendar)) == {date(2025, 7, 1), date(2025, 7, 2), date(2025, 7, 4)}
+
+    ranges = [{"start": "2025-07-10", "end": "2025-07-12"}, {"check_in": "2025-08-01", "check_out": "2025-08-02"}]
+    assert set(calendar_blocked_nights(ranges)) == {date(2025, 7, 10), date(2025, 7, 11), date(2025, 8, 1)}
+
+    assert set(calendar_blocked_nights({"2025-07-03": "confirmed"}, taken=True)) == {date(2025, 7, 3)}
+    assert list(calendar_blocked_nights(None)) == []
+
+
+def test_bitmap_uses_setbit_order():
+    bitmap = build_bitmap([date(2020, 1, 1), date(2020, 1, 10), date(2020, 3, 1)], date(2020, 2, 1))
+
+    assert read_header(bitmap) == 31
+    assert bitmap[HEADER.size:] == bytes([0b10000000, 0b01000000])
+
+
+def test_window_is_free():
+    bitmap = build_bitmap(nights(date(2025, 7, 10), 3), date(2026, 1, 1))[HEADER.size:]
+
+    def free(check_in, check_out):
+        first, last = day_offset(check_in), day_offset(check_out)
+        return window_is_free(bitmap[first // 8:], first, last)
+
+    assert free(date(2025, 7, 5), date(2025, 7, 10))  # Check-out on the first blocked night
+    assert free(date(2025, 7, 13), date(2025, 7, 20))
+    assert not free(date(2025, 7, 12), date(2025, 7, 14))
+    assert free(date(2025, 12, 1), date(2025, 12, 5))  # Past the last blocked night
+
+
+def test_unit_rules():
+    rules = UnitRules(1, stay_min=2, stay_max=7, max_advance=30, preparation=None)
+
+    assert rules.accepts(3, 10)
+    assert not rules.accepts(1, 10)
+    assert not rules.accepts(8, 10)
+    assert not rules.accepts(3, 31)
+    assert rules.preparation == 0
+
+
+@pytest.fixture
+def units():
+    rules = {
+        1: UnitRules(1, None, None, None, 0),
+        2: UnitRules(2, None, None, None, 0),
+        3: UnitRules(3, None, None, None, 2),
+        4: UnitRules(4, 5, None, None, 0),
+        5: UnitRules(5, None, None, 10, 0),
+    }
+    blocked = {
+        1: set(),
+        2: nights(date(2025, 7, 3), 2),
+        3: {date(2025, 7, 11)},
+        4: set(),
+        5: set(),
+    }
+    with patch("property.availability.load_unit_rules", return_value=rules), \
+            patch("property.availability.load_blocked_nights", side_effect=lambda ids: {i: blocked[i] for i in ids}) as load:
+        yield load
+
+
+def test_search_respects_calendar_and_rules(units, locmem_cache):
+    found = search_available_units(date(2025, 7, 1), date(2025, 7, 10), today=TODAY)
+
+    # 2 is booked on the 3rd, 3 needs two free preparation days after check-out
+    # and 5 only takes bookings ten days ahead; 4 wants five nights at least
+    assert found == [1, 4]
+    assert search_available_units(date(2025, 7, 1), date(2025, 7, 3), today=TODAY) == [1, 2, 3]
+
+
+def test_search_builds_missing_units_once(units, locmem_cache):
+    search_available_units(date(2025, 7, 1), date(2025, 7, 5), today=TODAY)
+    units.reset_mock()
+
+    search_available_units(date(2025, 7, 1), date(2025, 7, 5), today=TODAY)
+
+    units.assert_not_called()
+    assert read_header(cache.get(bitmap_key(1))) is not None
+
+
+def test_search_rebuilds_units_past_their_horizon(units, locmem_cache, settings):
+    settings.AVAILABILITY_ENGINE = {"HORIZON_DAYS": 30}
+    units.side_effect = lambda ids: {i: {date(2030, 1, 2)} for i in ids}
+    with patch("property.availability.timezone.localdate", return_value=TODAY):
+        rebuild_units([1, 2])
+
+    # The booking is past the stored horizon: the units get rebuilt, not read as free
+    assert search_available_units(date(2030, 1, 1), date(2030, 1, 5), unit_ids=[1, 2], today=TODAY) == []
+    assert read_header(cache.get(bitmap_key(1))) >= day_offset(date(2030, 1, 4))
+
+
+def test_search_reads_database_when_store_is_down(units):
+    store = MagicMock()
+    store.windows.side_effect = ConnectionError("Redis down")
+    store.replace.side_effect = ConnectionError("Redis down")
+
+    assert search_available_units(date(2025, 7, 1), date(2025, 7, 3), store=store, today=TODAY) == [1, 2, 3]
+
+
+def test_rebuild_replaces_stale_bits(locmem_cache):
+    with patch("property.availability.load_blocked_nights", return_value={1: {date(2025, 7, 1)}}):
+        rebuild_units([1], changed=True)
+    with patch("property.availability.load_blocked_nights", return_value={1: set()}):
+        rebuild_units([1], changed=True)
+
+    assert CacheBitmapStore().windows({1: (0, 10)})[1][1] == b""
+
+
+def test_older_generation_does_not_overwrite_newer_bitmap(locmem_cache):
+    store = CacheBitmapStore()
+    old = store.generations([1], bump=True)
+    new = store.generations([1], bump=True)
+    store.replace({1: build_bitmap([], date(2025, 7, 1))}, new)
+
+    store.replace({1: build_bitmap([EPOCH_NIGHT], date(2025, 7, 1))}, old)
+
+    assert store.windows({1: (0, 0)})[1][1] == b""
+
+
+def test_redis_store_reads_header_and_window_in_one_pipeline():
+    client = MagicMock()
+    pipe = client.pipeline.return_value
+    pipe.execute.return_value = [HEADER.pack(1, 400), b"\x80", b"", b""]
+
+    windows = RedisBitmapStore(client).windows({1: (5, 6), 2: (5, 6)})
+
+    assert windows == {1: (400, b"\x80"), 2: None}
+    pipe.getrange.assert_any_call(bitmap_key(1), HEADER.size + 5, HEADER.size + 6)
+    pipe.execute.assert_called_once()
+
+
+def test_redis_store_writes_through_the_generation_check():
+    client = MagicMock()
+    pipe = client.pipeline.return_value
+
+    RedisBitmapStore(client).replace({1: b"bitmap"}, {1: 7})
+
+    client.register_script.return_value.assert_called_once_with(
+        keys=[bitmap_key(1), "availability:unit:1:stored"], args=[b"bitmap", 7], client=pipe,
+    )
+
+
+@pytest.mark.django_db
+def test_rebuilds_are_batched_per_transaction(django_capture_on_commit_callbacks):
+    with patch("property.availability.rebuild_units") as rebuild, \
+            django_capture_on_commit_callbacks(execute=True):
+        schedule_rebuild([1, None])
+        schedule_rebuild([2])
+
+    rebuild.assert_called_once_with({1, 2}, changed=True)
+
+
+@pytest.fixture
+def search_request():
+    def make(query, tenancy):
+        request = APIRequestFactory().get("/api/availability/search/", query)
+        request._tenancy = tenancy
+        force_authenticate(request, user=MagicMock(is_authenticated=True))
+        return AvailabilityViewSet.as_view({"get": "search"})(request)
+    return make
+
+
+@patch("property.viewsets.search_available_units", return_value=[4, 9])
+def test_search_endpoint(mock_search, search_request):
+    response = search_request({"check_in": "2025-07-01", "check_out": "2025-07-05"}, Tenancy(organization_ids=[3, 8]))
+
+    assert response.status_code == 200
+    assert response.data == {"response": [4, 9], "count": 2}
+    mock_search.assert_called_once_with(date(2025, 7, 1), date(2025, 7, 5), organization_ids=[3, 8])
+
+
+@patch("property.viewsets.search_available_units", return_value=[])
+def test_search_endpoint_is_scoped_to_tenancy(mock_search, search_request):
+    search_request({"check_in": "2025-07-01", "check_out": "2025-07-05", "organization": "5"}, Tenancy(organization_ids=[3]))
+
+    assert mock_search.call_args.kwargs["organization_ids"] == []
+
+
+@pytest.mark.parametrize("query", [
+    {"check_in": "2025-07-05", "check_out": "2025-07-01"},
+    {"check_in": "2025-02-30", "check_out": "2025-03-02"},
+    {"check_in": "2025-07-01"},
+    {"check_in": "2099-01-01", "check_out": "2099-01-05"},  # Past the horizon
+])
+def test_search_endpoint_rejects_bad_dates(query, search_request):
+    assert search_request(query, Tenancy(all_access=True)).status_code == 400
@@ -0,0 +1,26 @@
+import pytest
+
+from property.models import Property
+from property.serializers import PropertyListSerializer, PropertySerializer
+
+
+def make_properties(count):
+    return [
+        Property(id=i, name=f"Property {i}", organization_id=100 + i, property_type_id=7)
+        for i in range(1, count + 1)
+    ]
+
+
+@pytest.mark.django_db
+def test_list_representation_uses_one_query(django_assert_num_queries):
+    properties = make_properties(25)
+    with django_assert_num_queries(1):
+        data = PropertySerializer(properties, many=True).data
+    assert len(data) == 25
+    # No OrganizationProperty links, so the property's own organization is used
+    assert data[0]["organization_id"] == 101
+    assert data[0]["property_type_id"] == 7
+
+
+def test_many_uses_list_serializer():
+    assert isinstance(PropertySerializer(make_properties(1), many=True), PropertyListSerializer)
@@ -0,0 +1,137 @@
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pytest
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.tenancy import Tenancy
+from property.quotes import (
+    UnitPricing, UnitTax, calendar_rate_cents, fee_amount_table, nightly_rate_matrix, quote_stays, quote_units,
+)
+from property.viewsets import AvailabilityViewSet
+
+# 2025-07-07 is a Monday
+MONDAY = date(2025, 7, 7)
+
+
+def pricing(unit_id, organization_id=1, weekday="100.00", weekend="150.00", calendar=None, **overrides):
+    fields = {
+        "week_discount": 0, "month_discount": 0, "guest_cents": 0, "guest_start": 1, **overrides,
+    }
+    return UnitPricing(
+        unit_id, organization_id, weekday, weekend, fields["week_discount"], fields["month_discount"],
+        calendar or {}, fields["guest_cents"], fields["guest_start"],
+    )
+
+
+def fee(amount, calculation_type="flat", frequency="per_stay", taxable=False, los_ranges=None, organization_id=1):
+    return {
+        "organization_id": organization_id, "calculation_type": calculation_type, "calculation_amount": amount,
+        "frequency": frequency, "taxable": taxable, "los_ranges": los_ranges or [],
+    }
+
+
+@pytest.fixture
+def engine():
+    data = {"pricing": {}, "taxes": {}, "fees": []}
+    with patch("property.quotes.load_pricing", side_effect=lambda ids: {i: p for i, p in data["pricing"].items() if i in ids}), \
+            patch("property.quotes.load_taxes", side_effect=lambda ids: data["taxes"]), \
+            patch("property.quotes.load_fees", side_effect=lambda ids: data["fees"]):
+        yield data
+
+
+def test_calendar_rate_cents():
+    assert calendar_rate_cents("120.5") == 12050
+    assert calendar_rate_cents({"amount": 99}) == 9900
+    assert calendar_rate_cents({"rate_cents": 4500}) == 4500
+    assert calendar_rate_cents("default") is None
+    assert calendar_rate_cents({"availability": "inquiry"}) is None
+
+
+def test_nightly_rates_use_weekend_defaults_and_calendar():
+    unit = pricing(1, calendar={"2025-07-08": "80.00", "2025-07-30": "999", "day": "default"})
+
+    rates = nightly_rate_matrix([unit], MONDAY, 7)
+
+    assert rates.tolist() == [[10000, 8000, 10000, 10000, 15000, 15000, 10000]]
+
+
+def test_fee_amount_table_resolves_los_ranges():
+    table = fee_amount_table([fee("10", los_ranges=[
+        {"min_nights": 1, "max_nights": 7, "calculation_amount": "50.0"},
+        {"min_nights": "7", "max_nights": "14", "calculation_amount": "20.0"},
+    ])], 15)
+
+    assert table[0, 3] == 5000
+    assert table[0, 7] == 5000  # First matching range wins
+    assert table[0, 10] == 2000
+    assert table[0, 15] == 1000
+
+
+def test_quote_totals(engine):
+    engine["pricing"][1] = pricing(1, guest_cents=1000, guest_start=2)
+    engine["taxes"][1] = UnitTax(tax_rate=10.0, currency="eur")
+    engine["fees"] = [
+        fee("50", taxable=True),
+        fee("5", frequency="daily"),
+        fee("10", calculation_type="percent"),
+        fee("99", organization_id=2),
+    ]
+
+    quote, = quote_stays([(1, MONDAY, date(2025, 7, 12), 3)])
+
+    # Mon-Thu at 100, Friday at 150
+    assert quote.room_rate_cents == 55000
+    assert quote.extras_cents == 5 * 1000
+    assert quote.fees_cents == 5000 + 5 * 500 + 5500
+    assert quote.taxes_cents == (55000 + 5000 + 5000) // 10
+    assert quote.total_cents == quote.subtotal_cents + quote.taxes_cents == 55000 + 5000 + 13000 + 6500
+    assert quote.currency == "eur"
+    assert [night["rate_cents"] for night in quote.daily_rates] == [10000] * 4 + [15000]
+
+
+def test_long_stays_get_discounts_and_tax_limits(engine):
+    engine["pricing"][1] = pricing(1, weekend="100.00", week_discount=10, month_discount=20)
+    engine["taxes"][1] = UnitTax(tax_rate=10.0, max_night_with_tax_rate=14)
+
+    week, month = quote_stays([(1, MONDAY, date(2025, 7, 14), 2), (1, MONDAY, date(2025, 8, 4), 2)])
+
+    assert (week.discount_cents, week.taxes_cents) == (7000, 6300)
+    assert (month.discount_cents, month.taxes_cents) == (56000, 0)
+
+
+def test_rate_inflator(engine):
+    engine["pricing"][1] = pricing(1)
+    engine["taxes"][1] = UnitTax(rate_inflator=10.0)
+
+    quote, = quote_stays([(1, MONDAY, date(2025, 7, 9), 1)])
+
+    assert (quote.room_rate_cents, quote.inflation_cents) == (22000, 2000)
+
+
+def test_batch_keeps_order_and_skips_unpriced_units(engine):
+    engine["pricing"] = {1: pricing(1), 2: pricing(2, weekday="200.00")}
+
+    quotes = quote_stays([
+        (2, MONDAY, date(2025, 7, 8), 1), (3, MONDAY, date(2025, 7, 8), 1),
+        (1, date(2025, 7, 20), date(2025, 7, 21), 1), (1, MONDAY, MONDAY, 1),
+    ])
+
+    assert [quote and quote.room_rate_cents for quote in quotes] == [20000, None, 10000, None]
+    assert sorted(quote_units([2, 3, 1], MONDAY, date(2025, 7, 8))) == [1, 2]
+
+
+@patch("property.viewsets.search_available_units", return_value=[4])
+@patch("property.viewsets.quote_units")
+def test_search_endpoint_includes_quotes(mock_quote_units, mock_search):
+    mock_quote_units.return_value = {4: MagicMock(unit_id=4, total_cents=12345)}
+    request = APIRequestFactory().get(
+        "/api/availability/search/", {"check_in": "2025-07-01", "check_out": "2025-07-05", "quote": "true", "guests": "3"}
+    )
+    request._tenancy = Tenancy(all_access=True)
+    force_authenticate(request, user=MagicMock(is_authenticated=True))
+
+    response = AvailabilityViewSet.as_view({"get": "search"})(request)
+
+    assert response.data["quotes"][4]["total_cents"] == 12345
+    mock_quote_units.assert_called_once_with([4], date(2025, 7, 1), date(2025, 7, 5), 3)
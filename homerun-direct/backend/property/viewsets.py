@@ -1,9 +1,12 @@
 from rest_framework import filters, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from core.mixin_es import ElasticSearchMixin
+from core.mixin_es import (
+    BOOLEAN_OPERATORS, EXACT_OPERATORS, RANGE_OPERATORS, TEXT_OPERATORS, ElasticSearchMixin,
+)
 from core.mixin_redis import RedisCacheMixin
-from core.viewsets import GenericModelViewSet
+from core.viewsets import ESModelViewSet, GenericModelViewSet
 from core.pagination import CustomPagination
 from .models import *
 from .serializers import *
@@ -11,86 +14,12 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rbac.org_level_permission import apply_organization_level_filter,apply_brand_level_filter
 from rest_framework import filters
 from core.mixin_es import es
-
-# Common mixin for ES-backed viewsets
-class ESModelViewSet(ElasticSearchMixin, GenericModelViewSet):
-    permission_classes = [IsAuthenticated]
-    filter_backends = [filters.OrderingFilter]
-    pagination_class = CustomPagination
-    redis_cache = RedisCacheMixin()
-
-    def list(self, request, *args, **kwargs):
-        page = int(request.query_params.get('page', 1))
-        per_page = int(request.query_params.get('per_page', 50))
-        filters = request.query_params
-        must_clauses = self.build_elasticsearch_filters(filters)
-        # ✅ Allow filtering/search by organization_id (thanks to step 1 above)
-        org_id = request.query_params.get("organization_id")
-        if org_id:
-            must_clauses.append({
-                "term": {
-                    "organization_id": org_id
-                }
-            })
-        apply_organization_level_filter(request, must_clauses)
-
-        # Optional search term
-        search_query = request.query_params.get('search')
-        if search_query and hasattr(self, 'search_fields'):
-            must_clauses.append({
-                'multi_match': {
-                    'query': search_query,
-                    'fields': self.search_fields,
-                    'type': 'best_fields'
-                }
-            })
-
-        query = {'query': {'bool': {'must': must_clauses}}}
-
-        try:
-            results = self.search_elasticsearch(
-                index_name=self.index_name,
-                query=query,
-                page=page,
-                per_page=per_page
-            )
-            return Response({
-                'response': results,
-                'pagination': {
-                    'count': len(results),
-                    'per_page': per_page,
-                    'previous': None if page == 1 else page - 1,
-                    'next': None if len(results) < per_page else page + 1
-                }
-            }, status=status.HTTP_200_OK)
-        except Exception as e:
-            print('⚠️ ES fallback:', e)
-            return super().list(request, *args, **kwargs)
-
-    def perform_create(self, serializer):
-        instance = serializer.save()
-        self.index_instance(instance, self.index_name)
-        self.redis_cache.set_user_org_session(self.request.user)
-
-    def perform_update(self, serializer):
-        instance = serializer.save()
-        self.index_instance(instance, self.index_name)
-        self.redis_cache.set_user_org_session(self.request.user)
-
-    def perform_destroy(self, instance):
-        self.clear_index(instance, self.index_name)
-        instance.delete()
-
-    from core.mixin_es import es 
-    def retrieve(self, request, *args, **kwargs):
-        pk = kwargs.get("pk")
-        try:
-            es_doc = self.es.get(index=self.index_name, id=pk)["_source"]
-            return Response(es_doc)
-        except Exception as e:
-            print("🔥 ES retrieve failed. Falling back to DB:", e)
-            return super().retrieve(request, *args, **kwargs)
-
+from core.tenancy import get_tenancy
+from datetime import timedelta
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .availability import get_availability_settings, search_available_units
+from .quotes import quote_summary, quote_units
 
 class ReservationViewSet(ESModelViewSet):
     """
@@ -102,7 +31,24 @@ class ReservationViewSet(ESModelViewSet):
     filterset_fields = ['booking_type', 'confirmed']
     search_fields = ['booking_type', 'price_status']
     ordering_fields = ['check_in', 'created_at']
+    facet_fields = ['booking_type', 'confirmed', 'price_status']
     index_name = 'reservations'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "booking_type": TEXT_OPERATORS,
+        "confirmed": BOOLEAN_OPERATORS,
+        "check_in": RANGE_OPERATORS,
+        "check_out": RANGE_OPERATORS,
+        "customer_id": EXACT_OPERATORS,
+        "customer_email": TEXT_OPERATORS,
+        "customer_name": TEXT_OPERATORS,
+        "listing_id": EXACT_OPERATORS,
+        "channel_id": EXACT_OPERATORS,
+        "quote_id": EXACT_OPERATORS,
+        "total": RANGE_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 
 class ReservationInformationViewSet(ESModelViewSet):
@@ -111,6 +57,15 @@ class ReservationInformationViewSet(ESModelViewSet):
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['check_in', 'created_at']
     index_name = 'reservation_information'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "check_in": RANGE_OPERATORS,
+        "check_out": RANGE_OPERATORS,
+        "num_guests": RANGE_OPERATORS,
+        "price_total": RANGE_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 
 class FeeLineItemViewSet(ESModelViewSet):
@@ -119,6 +74,18 @@ class FeeLineItemViewSet(ESModelViewSet):
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['total_cents', 'id']
     index_name = 'fee_line_item'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization_id": EXACT_OPERATORS,
+        "name": TEXT_OPERATORS,
+        "item_type": TEXT_OPERATORS,
+        "total_cents": RANGE_OPERATORS,
+        "taxable": BOOLEAN_OPERATORS,
+        "refundable": BOOLEAN_OPERATORS,
+        "optional": BOOLEAN_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 
 class TaxLineItemViewSet(ESModelViewSet):
@@ -127,24 +94,64 @@ class TaxLineItemViewSet(ESModelViewSet):
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['total_cents', 'id']
     index_name = 'tax_line_item'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization_id": EXACT_OPERATORS,
+        "name": TEXT_OPERATORS,
+        "item_type": TEXT_OPERATORS,
+        "total_cents": RANGE_OPERATORS,
+        "taxable": BOOLEAN_OPERATORS,
+        "refundable": BOOLEAN_OPERATORS,
+        "optional": BOOLEAN_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 
 class PropertyListingViewSet(ESModelViewSet):
     queryset = PropertyListing.objects.all().order_by('-id')
     serializer_class = PropertyListingSerializer
     index_name = 'property_listing'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "unit_listing_id": EXACT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 
 class UnitListingViewSet(ESModelViewSet):
     queryset = UnitListing.objects.all().order_by('-id')
     serializer_class = UnitListingSerializer
     index_name = 'unit_listing'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization_id": EXACT_OPERATORS,
+        "unit_id": EXACT_OPERATORS,
+        "brand": EXACT_OPERATORS,
+        "slug": TEXT_OPERATORS,
+        "currency": TEXT_OPERATORS,
+        "featured": BOOLEAN_OPERATORS,
+        "instant_booking": BOOLEAN_OPERATORS,
+        "primary": BOOLEAN_OPERATORS,
+        "is_multi_unit": BOOLEAN_OPERATORS,
+        "is_room_type": BOOLEAN_OPERATORS,
+    }
 
 
 class CustomerInformationViewSet(ESModelViewSet):
     queryset = CustomerInformation.objects.all().order_by('-id')
     serializer_class = CustomerInformationSerializer
     index_name = 'customer_information'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "booking_id": EXACT_OPERATORS,
+        "email": TEXT_OPERATORS,
+        "name": TEXT_OPERATORS,
+        "telephone": TEXT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 
 class ChargeViewSet(ESModelViewSet):
@@ -153,18 +160,42 @@ class ChargeViewSet(ESModelViewSet):
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['post_date', 'amount']
     index_name = 'charges'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "booking_code": TEXT_OPERATORS,
+        "customer_email": TEXT_OPERATORS,
+        "customer_name": TEXT_OPERATORS,
+        "charge_type": TEXT_OPERATORS,
+        "amount": RANGE_OPERATORS,
+        "post_date": RANGE_OPERATORS,
+        "no_receipt": BOOLEAN_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 
 class PaymentMethodViewSet(ESModelViewSet):
     queryset = PaymentMethod.objects.all().order_by('-id')
     serializer_class = PaymentMethodSerializer
     index_name = 'payment_method'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "method_type": TEXT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 
 class NoteViewSet(ESModelViewSet):
     queryset = Note.objects.all().order_by('-id')
     serializer_class = NoteSerializer
     index_name = 'note'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "booking_code": TEXT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 class WorkOrderViewSet(ESModelViewSet):
     """
@@ -177,6 +208,27 @@ class WorkOrderViewSet(ESModelViewSet):
     search_fields      = ['wo_type', 'friendlyStatus']
     ordering_fields    = ['due_on', 'created_at']
     index_name = 'work_order'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization_id": EXACT_OPERATORS,
+        "wo_type": EXACT_OPERATORS,
+        "wo_source": EXACT_OPERATORS,
+        "status": EXACT_OPERATORS,
+        "assignee_type": TEXT_OPERATORS,
+        "assignee_id": EXACT_OPERATORS,
+        "unit": EXACT_OPERATORS,
+        "property": EXACT_OPERATORS,
+        "booking": EXACT_OPERATORS,
+        "requester_id": EXACT_OPERATORS,
+        "job_type": TEXT_OPERATORS,
+        "title": TEXT_OPERATORS,
+        "due_on": RANGE_OPERATORS,
+        "completed_on": RANGE_OPERATORS,
+        "paid_on": RANGE_OPERATORS,
+        "amount_cents": RANGE_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 
 class WorkReportViewSet(ESModelViewSet):
@@ -190,6 +242,19 @@ class WorkReportViewSet(ESModelViewSet):
     search_fields = ['description', 'status']  # Example search fields
     ordering_fields = ['created_at', 'updated_at']  # Fields for ordering
     index_name = 'work_report'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization_id": EXACT_OPERATORS,
+        "work_order": EXACT_OPERATORS,
+        "status": EXACT_OPERATORS,
+        "reporter_id": EXACT_OPERATORS,
+        "reviewer_id": EXACT_OPERATORS,
+        "total_cents": RANGE_OPERATORS,
+        "job_started_at": RANGE_OPERATORS,
+        "job_completed_at": RANGE_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
     def create(self, request, *args, **kwargs):
         """
@@ -220,6 +285,13 @@ class InternetOptionsViewSet(ESModelViewSet):
     ordering_fields = []
     search_fields = []
     index_name = 'internet_options'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "property": EXACT_OPERATORS,
+        "is_internet_connection": BOOLEAN_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 # 2. BedroomsBathrooms
 class BedroomsBathroomsViewSet(ESModelViewSet):
@@ -228,6 +300,15 @@ class BedroomsBathroomsViewSet(ESModelViewSet):
     ordering_fields = []
     search_fields = []
     index_name = 'bedrooms_bathrooms'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "unit": EXACT_OPERATORS,
+        "num_of_bedrooms": RANGE_OPERATORS,
+        "num_of_bathrooms": RANGE_OPERATORS,
+        "num_sleep_in_beds": RANGE_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 # 3. Bedrooms
 class BedroomsViewSet(ESModelViewSet):
@@ -236,6 +317,15 @@ class BedroomsViewSet(ESModelViewSet):
     ordering_fields = []
     search_fields = []
     index_name = 'bedrooms'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "unit": EXACT_OPERATORS,
+        "bedrooms_bathrooms": EXACT_OPERATORS,
+        "bedroom_type": TEXT_OPERATORS,
+        "name": TEXT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 # 4. LivingRooms
 class LivingRoomsViewSet(ESModelViewSet):
@@ -244,6 +334,16 @@ class LivingRoomsViewSet(ESModelViewSet):
     ordering_fields = []
     search_fields = []
     index_name = 'living_rooms'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization": EXACT_OPERATORS,
+        "unit": EXACT_OPERATORS,
+        "bedrooms_bathrooms": EXACT_OPERATORS,
+        "bedroom_type": TEXT_OPERATORS,
+        "name": TEXT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 # 5. Bathroom
 class BathroomViewSet(ESModelViewSet):
@@ -252,6 +352,15 @@ class BathroomViewSet(ESModelViewSet):
     ordering_fields = []
     search_fields = []
     index_name = 'bathroom'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization": EXACT_OPERATORS,
+        "unit": EXACT_OPERATORS,
+        "bedrooms_bathrooms": EXACT_OPERATORS,
+        "bathroom_type": TEXT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 # 6. Availability
 class AvailabilityViewSet(ESModelViewSet):
@@ -260,6 +369,55 @@ class AvailabilityViewSet(ESModelViewSet):
     ordering_fields = []
     search_fields = []
     index_name = 'availability'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization": EXACT_OPERATORS,
+        "unit": EXACT_OPERATORS,
+        "default_stay_min": RANGE_OPERATORS,
+        "default_stay_max": RANGE_OPERATORS,
+        "same_day_turnaround": BOOLEAN_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
+    source_excludes = ['availability_calendar', 'booking_calendar']
+
+    @action(detail=False, methods=['get'], url_path="search")
+    def search(self, request):
+        """
+        Units free for the nights [check_in, check_out), optionally within one
+        organization. With quote=true the priced stays (for ``guests``) come along.
+        """
+        try:
+            check_in = parse_date(request.query_params.get("check_in", ""))
+            check_out = parse_date(request.query_params.get("check_out", ""))
+            organization_id = request.query_params.get("organization")
+            organization_id = int(organization_id) if organization_id else None
+            guests = request.query_params.get("guests")
+            guests = int(guests) if guests else None
+        except ValueError:
+            check_in = check_out = None
+        if not check_in or not check_out:
+            return Response({"error": "check_in and check_out are required dates (YYYY-MM-DD), guests a number."}, status=status.HTTP_400_BAD_REQUEST)
+        engine_settings = get_availability_settings()
+        if not 0 < (check_out - check_in).days <= engine_settings["MAX_STAY"]:
+            return Response({"error": "check_out must be after check_in, within the longest stay allowed."}, status=status.HTTP_400_BAD_REQUEST)
+        if check_out > timezone.localdate() + timedelta(days=engine_settings["HORIZON_DAYS"]):
+            return Response({"error": f"Availability is only searched {engine_settings['HORIZON_DAYS']} days ahead."}, status=status.HTTP_400_BAD_REQUEST)
+
+        tenancy = get_tenancy(request)
+        if tenancy.all_access:
+            organization_ids = None if organization_id is None else [organization_id]
+        elif organization_id is None:
+            organization_ids = tenancy.organization_ids
+        else:
+            organization_ids = [organization_id] if organization_id in tenancy.organization_ids else []
+
+        unit_ids = search_available_units(check_in, check_out, organization_ids=organization_ids)
+        data = {"response": unit_ids, "count": len(unit_ids)}
+        if request.query_params.get("quote", "").lower() in ("1", "true"):
+            quotes = quote_units(unit_ids, check_in, check_out, guests)
+            data["quotes"] = {unit_id: quote_summary(quote) for unit_id, quote in quotes.items()}
+        return Response(data, status=status.HTTP_200_OK)
 
 # 7. Pricing
 class PricingViewSet(ESModelViewSet):
@@ -268,6 +426,16 @@ class PricingViewSet(ESModelViewSet):
     ordering_fields = []
     search_fields = []
     index_name = 'pricing'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization": EXACT_OPERATORS,
+        "unit": EXACT_OPERATORS,
+        "default_nightly_weekday": RANGE_OPERATORS,
+        "default_nightly_weekend": RANGE_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
+    source_excludes = ['pricing_calendar']
 
 # 8. Deposits
 class DepositsViewSet(ESModelViewSet):
@@ -276,6 +444,18 @@ class DepositsViewSet(ESModelViewSet):
     ordering_fields = []
     search_fields = []
     index_name = 'deposits'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization": EXACT_OPERATORS,
+        "unit_listing_id": EXACT_OPERATORS,
+        "name": TEXT_OPERATORS,
+        "calculation_type": TEXT_OPERATORS,
+        "refundable": BOOLEAN_OPERATORS,
+        "taxable": BOOLEAN_OPERATORS,
+        "is_security_deposit": BOOLEAN_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 # 9. FeeAccounts
 class FeeAccountsViewSet(ESModelViewSet):
@@ -284,6 +464,19 @@ class FeeAccountsViewSet(ESModelViewSet):
     ordering_fields = []
     search_fields = []
     index_name = 'fee_accounts'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization": EXACT_OPERATORS,
+        "name": TEXT_OPERATORS,
+        "calculation_type": TEXT_OPERATORS,
+        "frequency": TEXT_OPERATORS,
+        "active": BOOLEAN_OPERATORS,
+        "optional": BOOLEAN_OPERATORS,
+        "taxable": BOOLEAN_OPERATORS,
+        "refundable": BOOLEAN_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 # 10. DebitAccount
 class DebitAccountViewSet(ESModelViewSet):
@@ -292,6 +485,12 @@ class DebitAccountViewSet(ESModelViewSet):
     ordering_fields = []
     search_fields = []
     index_name = 'debit_account'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "name": TEXT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 # 11. CreditAccount
 class CreditAccountViewSet(ESModelViewSet):
@@ -300,6 +499,12 @@ class CreditAccountViewSet(ESModelViewSet):
     ordering_fields = []
     search_fields = []
     index_name = 'credit_account'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "name": TEXT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 # 12. RefundPolicies
 class RefundPoliciesViewSet(ESModelViewSet):
@@ -308,6 +513,11 @@ class RefundPoliciesViewSet(ESModelViewSet):
     ordering_fields = []
     search_fields = []
     index_name = 'refund_policies'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 # 13. Units
 class UnitsViewSet(ESModelViewSet):
@@ -316,6 +526,24 @@ class UnitsViewSet(ESModelViewSet):
     ordering_fields = []
     search_fields = []
     index_name = 'units'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization_id": EXACT_OPERATORS,
+        "property": EXACT_OPERATORS,
+        "name": TEXT_OPERATORS,
+        "unit_code": TEXT_OPERATORS,
+        "external_id": TEXT_OPERATORS,
+        "active": BOOLEAN_OPERATORS,
+        "unit_type": EXACT_OPERATORS,
+        "num_bedrooms": RANGE_OPERATORS,
+        "num_bathrooms": RANGE_OPERATORS,
+        "num_sleep": RANGE_OPERATORS,
+        "portfolio": EXACT_OPERATORS,
+        "subportfolio": EXACT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
+    source_excludes = ['features_*']
 
 
 # 1. Property
@@ -325,6 +553,27 @@ class PropertyViewSet(ESModelViewSet):
     ordering_fields = ['name', 'created_at']
     search_fields = ['name', 'summary_headline', 'summary_description']
     index_name = 'property'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization": EXACT_OPERATORS,
+        "organization_id": EXACT_OPERATORS,
+        "name": TEXT_OPERATORS,
+        "unit_code": TEXT_OPERATORS,
+        "external_id": TEXT_OPERATORS,
+        "property_type": EXACT_OPERATORS,
+        "active": BOOLEAN_OPERATORS,
+        "multi_unit": BOOLEAN_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
+    source_excludes = ['features_*', 'extra']
+
+    def get_queryset(self):
+        """
+        Joins the relations PropertySerializer reads; OrganizationProperty links
+        are resolved per page by PropertyListSerializer.
+        """
+        return super().get_queryset().select_related('organization', 'property_type')
 
 # 2. ImagesProperty
 class ImagesPropertyViewSet(ESModelViewSet):
@@ -333,6 +582,15 @@ class ImagesPropertyViewSet(ESModelViewSet):
     ordering_fields = ['order', 'created_at']
     search_fields = ['label']
     index_name = 'images_property'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization": EXACT_OPERATORS,
+        "property": EXACT_OPERATORS,
+        "label": TEXT_OPERATORS,
+        "order": RANGE_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 # 3. PropertyLocation
 class PropertyLocationViewSet(ESModelViewSet):
@@ -341,6 +599,19 @@ class PropertyLocationViewSet(ESModelViewSet):
     # ordering_fields = ['adr_city', 'created_at']
     # search_fields = ['adr_city', 'adr_state', 'adr_country']
     index_name = 'property_location'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "property": EXACT_OPERATORS,
+        "location": EXACT_OPERATORS,
+        "city": TEXT_OPERATORS,
+        "state_province": TEXT_OPERATORS,
+        "postal_code": TEXT_OPERATORS,
+        "country": TEXT_OPERATORS,
+        "latitude": RANGE_OPERATORS,
+        "longitude": RANGE_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 
 # 4. GuestControls
@@ -350,12 +621,30 @@ class GuestControlsViewSet(ESModelViewSet):
     ordering_fields = ['created_at']
     search_fields = []  # no full-text fields
     index_name = 'guest_controls'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "property": EXACT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
 
 class TaxAccountsViewSet(ESModelViewSet):
     queryset = TaxAccounts.objects.all()
     serializer_class = TaxAccountsSerializer
     index_name = 'tax_accounts'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization": EXACT_OPERATORS,
+        "name": TEXT_OPERATORS,
+        "tax_type": EXACT_OPERATORS,
+        "rate": RANGE_OPERATORS,
+        "start_date": RANGE_OPERATORS,
+        "end_date": RANGE_OPERATORS,
+        "active": BOOLEAN_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
     def get_queryset(self):
         """
@@ -372,6 +661,16 @@ class DeductionAccountsViewSet(ESModelViewSet):
     queryset = DeductionAccounts.objects.all()
     serializer_class = DeductionAccountsSerializer
     index_name = 'deduction_accounts'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization": EXACT_OPERATORS,
+        "unit_listing_id": EXACT_OPERATORS,
+        "name": TEXT_OPERATORS,
+        "calculation_type": EXACT_OPERATORS,
+        "frequency": EXACT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
     def get_queryset(self):
         """
@@ -388,6 +687,15 @@ class InventoryItemViewSet(ESModelViewSet):
     queryset = InventoryItem.objects.all()
     serializer_class = InventoryItemSerializer
     index_name = 'inventory_items'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization": EXACT_OPERATORS,
+        "item_name": TEXT_OPERATORS,
+        "cost_cents": RANGE_OPERATORS,
+        "count": RANGE_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
     def get_queryset(self):
         """
@@ -403,6 +711,15 @@ class UsageAccountViewSet(ESModelViewSet):
     queryset = UsageAccount.objects.all()
     serializer_class = UsageAccountSerializer
     index_name = 'usage_accounts'   
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization": EXACT_OPERATORS,
+        "usage_type": EXACT_OPERATORS,
+        "charge_type": EXACT_OPERATORS,
+        "name": TEXT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
     def get_queryset(self):
         """
@@ -418,6 +735,15 @@ class LynnbrookAccountViewSet(ESModelViewSet):
     queryset = LynnbrookAccount.objects.all()
     serializer_class = LynnbrookAccountSerializer
     index_name = 'lynnbrook_accounts'
+    filterable_fields = {
+        "id": EXACT_OPERATORS,
+        "organization": EXACT_OPERATORS,
+        "target_id": EXACT_OPERATORS,
+        "funding_type": EXACT_OPERATORS,
+        "display_name": TEXT_OPERATORS,
+        "created_at": RANGE_OPERATORS,
+        "updated_at": RANGE_OPERATORS,
+    }
 
     def get_queryset(self):
         queryset = super().get_queryset()
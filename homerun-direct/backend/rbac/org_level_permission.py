@@ -1,38 +1,44 @@
+import logging
+
 from django.core.exceptions import PermissionDenied
+from core.tenancy import get_tenancy
 
+logger = logging.getLogger(__name__)
 
 
-def apply_organization_level_filter(request, must_clauses: list):
+def apply_organization_level_filter(request, filter_clauses: list):
     """
-    Adds organization-level access filtering to the provided must_clauses list.
+    Adds organization-level access filtering to the provided filter_clauses list
+    (the bool.filter of the ES query, so it is cached and not scored).
     
     This checks if the user is not a superuser and applies organization access limits
-    using IDs from session['organization_ids'].
+    using the organization ids of the request's tenancy (core.tenancy). A user
+    without organizations gets an empty terms filter, which matches nothing.
     """
     user = request.user
     if not user.is_superuser:
-        user_org_ids = request.session.get("organization_ids", [])
-        if user_org_ids:
-            must_clauses.append({
-                "terms": {
-                    "id": list(user_org_ids)
-                }
-            })
-        else:
-            print("⚠️ No organization_ids found in session.")
+        user_org_ids = get_tenancy(request).organization_ids
+        if not user_org_ids:
+            logger.debug(f"No organizations in the tenancy of user {user.pk}")
+        filter_clauses.append({
+            "terms": {
+                "id": list(user_org_ids)
+            }
+        })
 
-def apply_brand_level_filter(request, must_clauses: list):
+def apply_brand_level_filter(request, filter_clauses: list):
     """
-    Appends brand-level permission filter for non-superusers using session data.
+    Appends brand-level permission filter (bool.filter context) for non-superusers
+    using the brand ids of the request's tenancy (core.tenancy).
     """
     user = request.user
     if not user.is_superuser:
-        print("Noooooooooooooooooooooooooot Suuuuuuuuuuuuuuuuuuuuuuuper")
-        brand_ids = request.session.get("brand_ids", [])
+        brand_ids = get_tenancy(request).brand_ids
         if not brand_ids:
+            logger.debug(f"No brands in the tenancy of user {user.pk}")
             raise PermissionDenied("No brand access defined for this user.")
-        must_clauses.append({
+        filter_clauses.append({
             "terms": {
                 "id": list(brand_ids)
             }
-        })
\ No newline at end of file
+        })
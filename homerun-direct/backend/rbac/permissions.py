@@ -1,6 +1,110 @@
+import logging
+import threading
+
 from rest_framework.permissions import BasePermission
+
+from core import cache_tags
 from rbac.models import AuthEntityPermission
 
+logger = logging.getLogger(__name__)
+
+ACTIONS = ("create", "read", "update", "delete")
+
+# Request method -> matrix action; other methods only need a permission record
+METHOD_ACTIONS = {
+    "POST": "create",
+    "GET": "read",
+    "PUT": "update",
+    "PATCH": "update",
+    "DELETE": "delete",
+}
+
+# Renaming an Entity changes the matrix keys, so its tag is part of every version
+ENTITY_TAG = cache_tags.model_tag("core.Entity")
+
+
+def group_permissions_tag(group_id):
+    return f"rbac:permissions:group:{group_id}"
+
+
+def load_permission_matrix(organization_id, group_id):
+    """{entity name (lower case): {"create": bool, ..., "custom": dict}} in one query."""
+    rows = AuthEntityPermission.objects.filter(organization_id=organization_id, group_id=group_id).values_list(
+        "entity_name__name", "can_create", "can_read", "can_update", "can_delete", "custom_permissions",
+    )
+    return {
+        name.lower(): {
+            "create": can_create, "read": can_read, "update": can_update, "delete": can_delete,
+            "custom": custom or {},
+        }
+        for name, can_create, can_read, can_update, can_delete, custom in rows
+    }
+
+
+class PermissionMatrixCache:
+    """
+    Per (organization, group) matrices kept in process memory. Each entry
+    remembers the Redis versions of its tags (see core.cache_tags) and is
+    rebuilt once a save elsewhere bumped them, so a check costs one MGET.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, organization_id, group_id):
+        key = (organization_id, group_id)
+        try:
+            version = tuple(cache_tags.get_versions([ENTITY_TAG, group_permissions_tag(group_id)]))
+        except Exception:
+            logger.warning("Permission matrix version unavailable, reading from the database", exc_info=True)
+            return load_permission_matrix(organization_id, group_id)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        matrix = load_permission_matrix(organization_id, group_id)
+        with self._lock:
+            self._entries[key] = (version, matrix)
+        return matrix
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+permission_matrices = PermissionMatrixCache()
+
+
+def get_permission_matrix(organization_id, group_id):
+    return permission_matrices.get(organization_id, group_id)
+
+
+def invalidate_permission_matrix(group_id):
+    """Drop the matrices of ``group_id`` in every process."""
+    cache_tags.bump(group_permissions_tag(group_id))
+
+
+def get_entity_permissions(user, entity_names):
+    """
+    Bulk check for menu rendering: {entity_name: {"create", "read", "update",
+    "delete"}} for every name, from a single matrix lookup.
+    """
+    denied = {action: False for action in ACTIONS}
+    organization = getattr(user, "organization", None)
+    group = getattr(user, "group", None)
+    if not user.is_authenticated or not organization or not group:
+        return {name: dict(denied) for name in entity_names}
+    if getattr(group, "is_super_admin", False):
+        return {name: {action: True for action in ACTIONS} for name in entity_names}
+
+    matrix = get_permission_matrix(organization.pk, group.pk)
+    return {
+        name: {action: matrix[name.lower()][action] for action in ACTIONS} if name.lower() in matrix else dict(denied)
+        for name in entity_names
+    }
+
+
 class EntityPermission(BasePermission):
     def has_permission(self, request, view):
         user = request.user
@@ -10,54 +114,26 @@ class EntityPermission(BasePermission):
         if not entity_name:
             entity_name = "user"
 
-        org_group = user.group
-
-        print("\n🚀 DEBUG: Checking permissions...")
-        print(f"User: {user.username}")
-        print(f"Organization: {user.organization}")
-        print(f"Group: {org_group}")
-        print(f"Entity being accessed: {entity_name}")  # ✅ Now should print "user"
-        print(f"Request method: {request.method}")
-
         if not user.is_authenticated:
-            print("❌ User is not authenticated")
+            logger.debug("EntityPermission: user is not authenticated")
             return False
 
+        org_group = user.group
         if not user.organization or not org_group:
-            print("❌ User has no organization or group")
+            logger.debug(f"EntityPermission: {user.username} has no organization or group")
             return False
 
         # Super Admins have full access
         if org_group.is_super_admin:
-            print("✅ User is a Super Admin, granting access")
             return True
 
-        # Fetch permission for this entity
-        permission = AuthEntityPermission.objects.filter(
-            organization=user.organization,
-            group=org_group,
-            entity_name=entity_name  # ✅ Now should match "user"
-        ).first()
-
-        print(f"🔍 Found Permission: {permission}")
-
+        permission = get_permission_matrix(user.organization.pk, org_group.pk).get(entity_name)
         if not permission:
-            print("❌ No permission record found")
+            logger.debug(f"EntityPermission: no permission record for {entity_name}")
             return False
 
-        # Check CRUD permissions
-        if request.method == "POST" and not permission.can_create:
-            print("❌ User does not have CREATE permission")
+        action = METHOD_ACTIONS.get(request.method)
+        if action and not permission[action]:
+            logger.debug(f"EntityPermission: {request.method} on {entity_name} denied")
             return False
-        if request.method == "GET" and not permission.can_read:
-            print("❌ User does not have READ permission")
-            return False
-        if request.method in ["PUT", "PATCH"] and not permission.can_update:
-            print("❌ User does not have UPDATE permission")
-            return False
-        if request.method == "DELETE" and not permission.can_delete:
-            print("❌ User does not have DELETE permission")
-            return False
-
-        print("✅ User has permission, granting access")
         return True
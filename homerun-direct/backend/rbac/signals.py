@@ -1,3 +1,14 @@
+import logging
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rbac.models import AuthEntityPermission, OrganizatioRole
+from rbac.permissions import invalidate_permission_matrix
+
+logger = logging.getLogger(__name__)
+
+
 def create_super_user(sender, **kwargs):
     from django.contrib.auth import get_user_model
 
@@ -18,5 +29,15 @@ def create_super_user(sender, **kwargs):
     
 def initiate_rbac(sender, **kwargs):
     create_super_user(sender, **kwargs)
-    
 
+
+@receiver(post_save, sender=AuthEntityPermission)
+@receiver(post_delete, sender=AuthEntityPermission)
+@receiver(post_save, sender=OrganizatioRole)
+@receiver(post_delete, sender=OrganizatioRole)
+def invalidate_group_permissions(sender, instance, **kwargs):
+    group_id = instance.group_id if sender is AuthEntityPermission else instance.pk
+    try:
+        invalidate_permission_matrix(group_id)
+    except Exception:
+        logger.warning(f"Could not invalidate permission matrix of group {group_id}", exc_info=True)
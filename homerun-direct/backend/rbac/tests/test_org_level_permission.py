@@ -1,7 +1,8 @@
 import pytest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 from django.core.exceptions import PermissionDenied
 from rbac.org_level_permission import apply_organization_level_filter, apply_brand_level_filter
+from core.tenancy import Tenancy
 
 def test_apply_organization_level_filter_superuser():
     request = Mock()
@@ -12,10 +13,10 @@ def test_apply_organization_level_filter_superuser():
     
     assert must_clauses == []
 
-def test_apply_organization_level_filter_with_org_ids():
+@patch("rbac.org_level_permission.get_tenancy", return_value=Tenancy(organization_ids=[1, 2, 3]))
+def test_apply_organization_level_filter_with_org_ids(mock_tenancy):
     request = Mock()
     request.user.is_superuser = False
-    request.session.get = Mock(return_value=[1, 2, 3])
     must_clauses = []
 
     apply_organization_level_filter(request, must_clauses)
@@ -26,17 +27,17 @@ def test_apply_organization_level_filter_with_org_ids():
         }
     }]
 
-def test_apply_organization_level_filter_without_org_ids(capfd):
+@patch("rbac.org_level_permission.get_tenancy", return_value=Tenancy())
+def test_apply_organization_level_filter_without_org_ids(mock_tenancy, capfd):
     request = Mock()
     request.user.is_superuser = False
-    request.session.get = Mock(return_value=[])
     must_clauses = []
 
     apply_organization_level_filter(request, must_clauses)
 
     out, _ = capfd.readouterr()
-    assert "No organization_ids found in session" in out
-    assert must_clauses == []
+    assert out == ""
+    assert must_clauses == [{"terms": {"id": []}}]
 
 
 def test_apply_brand_level_filter_superuser():
@@ -48,26 +49,26 @@ def test_apply_brand_level_filter_superuser():
 
     assert must_clauses == []
 
-def test_apply_brand_level_filter_with_brand_ids(capfd):
+@patch("rbac.org_level_permission.get_tenancy", return_value=Tenancy(brand_ids=[101, 202]))
+def test_apply_brand_level_filter_with_brand_ids(mock_tenancy, capfd):
     request = Mock()
     request.user.is_superuser = False
-    request.session.get = Mock(return_value=[101, 202])
     must_clauses = []
 
     apply_brand_level_filter(request, must_clauses)
 
     out, _ = capfd.readouterr()
-    assert "Noooooooooooooooooooooooooot Suuuuuuuuuuuuuuuuuuuuuuuper" in out
+    assert out == ""
     assert must_clauses == [{
         "terms": {
             "id": [101, 202]
         }
     }]
 
-def test_apply_brand_level_filter_without_brand_ids():
+@patch("rbac.org_level_permission.get_tenancy", return_value=Tenancy())
+def test_apply_brand_level_filter_without_brand_ids(mock_tenancy):
     request = Mock()
     request.user.is_superuser = False
-    request.session.get = Mock(return_value=[])
 
     with pytest.raises(PermissionDenied, match="No brand access defined for this user."):
         apply_brand_level_filter(request, [])
@@ -50,9 +50,9 @@ def test_permission_super_admin():
     assert permission.has_permission(request, view) is True
 
 
-@patch('rbac.permissions.AuthEntityPermission.objects.filter')
-def test_permission_not_found(mock_filter):
-    mock_filter.return_value.first.return_value = None
+@patch('rbac.permissions.get_permission_matrix')
+def test_permission_not_found(mock_matrix):
+    mock_matrix.return_value = {}
 
     group = MagicMock()
     group.is_super_admin = False
@@ -73,11 +73,14 @@ def test_permission_not_found(mock_filter):
     permission = EntityPermission()
     assert permission.has_permission(request, view) is False
 
-@patch('rbac.permissions.AuthEntityPermission.objects.filter')
-def test_permission_create_denied(mock_filter):
+@patch('rbac.permissions.get_permission_matrix')
+def test_permission_create_denied(mock_matrix):
     mock_perm = MagicMock()
     mock_perm.can_create = False
-    mock_filter.return_value.first.return_value = mock_perm
+    mock_matrix.return_value = {"user": {
+        "create": mock_perm.can_create, "read": mock_perm.can_read,
+        "update": mock_perm.can_update, "delete": mock_perm.can_delete,
+    }}
 
     group = MagicMock()
     group.is_super_admin = False
@@ -97,14 +100,17 @@ def test_permission_create_denied(mock_filter):
     permission = EntityPermission()
     assert permission.has_permission(request, view) is False
 
-@patch('rbac.permissions.AuthEntityPermission.objects.filter')
-def test_permission_create_allowed(mock_filter):
+@patch('rbac.permissions.get_permission_matrix')
+def test_permission_create_allowed(mock_matrix):
     mock_perm = MagicMock()
     mock_perm.can_create = True
     mock_perm.can_read = False
     mock_perm.can_update = False
     mock_perm.can_delete = False
-    mock_filter.return_value.first.return_value = mock_perm
+    mock_matrix.return_value = {"user": {
+        "create": mock_perm.can_create, "read": mock_perm.can_read,
+        "update": mock_perm.can_update, "delete": mock_perm.can_delete,
+    }}
 
     group = MagicMock()
     group.is_super_admin = False
@@ -125,11 +131,14 @@ def test_permission_create_allowed(mock_filter):
     assert permission.has_permission(request, view) is True
 
 
-@patch('rbac.permissions.AuthEntityPermission.objects.filter')
-def test_permission_read_denied(mock_filter):
+@patch('rbac.permissions.get_permission_matrix')
+def test_permission_read_denied(mock_matrix):
     mock_perm = MagicMock()
     mock_perm.can_read = False
-    mock_filter.return_value.first.return_value = mock_perm
+    mock_matrix.return_value = {"user": {
+        "create": mock_perm.can_create, "read": mock_perm.can_read,
+        "update": mock_perm.can_update, "delete": mock_perm.can_delete,
+    }}
 
     group = MagicMock()
     group.is_super_admin = False
@@ -150,14 +159,17 @@ def test_permission_read_denied(mock_filter):
     assert permission.has_permission(request, view) is False
 
 
-@patch('rbac.permissions.AuthEntityPermission.objects.filter')
-def test_permission_update_allowed(mock_filter):
+@patch('rbac.permissions.get_permission_matrix')
+def test_permission_update_allowed(mock_matrix):
     mock_perm = MagicMock()
     mock_perm.can_update = True
     mock_perm.can_read = False
     mock_perm.can_create = False
     mock_perm.can_delete = False
-    mock_filter.return_value.first.return_value = mock_perm
+    mock_matrix.return_value = {"user": {
+        "create": mock_perm.can_create, "read": mock_perm.can_read,
+        "update": mock_perm.can_update, "delete": mock_perm.can_delete,
+    }}
 
     group = MagicMock()
     group.is_super_admin = False
@@ -178,14 +190,17 @@ def test_permission_update_allowed(mock_filter):
     assert permission.has_permission(request, view) is True
 
 
-@patch('rbac.permissions.AuthEntityPermission.objects.filter')
-def test_permission_delete_allowed(mock_filter):
+@patch('rbac.permissions.get_permission_matrix')
+def test_permission_delete_allowed(mock_matrix):
     mock_perm = MagicMock()
     mock_perm.can_delete = True
     mock_perm.can_read = False
     mock_perm.can_create = False
     mock_perm.can_update = False
-    mock_filter.return_value.first.return_value = mock_perm
+    mock_matrix.return_value = {"user": {
+        "create": mock_perm.can_create, "read": mock_perm.can_read,
+        "update": mock_perm.can_update, "delete": mock_perm.can_delete,
+    }}
 
     group = MagicMock()
     group.is_super_admin = False
@@ -238,3 +253,50 @@ def test_permission_delete_allowed(mock_filter):
 
 
 
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    from django.core.cache import cache
+    from rbac.permissions import permission_matrices
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    cache.clear()
+    permission_matrices.clear()
+    yield
+    permission_matrices.clear()
+
+
+@pytest.fixture
+def role_permissions(db):
+    from core.models import Entity
+    role = OrganizatioRole.objects.create(name="Employee")
+    for name, can_read in (("Property", True), ("Units", False)):
+        entity = Entity.objects.create(name=name, url_path=f"/api/{name.lower()}/", model_path="core.Entity")
+        AuthEntityPermission.objects.create(group=role, entity_name=entity, can_read=can_read)
+    return role
+
+
+def test_permission_matrix_is_cached_until_group_changes(locmem_cache, role_permissions, django_assert_num_queries):
+    from rbac.permissions import get_permission_matrix
+    matrix = get_permission_matrix(None, role_permissions.pk)
+    assert matrix["property"]["read"] is True
+
+    with django_assert_num_queries(0):
+        assert get_permission_matrix(None, role_permissions.pk) is matrix
+
+    AuthEntityPermission.objects.filter(group=role_permissions, entity_name__name="Units").get().save()
+    with django_assert_num_queries(1):
+        get_permission_matrix(None, role_permissions.pk)
+
+
+def test_get_entity_permissions_bulk(locmem_cache, role_permissions):
+    from rbac.permissions import get_entity_permissions
+    user = MagicMock(is_authenticated=True)
+    user.organization.pk = None
+    user.group = role_permissions
+
+    permissions = get_entity_permissions(user, ["Property", "Units", "Brand"])
+
+    assert permissions["Property"]["read"] is True
+    assert permissions["Units"]["read"] is False
+    assert permissions["Brand"] == {"create": False, "read": False, "update": False, "delete": False}
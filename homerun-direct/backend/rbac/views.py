@@ -9,6 +9,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 from core.viewsets import  GenericResponseMixin
+from core.tenancy import resolve_tenancy
 from rest_framework.permissions import AllowAny
 from dj_rest_auth.views import PasswordResetView, PasswordResetConfirmView
 from google.oauth2 import id_token
@@ -24,14 +25,10 @@ User = get_user_model()
 
 
 def store_user_entities_in_session(user, session):
-    organization_ids = list(
-        Organization.objects.filter(user=user).values_list("id", flat=True)
-    )
-    brand_ids = list(
-        Brand.objects.filter(organization__user=user).values_list("id", flat=True)
-    )
-    session["organization_ids"] = organization_ids
-    session["brand_ids"] = brand_ids
+    # Same source as every access filter (core.tenancy), kept for session readers
+    tenancy = resolve_tenancy(user)
+    session["organization_ids"] = tenancy.organization_ids
+    session["brand_ids"] = tenancy.brand_ids
     session.modified = True
 
 class CustomLoginView(APIView):